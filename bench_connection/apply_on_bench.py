@@ -26,6 +26,64 @@ class dummy_cartography:
         return fault_type.PASS.value
 
 
+def batch_to_arrays(batch):
+    """
+    Function converts a batch for the batch bench protocol into arrays.
+    :param batch: list of (ParameterSet, number of shots) pairs
+    :return: array of x values, array of y values and array with the number of shots for every pair
+    """
+    x = np.array([ps.x for ps, _ in batch], dtype=np.float64)
+    y = np.array([ps.y for ps, _ in batch], dtype=np.float64)
+    shots = np.array([n for _, n in batch], dtype=np.int64)
+    return x, y, shots
+
+
+class vectorized_dummy_cartography(dummy_cartography):
+    """
+    Dummy cartography with the same fault pattern as dummy_cartography, implemented with NumPy for the batch bench
+    protocol: the bench receives an ordered list of (parameter set, number of shots) pairs and streams back the list
+    of fault classes for every pair.
+    """
+
+    x_min = 0
+    x_max = 2000
+
+    def shoot(self, x, y, random_state=np.random):
+        """
+        Function performs one shot on every (x, y) position.
+        :param x: array of x positions
+        :param y: array of y positions
+        :param random_state: source of randomness for the random fault classes
+        :return: array of fault class ids
+        """
+        x_min, x_max = self.x_min, self.x_max
+        outside = (x < x_min) | (x > x_max)
+        if np.any(outside):
+            raise ValueError(x[outside][0], "is not in the allowed limits: [", x_min, ", ", x_max, "].")
+        conditions = [x < x_max * 0.2,
+                      (x - x_max * 0.1 < y) & (y < x + x_max * 0.1),
+                      (x > x_max * 0.5) & (x_max - x - x_max * 0.1 < y) & (y < x_max - x + x_max * 0.1)]
+        random_class = np.where(random_state.random_sample(len(x)) < 0.5, fault_type.PASS.value, fault_type.MUTE.value)
+        return np.select(conditions, [random_class, fault_type.FAIL.value, fault_type.MUTE.value],
+                         default=fault_type.PASS.value)
+
+    def apply_bench_batch(self, batch, seed=None):
+        """
+        Function performs all shots of the batch with array operations.
+        :param batch: list of (ParameterSet, number of shots) pairs
+        :param seed: if set, the random fault classes are drawn from a generator seeded with it
+        :return: generator of lists of fault class ids, one list for every pair in the batch
+        """
+        x, y, shots = batch_to_arrays(batch)
+        random_state = np.random if seed is None else np.random.RandomState(seed)
+        results = self.shoot(np.repeat(x, shots), np.repeat(y, shots), random_state)
+        for fault_classes in np.split(results, np.cumsum(shots)[:-1]):
+            yield fault_classes.tolist()
+
+    def apply_bench_parameter(self, parameter_set):
+        return int(self.shoot(np.array([parameter_set.x]), np.array([parameter_set.y]))[0])
+
+
 def apply_bench_params(x, y, d, pw, i):
     """
     Takes bench parameters and returns the device response.
@@ -0,0 +1,4 @@
+from .chips import SensitiveSpot, SyntheticChip, CHIPS, single_spot_chip, multi_modal_chip, delay_window_chip, \
+    intensity_threshold_chip, noisy_chip
+from .suite import ALGORITHMS, DEFAULT_SETTINGS, random_search, genetic_algorithm, run_benchmark, run_suite, \
+    summarize, write_results, load_results, compare_results
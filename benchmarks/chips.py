@@ -0,0 +1,195 @@
+import time
+import numpy as np
+from fitness import FAULT
+from parameters import ParameterSet
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class SensitiveSpot:
+    """
+    Sensitive area of a synthetic chip. Positions and widths are fractions of the parameter ranges (0 is the minimum, 1
+    the maximum of the parameter), so the same chip works with any parameter limits.
+    The fault probability of a shot is peak * spatial factor * delay factor * intensity factor:
+    - spatial: Gaussian in x and y around (x, y) with the standard deviation radius,
+    - delay: 1 inside the window [delay - delay_width, delay + delay_width], Gaussian decay outside, 1 if delay is None,
+    - intensity: sigmoid step at intensity with the width intensity_softness, 1 if intensity is None.
+    """
+
+    def __init__(self, x, y, radius=0.05, peak=0.95, delay=None, delay_width=0.05, intensity=None,
+                 intensity_softness=0.03):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.peak = peak
+        self.delay = delay
+        self.delay_width = delay_width
+        self.intensity = intensity
+        self.intensity_softness = intensity_softness
+
+    def probability(self, columns):
+        """
+        :param columns: dictionary parameter name -> array of normalized values
+        :return: array with the fault probability of every shot
+        """
+        p = self.peak * np.exp(-0.5 * ((columns['x'] - self.x) ** 2 + (columns['y'] - self.y) ** 2) / self.radius ** 2)
+        if self.delay is not None and 'delay' in columns:
+            outside = np.maximum(np.abs(columns['delay'] - self.delay) - self.delay_width, 0)
+            p = p * np.exp(-0.5 * (outside / self.delay_width) ** 2)
+        if self.intensity is not None and 'intensity' in columns:
+            p = p * _sigmoid((columns['intensity'] - self.intensity) / self.intensity_softness)
+        return p
+
+    def as_dict(self):
+        return {name: None if value is None else float(value) for name, value in vars(self).items()}
+
+
+class SyntheticChip:
+    """
+    Simulated chip for benchmarks, a bench with apply_bench_parameter and the batch protocol (apply_bench_batch).
+    Every shot is a fault ('fail') with the probability given by the sensitive spots, the chip crashes ('mute') with a
+    probability that grows with the intensity above mute_intensity, and with the probability noise the result is a
+    random fault class. Spots with a fault probability between 0 and 1 give 'changing' solutions.
+    The chip has its own random generator, so with the same seed it returns the same shots for the same requests.
+    It counts the shots, the time spent in the bench functions and the solutions with at least one fault.
+    """
+
+    def __init__(self, spots, mute_intensity=None, mute_probability=0.5, intensity_softness=0.03, noise=0.0, seed=None,
+                 name='synthetic'):
+        self.spots = spots
+        self.mute_intensity = mute_intensity
+        self.mute_probability = mute_probability
+        self.intensity_softness = intensity_softness
+        self.noise = noise
+        self.name = name
+        self.random_state = np.random.RandomState(seed)
+        space = ParameterSet.get_space()
+        self.names = space.names
+        self.mins, self.maxs = space.mins.astype(np.float64), space.maxs.astype(np.float64)
+        ids = {fault.name: fault.id for fault in FAULT.values()}
+        self.pass_id, self.fail_id, self.mute_id = ids.get('pass', 0), ids.get('fail', 1), ids.get('mute', 2)
+        self.shots = 0
+        self.bench_time = 0.0
+        self.faulty = set()
+
+    def probabilities(self, values):
+        """
+        :param values: matrix of parameter values, one row per shot
+        :return: arrays with the fault probability and the crash probability of every shot
+        """
+        normalized = (np.asarray(values, dtype=np.float64) - self.mins) / np.maximum(self.maxs - self.mins, 1e-12)
+        columns = {name: normalized[:, i] for i, name in enumerate(self.names)}
+        p_pass = np.ones(len(normalized))
+        for spot in self.spots:
+            p_pass *= 1 - spot.probability(columns)
+        p_mute = np.zeros(len(normalized))
+        if self.mute_intensity is not None and 'intensity' in columns:
+            p_mute = self.mute_probability * _sigmoid((columns['intensity'] - self.mute_intensity) /
+                                                      self.intensity_softness)
+        return 1 - p_pass, p_mute
+
+    def shoot(self, values):
+        """
+        :param values: matrix of parameter values, one row per shot
+        :return: array of fault class ids
+        """
+        p_fault, p_mute = self.probabilities(values)
+        u = self.random_state.random_sample((3, len(p_fault)))
+        result = np.where(u[0] < p_mute, self.mute_id, np.where(u[1] < p_fault, self.fail_id, self.pass_id))
+        if self.noise:
+            noisy = u[2] < self.noise
+            classes = np.array([self.pass_id, self.fail_id, self.mute_id])
+            result[noisy] = classes[self.random_state.randint(0, 3, int(np.sum(noisy)))]
+        return result
+
+    def apply_bench_parameter(self, parameter_set):
+        start = time.perf_counter()
+        values = [[getattr(parameter_set, name) for name in self.names]]
+        fault_class = int(self.shoot(values)[0])
+        self.shots += 1
+        if fault_class == self.fail_id:
+            self.faulty.add(tuple(values[0]))
+        self.bench_time += time.perf_counter() - start
+        return fault_class
+
+    def apply_bench_batch(self, batch):
+        """
+        :param batch: ordered list of (parameter set, number of shots) pairs
+        :return: list with the fault classes of every pair
+        """
+        start = time.perf_counter()
+        values = [[getattr(ps, name) for name in self.names] for ps, _ in batch]
+        shots = np.array([n for _, n in batch], dtype=np.int64)
+        repeated = np.repeat(np.array(values, dtype=np.float64).reshape(len(batch), len(self.names)), shots, axis=0)
+        results = np.split(self.shoot(repeated), np.cumsum(shots)[:-1])
+        self.shots += int(np.sum(shots))
+        self.faulty.update(tuple(row) for row, r in zip(values, results) if np.any(r == self.fail_id))
+        self.bench_time += time.perf_counter() - start
+        return [r.tolist() for r in results]
+
+    def stats(self):
+        """
+        :return: dictionary with the number of shots, the time in the bench functions and the number of solutions with
+        at least one fault
+        """
+        return {'shots': self.shots, 'bench_time': self.bench_time, 'faults_found': len(self.faulty)}
+
+    def as_dict(self):
+        return {'name': self.name, 'spots': [spot.as_dict() for spot in self.spots],
+                'mute_intensity': self.mute_intensity, 'mute_probability': self.mute_probability,
+                'noise': self.noise}
+
+
+def single_spot_chip(seed=None):
+    """
+    One wide sensitive spot, independent of the delay and the intensity.
+    """
+    return SyntheticChip([SensitiveSpot(0.6, 0.4, radius=0.1)], seed=seed, name='single_spot')
+
+
+def multi_modal_chip(seed=None, spots=5, layout=0):
+    """
+    Several narrow spots at random positions (given by the layout seed) with different peaks, delay windows and
+    intensity thresholds, and crashes at high intensity.
+    """
+    rng = np.random.RandomState(layout)
+    return SyntheticChip([SensitiveSpot(*rng.uniform(0.1, 0.9, 2), radius=rng.uniform(0.02, 0.06),
+                                        peak=rng.uniform(0.5, 1.0), delay=rng.uniform(0.2, 0.8), delay_width=0.1,
+                                        intensity=rng.uniform(0.2, 0.6)) for _ in range(spots)],
+                         mute_intensity=0.9, seed=seed, name='multi_modal')
+
+
+def delay_window_chip(seed=None):
+    """
+    Spots that are sensitive only in narrow delay windows.
+    """
+    return SyntheticChip([SensitiveSpot(0.3, 0.7, radius=0.08, delay=0.25, delay_width=0.03),
+                          SensitiveSpot(0.7, 0.3, radius=0.08, delay=0.75, delay_width=0.03)],
+                         seed=seed, name='delay_window')
+
+
+def intensity_threshold_chip(seed=None):
+    """
+    Faults only above an intensity threshold, and crashes a little higher, so the useful intensity range is narrow.
+    """
+    return SyntheticChip([SensitiveSpot(0.5, 0.5, radius=0.15, intensity=0.6)], mute_intensity=0.8,
+                         mute_probability=0.8, seed=seed, name='intensity_threshold')
+
+
+def noisy_chip(seed=None, layout=0):
+    """
+    Multi-modal chip with weak spots and random results, most faulty solutions are 'changing'.
+    """
+    chip = multi_modal_chip(seed, layout=layout)
+    for spot in chip.spots:
+        spot.peak *= 0.5
+    chip.noise = 0.05
+    chip.name = 'noisy'
+    return chip
+
+
+# library of synthetic chips: name -> function (seed of the shots) -> SyntheticChip
+CHIPS = {'single_spot': single_spot_chip, 'multi_modal': multi_modal_chip, 'delay_window': delay_window_chip,
+         'intensity_threshold': intensity_threshold_chip, 'noisy': noisy_chip}
@@ -0,0 +1,196 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import numpy as np
+from diversity import NoveltyFilter
+from ga import GeneticAlgorithm, TaguchiGA, VectorizedGA
+from helper import TabuList
+from initializations import latin_hypercube_sampling_mdu, space_filling_initialization
+from parameters import set_parameter_limits_from_ini_file
+from random_search import RandomSearch
+from .chips import CHIPS
+
+DEFAULT_SETTINGS = {'pop_size': 30, 'max_iterations': 10, 'nb_measurements': 5, 'random_points': 300,
+                    'parameter_info_file': 'parameter_info.ini'}
+
+# metrics compared by compare_results: name -> True if higher is better
+TRACKED_METRICS = {'faults_per_1k_shots': True, 'best_fitness': True, 'shots_per_second': True,
+                   'operator_time': False}
+
+
+def _no_iteration(n):
+    return n
+
+
+def random_search(bench, nb_points, nb_measurements=5, cache=None, rng=None, batch_size=1000, sort_function=None):
+    """
+    Random search of main_random.py: nb_points different random solutions, each measured with nb_measurements shots,
+    unless it is in the cache. Benches with the batch protocol (apply_bench_batch) get every batch at once.
+    :param bench: bench with the method apply_bench_parameter
+    :param rng: numpy Generator of the solutions
+    :return: evaluated Population
+    """
+    search = RandomSearch(bench.apply_bench_parameter, getattr(bench, 'apply_bench_batch', None),
+                          nb_measurements=nb_measurements, sort_function=sort_function, batch_size=batch_size,
+                          cache=cache, rng=rng)
+    return search.run(nb_points)
+
+
+def genetic_algorithm(ga_class=GeneticAlgorithm, batch=False, **ga_kwargs):
+    """
+    Function creates a benchmark algorithm that runs a GA on the chip.
+    :param ga_class: GA class
+    :param batch: if True, the GA uses the batch protocol of the chip
+    :param ga_kwargs: other GA arguments (e.g. initialization_function), they replace the settings of the suite
+    :return: function (chip, cache, settings, log file name, generator) -> final population
+    """
+    def run_ga(chip, cache, settings, log_file_name, rng):
+        kwargs = {'pop_size': settings['pop_size'], 'nb_measurements': settings['nb_measurements'],
+                  'max_iterations': settings['max_iterations'], 'parameter_info_file': settings['parameter_info_file'],
+                  'apply_on_bench_batch_function': chip.apply_bench_batch if batch else None, 'cache': cache,
+                  'rng': rng}
+        kwargs.update(ga_kwargs)
+        ga = ga_class(chip.apply_bench_parameter, _no_iteration, **kwargs)
+        return ga.run(log_file_name)
+    return run_ga
+
+
+def random_search_algorithm(chip, cache, settings, log_file_name, rng):
+    set_parameter_limits_from_ini_file(settings['parameter_info_file'])
+    return random_search(chip, settings['random_points'], settings['nb_measurements'], cache, rng)
+
+
+# benchmark algorithms: name -> function (chip, cache, settings, log file name, generator) -> final population
+ALGORITHMS = {'ga': genetic_algorithm(),
+              # the orthogonal array of 2-level factors needs a run size that is a multiple of 4
+              'ga_taguchi': genetic_algorithm(TaguchiGA, pop_size=32),
+              'ga_lhs': genetic_algorithm(initialization_function=latin_hypercube_sampling_mdu),
+              'ga_sobol': genetic_algorithm(initialization_function=space_filling_initialization('sobol')),
+              'vectorized_ga': genetic_algorithm(VectorizedGA, batch=True),
+              'vectorized_ga_novelty': genetic_algorithm(VectorizedGA, batch=True,
+                                                         novelty_filter=NoveltyFilter(min_distance=2)),
+              'random_search': random_search_algorithm}
+
+
+def run_benchmark(chip_name, algorithm_name, seed=0, settings=None):
+    """
+    Function runs one algorithm on one synthetic chip with a fixed seed (generator of the algorithm and shots of the
+    chip). The output of the algorithm is suppressed.
+    :return: dictionary with the metrics of the run
+    """
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    set_parameter_limits_from_ini_file(settings['parameter_info_file'])
+    rng = np.random.default_rng(seed)
+    chip = CHIPS[chip_name](seed)
+    cache = TabuList()
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        population = ALGORITHMS[algorithm_name](chip, cache, settings, os.path.join(directory, 'log.pkl'), rng)
+        wall_time = time.perf_counter() - start
+    chip_stats, cache_stats = chip.stats(), cache.stats()
+    shots = chip_stats['shots']
+    fitness_values = population.fitness if hasattr(population, 'genes') else [ps.fitness for ps in population]
+    return {'chip': chip_name, 'algorithm': algorithm_name, 'seed': seed,
+            'wall_time': wall_time,
+            'bench_time': chip_stats['bench_time'],
+            'operator_time': wall_time - chip_stats['bench_time'],
+            'shots': shots,
+            'evaluations': cache_stats['size'],
+            'cache_hit_rate': cache_stats['hit_rate'],
+            'faults_found': chip_stats['faults_found'],
+            'faults_per_1k_shots': 1000.0 * chip_stats['faults_found'] / shots if shots else 0.0,
+            'shots_per_second': shots / wall_time if wall_time > 0 else 0.0,
+            'best_fitness': float(np.max(fitness_values))}
+
+
+def run_suite(chips=None, algorithms=None, seeds=(0, 1, 2), settings=None, verbose=True):
+    """
+    Function runs every algorithm on every chip with every seed.
+    :param chips: names of the chips (keys of benchmarks.CHIPS), default: all
+    :param algorithms: names of the algorithms (keys of benchmarks.ALGORITHMS), default: all
+    :param seeds: seeds of the runs
+    :param settings: settings that replace DEFAULT_SETTINGS
+    :return: list with the metrics of every run
+    """
+    results = []
+    for chip_name in chips or CHIPS:
+        for algorithm_name in algorithms or ALGORITHMS:
+            for seed in seeds:
+                result = run_benchmark(chip_name, algorithm_name, seed, settings)
+                if verbose:
+                    print(f"{chip_name:20} {algorithm_name:15} seed {seed}: {result['shots']:6d} shots, "
+                          f"{result['faults_per_1k_shots']:7.2f} faults per 1k shots, {result['wall_time']:.2f} s")
+                results.append(result)
+    return results
+
+
+def summarize(results):
+    """
+    :param results: list returned by run_suite
+    :return: list with the mean and standard deviation of every metric, for every chip and algorithm
+    """
+    groups = dict()
+    for result in results:
+        groups.setdefault((result['chip'], result['algorithm']), []).append(result)
+    summary = []
+    for (chip_name, algorithm_name), group in groups.items():
+        row = {'chip': chip_name, 'algorithm': algorithm_name, 'runs': len(group)}
+        for metric in group[0]:
+            if metric in ('chip', 'algorithm', 'seed'):
+                continue
+            values = np.array([r[metric] for r in group], dtype=np.float64)
+            row[metric] = float(np.mean(values))
+            row[metric + '_std'] = float(np.std(values))
+        summary.append(row)
+    return summary
+
+
+def write_results(file_name, results, settings=None):
+    """
+    Function writes the results and their summary to a JSON file, with the environment and the settings of the run.
+    If the file name ends with '.csv', the results are written as a CSV table instead.
+    """
+    if file_name.endswith('.csv'):
+        with open(file_name, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        return
+    meta = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'machine': platform.machine(), 'processor': platform.processor(),
+            'settings': dict(DEFAULT_SETTINGS, **(settings or {})),
+            'chips': {name: CHIPS[name]().as_dict() for name in sorted({r['chip'] for r in results})}}
+    with open(file_name, 'w') as f:
+        json.dump({'meta': meta, 'results': results, 'summary': summarize(results)}, f, indent=1)
+
+
+def load_results(file_name):
+    with open(file_name) as f:
+        return json.load(f)
+
+
+def compare_results(baseline, results, tolerance=0.1):
+    """
+    Function compares the summary of the results with a baseline (e.g. the file of an earlier version).
+    :param baseline: dictionary loaded with load_results
+    :param results: list returned by run_suite
+    :param tolerance: relative change of a metric that is reported
+    :return: list of (chip, algorithm, metric, baseline value, new value) of the metrics that got worse
+    """
+    old = {(row['chip'], row['algorithm']): row for row in baseline['summary']}
+    regressions = []
+    for row in summarize(results):
+        base = old.get((row['chip'], row['algorithm']))
+        if base is None:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            before, after = base[metric], row[metric]
+            change = (after - before) / max(abs(before), 1e-12)
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append((row['chip'], row['algorithm'], metric, before, after))
+    return regressions
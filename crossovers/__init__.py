@@ -1,2 +1,3 @@
-from .crossovers import uniform_crossover, average_crossover
-
+from .crossovers import uniform_crossover, average_crossover, arithmetic_crossover, blend_crossover, sbx_crossover, \
+    uniform_crossover_vectorized, average_crossover_vectorized, arithmetic_crossover_vectorized, \
+    blend_crossover_vectorized, sbx_crossover_vectorized, for_parameter_sets
@@ -1,33 +1,152 @@
 from parameters import ParameterSet
 import numpy as np
+from random_generator import as_generator
 
 
-# CrossoverFunction = Callable[[ParameterSet, ParameterSet], ParameterSet]
+# CrossoverFunction = Callable[[ParameterSet, ParameterSet, np.random.Generator], ParameterSet]
 
-def uniform_crossover(parent1: ParameterSet, parent2: ParameterSet):
+def uniform_crossover(parent1: ParameterSet, parent2: ParameterSet, rng=None):
     """
     Crossover operator takes two ParameterSet solutions as two parents for creating the offspring.
     This implements the uniform crossover, where for the child creating probability for taking a gene
     from either of the parents is equal.
     :param parent1: ParameterSet solution presenting first parent
     :param parent2: ParameterSet solution presenting second parent
+    :param rng: numpy Generator, default: the default generator of the random_generator module
     :return: ParameterSet solution (child of the two parents) created by uniform crossover
     """
     # uniform crossover, each bit is chosen from either parent with equal probability
-    child = ParameterSet()
-    child.x = np.random.choice([parent1.x, parent2.x])
-    child.y = np.random.choice([parent1.y, parent2.y])
-    child.delay = np.random.choice([parent1.delay, parent2.delay])
-    child.power_width = int(np.random.choice([parent1.power_width, parent2.power_width]))
-    child.intensity = int(np.random.choice([parent1.intensity, parent2.intensity]))
-    return child
+    names = ParameterSet.get_param_names()
+    take_first = as_generator(rng).random(len(names)) < 0.5
+    return ParameterSet(*[getattr(parent1 if first else parent2, name) for first, name in zip(take_first, names)])
 
 
-def average_crossover(parent1: ParameterSet, parent2: ParameterSet):
+def average_crossover(parent1: ParameterSet, parent2: ParameterSet, rng=None):
     def get_avg(p1, p2, step):
         return min(p1,p2) + int((abs(p1-p2) / step / 2.0)) * step
-    return ParameterSet(x=int(get_avg(parent1.x, parent2.x, ParameterSet.XSTEP)),
-                        y=int(get_avg(parent1.y, parent2.y, ParameterSet.YSTEP)),
-                        delay=int(get_avg(parent1.delay, parent2.delay, ParameterSet.DSTEP)),
-                        power_width=int(get_avg(parent1.power_width, parent2.power_width, ParameterSet.PWSTEP)),
-                        intensity=int(get_avg(parent1.intensity, parent2.intensity, ParameterSet.ISTEP)))
+    space = ParameterSet.get_space()
+    return ParameterSet(*space.to_python([get_avg(getattr(parent1, name), getattr(parent2, name), step)
+                                          for name, (_, step, _) in zip(space.names, space.grid)]))
+
+
+# VectorizedCrossoverFunction = Callable[[np.ndarray, np.ndarray, np.random.Generator], np.ndarray]
+
+def uniform_crossover_vectorized(parents1: np.ndarray, parents2: np.ndarray, rng=None):
+    """
+    Uniform crossover (see uniform_crossover) for whole gene matrices of parents at once.
+    :param parents1: gene matrix of the first parents, one row per parent
+    :param parents2: gene matrix of the second parents, same shape as parents1
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: gene matrix of the children
+    """
+    mask = as_generator(rng).random(parents1.shape) < 0.5
+    return np.where(mask, parents1, parents2)
+
+
+def average_crossover_vectorized(parents1: np.ndarray, parents2: np.ndarray, rng=None):
+    """
+    Average crossover (see average_crossover) for whole gene matrices of parents at once.
+    The child value is the middle of the parent values, rounded down to the grid of the parameter.
+    :param parents1: gene matrix of grid indexes of the first parents, one row per parent
+    :param parents2: gene matrix of grid indexes of the second parents, same shape as parents1
+    :param rng: not used, the average crossover is deterministic
+    :return: gene matrix of the children
+    """
+    return np.minimum(parents1, parents2) + np.abs(parents1 - parents2) // 2
+
+
+def _snap(children):
+    """
+    :param children: real valued gene matrix (grid steps)
+    :return: gene matrix of the closest grid indexes, clipped to the axes of the parameters
+    """
+    return ParameterSet.get_space().clip_indexes(np.rint(children).astype(np.int64))
+
+
+def arithmetic_crossover_vectorized(weight=None):
+    """
+    :param weight: weight of the first parent, None for a random weight in [0, 1] for every child
+    :return: arithmetic crossover for gene matrices
+    """
+    def arithmetic_crossover_vectorized(parents1: np.ndarray, parents2: np.ndarray, rng=None):
+        """
+        Arithmetic crossover: the child is the weighted mean weight * parent1 + (1 - weight) * parent2, snapped to the
+        grid of every parameter.
+        :param parents1: gene matrix of grid indexes of the first parents, one row per parent
+        :param parents2: gene matrix of grid indexes of the second parents, same shape as parents1
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: gene matrix of the children
+        """
+        w = as_generator(rng).random((len(parents1), 1)) if weight is None else weight
+        return _snap(w * parents1 + (1 - w) * parents2)
+    return arithmetic_crossover_vectorized
+
+
+def blend_crossover_vectorized(alpha=0.5):
+    """
+    :param alpha: extension of the interval between the parents, relative to its length
+    :return: blend crossover (BLX-alpha) for gene matrices
+    """
+    def blend_crossover_vectorized(parents1: np.ndarray, parents2: np.ndarray, rng=None):
+        """
+        Blend crossover (BLX-alpha): every gene of the child is drawn uniformly from the interval between the parent
+        values, extended by alpha times its length on both sides, and snapped to the grid.
+        :param parents1: gene matrix of grid indexes of the first parents, one row per parent
+        :param parents2: gene matrix of grid indexes of the second parents, same shape as parents1
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: gene matrix of the children
+        """
+        low, high = np.minimum(parents1, parents2), np.maximum(parents1, parents2)
+        extension = alpha * (high - low)
+        return _snap(as_generator(rng).uniform(low - extension, high + extension))
+    return blend_crossover_vectorized
+
+
+def sbx_crossover_vectorized(eta=15):
+    """
+    :param eta: distribution index, a large eta creates children close to the parents
+    :return: simulated binary crossover for gene matrices
+    """
+    def sbx_crossover_vectorized(parents1: np.ndarray, parents2: np.ndarray, rng=None):
+        """
+        Simulated binary crossover (SBX) on the grid: every gene of the child is one of the two SBX children of the
+        parent values (chosen at random), snapped to the grid.
+        :param parents1: gene matrix of grid indexes of the first parents, one row per parent
+        :param parents2: gene matrix of grid indexes of the second parents, same shape as parents1
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: gene matrix of the children
+        """
+        rng = as_generator(rng)
+        u = rng.random(parents1.shape)
+        beta = np.where(u <= 0.5, 2 * u, 1 / (2 * (1 - u))) ** (1 / (eta + 1))
+        # the two SBX children are mean -/+ beta * half distance, the sign chooses one of them
+        sign = np.where(rng.random(parents1.shape) < 0.5, -1, 1)
+        return _snap((parents1 + parents2) / 2 + sign * beta * (parents2 - parents1) / 2)
+    return sbx_crossover_vectorized
+
+
+def for_parameter_sets(crossover, name=None):
+    """
+    Function turns a vectorized crossover into a crossover of two ParameterSet solutions.
+    :param crossover: vectorized crossover, (gene matrix, gene matrix, rng) -> gene matrix
+    :param name: name of the new crossover, default: name of the vectorized crossover without '_vectorized'
+    :return: crossover (parent1, parent2, rng) -> ParameterSet child
+    """
+    def cross(parent1: ParameterSet, parent2: ParameterSet, rng=None):
+        space = ParameterSet.get_space()
+        genes = space.encode([[getattr(parent, n) for n in space.names] for parent in (parent1, parent2)])
+        return ParameterSet.from_indexes(crossover(genes[:1], genes[1:], rng=rng)[0])
+    cross.__name__ = name or crossover.__name__.replace('_vectorized', '')
+    return cross
+
+
+def arithmetic_crossover(weight=None):
+    return for_parameter_sets(arithmetic_crossover_vectorized(weight))
+
+
+def blend_crossover(alpha=0.5):
+    return for_parameter_sets(blend_crossover_vectorized(alpha))
+
+
+def sbx_crossover(eta=15):
+    return for_parameter_sets(sbx_crossover_vectorized(eta))
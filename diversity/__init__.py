@@ -0,0 +1 @@
+from .novelty import NoveltyFilter
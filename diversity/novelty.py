@@ -0,0 +1,150 @@
+import math
+import numpy as np
+from scipy.spatial import cKDTree
+from helper import TabuList, SharedCache
+from mutations import uniform_mutation_vectorized
+from parameters import ParameterSet
+from population import Population
+from random_generator import as_generator, with_rng
+
+
+class NoveltyFilter:
+    """
+    Duplicate elimination and novelty filter of the reproduction step, working on gene matrices of grid indexes.
+    The children are accepted in order. A child is rejected if it is a duplicate of the elite or of an accepted child,
+    or if it is closer than min_distance to one of them. The distance is the largest difference of the grid indexes
+    over all parameters (grid steps).
+    With reject_evaluated, a child that is already in the evaluation cache is rejected too. Its evaluation would be
+    free, but it adds no information, so the shots of every generation go only to new solutions.
+    Rejected children are mutated again (at most remutations rounds) and the remaining places are filled with random
+    solutions. If the grid has no free points left, the distance and then the cache condition are dropped.
+    Without a filter, the GA uses NoveltyFilter(reject_evaluated=False, remutations=0), which only removes exact
+    duplicates and fills the population with random solutions.
+    """
+
+    def __init__(self, min_distance=0, reject_evaluated=True, remutations=3, mutation_probability=None,
+                 mutation=uniform_mutation_vectorized, max_attempts=10):
+        """
+        :param min_distance: minimal grid distance between the new individuals, 0 or 1 removes only exact duplicates
+        :param reject_evaluated: if True, children that are in the evaluation cache are rejected
+        :param remutations: number of rounds in which the rejected children are mutated again, 0 for no re-mutation
+        :param mutation_probability: mutation probability of every gene in the re-mutation, default: 1 / number of
+        parameters
+        :param mutation: vectorized mutation operator of the re-mutation
+        :param max_attempts: number of random fill rounds before a condition is dropped
+        """
+        self.min_distance = min_distance
+        self.reject_evaluated = reject_evaluated
+        self.remutations = remutations
+        self.mutation_probability = mutation_probability
+        self.mutation = with_rng(mutation)
+        self.max_attempts = max_attempts
+
+    @staticmethod
+    def evaluated(genes, cache):
+        """
+        :param genes: gene matrix of grid indexes
+        :param cache: evaluation cache (TESTED of the GA)
+        :return: boolean mask of the rows that are in the cache
+        """
+        if cache is None or len(genes) == 0:
+            return np.zeros(len(genes), dtype=bool)
+        space = ParameterSet.get_space()
+        # TabuList and SharedCache are keyed by the grid index, other caches get the solutions
+        if isinstance(cache, (TabuList, SharedCache)) and math.prod(space.levels.tolist()) < 2 ** 63:
+            return np.fromiter((key in cache for key in space.flat_index(genes).tolist()), dtype=bool,
+                               count=len(genes))
+        return np.fromiter((ps in cache for ps in Population(genes)), dtype=bool, count=len(genes))
+
+    @staticmethod
+    def accept(kept, candidates, min_distance=0):
+        """
+        :param kept: gene matrix of the individuals that are already in the population
+        :param candidates: gene matrix of the candidates, in the order of acceptance
+        :param min_distance: minimal grid distance
+        :return: boolean mask of the candidates that are not closer than min_distance to a kept individual or an
+        accepted candidate
+        """
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=bool)
+        rows = np.concatenate([kept, candidates]).astype(np.int64)
+        if min_distance <= 1:
+            # a candidate is accepted if it is the first occurrence of its row (of its grid index, if it fits in int64)
+            space = ParameterSet.get_space()
+            keys = space.flat_index(rows) if math.prod(space.levels.tolist()) < 2 ** 63 else rows
+            _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+            return first[inverse.ravel()[len(kept):]] == np.arange(len(kept), len(rows))
+        accepted = np.ones(len(rows), dtype=bool)
+        # grid distances are integers, closer than min_distance means at most min_distance - 1
+        pairs = cKDTree(rows).query_pairs(min_distance - 1, p=np.inf, output_type='ndarray')
+        # pairs (i, j) with i < j; going through them by j, the acceptance of i is already final
+        for i, j in pairs[np.argsort(pairs[:, 1], kind='stable')].tolist() if len(pairs) else []:
+            if j >= len(kept) and accepted[i]:
+                accepted[j] = False
+        return accepted[len(kept):]
+
+    def _filter(self, kept, candidates, cache, min_distance, reject_evaluated):
+        """
+        :return: mask of accepted candidates, number of candidates rejected as duplicates and as evaluated solutions
+        """
+        mask = np.ones(len(candidates), dtype=bool)
+        if reject_evaluated:
+            mask = ~self.evaluated(candidates, cache)
+        evaluated = len(candidates) - int(np.sum(mask))
+        mask[mask] = self.accept(kept, candidates[mask], min_distance)
+        return mask, len(candidates) - evaluated - int(np.sum(mask)), evaluated
+
+    def __call__(self, elite, children, size, cache=None, rng=None):
+        """
+        :param elite: gene matrix of the elite (kept without checks)
+        :param children: gene matrix of the children
+        :param size: number of new individuals
+        :param cache: evaluation cache (TESTED of the GA)
+        :param rng: numpy Generator
+        :return: gene matrix of the new individuals, their origins ('e' children, 'r' random) and the statistics of
+        the filter (number of duplicate and evaluated rejections, re-mutations and random fills)
+        """
+        rng = as_generator(rng)
+        space = ParameterSet.get_space()
+        elite = np.asarray(elite, dtype=np.int64).reshape(-1, len(space.levels))
+        candidates = np.asarray(children, dtype=np.int64).reshape(-1, len(space.levels))
+        stats = {'duplicate_rejections': 0, 'evaluated_rejections': 0, 'remutations': 0, 'random_fills': 0}
+        new, created = [elite[:0]], []
+        min_distance, reject_evaluated = self.min_distance, self.reject_evaluated
+        probability = self.mutation_probability or 1.0 / len(space.levels)
+        origin, rounds, attempts, missing = 'e', 0, 0, size
+        while missing > 0:
+            mask, duplicates, evaluated = self._filter(np.concatenate([elite] + new), candidates, cache, min_distance,
+                                                       reject_evaluated)
+            stats['duplicate_rejections'] += duplicates
+            stats['evaluated_rejections'] += evaluated
+            accepted = candidates[mask][:missing]
+            new.append(accepted)
+            created += [origin] * len(accepted)
+            missing -= len(accepted)
+            if origin == 'r':
+                stats['random_fills'] += len(accepted)
+            if missing <= 0:
+                break
+            if origin == 'e' and rounds < self.remutations and not np.all(mask):
+                # rejected children get another chance with a new mutation
+                rounds += 1
+                candidates = space.clip_indexes(self.mutation(candidates[~mask].copy(), probability, rng=rng))
+                stats['remutations'] += len(candidates)
+                continue
+            origin = 'r'
+            attempts += 1
+            if attempts > self.max_attempts:
+                # no free grid points left for the conditions, they are dropped one after another
+                attempts = 0
+                if min_distance > 1:
+                    min_distance = 0
+                elif reject_evaluated:
+                    reject_evaluated = False
+                else:
+                    new.append(space.random_indexes(missing, rng))
+                    created += ['r'] * missing
+                    stats['random_fills'] += missing
+                    break
+            candidates = space.random_indexes(missing, rng)
+        return np.concatenate(new), np.array(created, dtype='U1'), stats
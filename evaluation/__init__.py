@@ -0,0 +1,2 @@
+from .pipeline import EvaluationPipeline, is_asynchronous
+from .scheduler import BenchScheduler, ThreadedBenchScheduler, ProcessPoolBenchScheduler, single_shot_batch
@@ -0,0 +1,153 @@
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+
+
+def is_asynchronous(function):
+    """
+    :return: True if the function is a coroutine function or an asynchronous generator function
+    """
+    return inspect.iscoroutinefunction(function) or inspect.isasyncgenfunction(function)
+
+
+class EvaluationPipeline:
+    """
+    Class that runs the bench in a background thread, so the laser stage can move and shoot while the GA does
+    selection, fitness calculation and logging.
+    The bench thread runs an asyncio event loop. The bench function (apply_on_bench or the batch version) can be a
+    regular function or a coroutine function. All submitted measurements are queued and performed one after another in
+    the submission order, so the bench does not wait for Python between two parameter sets.
+    Bookkeeping work (e.g. logging) can be sent to a second background thread with run_in_background.
+    """
+
+    def __init__(self, apply_on_bench=None, apply_on_bench_batch=None):
+        if apply_on_bench is None and apply_on_bench_batch is None:
+            raise ValueError("Evaluation pipeline needs a bench function or a batch bench function.")
+        self.apply_on_bench = apply_on_bench
+        self.apply_on_bench_batch = apply_on_bench_batch
+        self.loop = None
+        self.thread = None
+        self.background = None
+        self._bench_lock = None
+
+    def start(self):
+        """
+        Function starts the bench thread and the bookkeeping thread.
+        :return: self
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='bench', daemon=True)
+        self.thread.start()
+        # the lock is created in the bench thread so it belongs to its event loop
+        self._bench_lock = asyncio.run_coroutine_threadsafe(self._create_lock(), self.loop).result()
+        self.background = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='bookkeeping')
+        return self
+
+    def close(self):
+        """
+        Function waits for the queued bookkeeping work, cancels measurements that are still queued (e.g. after an
+        error) and stops both threads.
+        """
+        if self.background is not None:
+            self.background.shutdown(wait=True)
+            self.background = None
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self._cancel_pending(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            self.loop = None
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    async def _create_lock():
+        return asyncio.Lock()
+
+    @staticmethod
+    async def _cancel_pending():
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _shoot(self, parameter_set):
+        fault_class = self.apply_on_bench(parameter_set)
+        if inspect.isawaitable(fault_class):
+            fault_class = await fault_class
+        return fault_class
+
+    async def _measure(self, parameter_set, shots):
+        async with self._bench_lock:
+            return [await self._shoot(parameter_set) for _ in range(shots)]
+
+    async def _measure_batch(self, batch, futures):
+        async with self._bench_lock:
+            try:
+                results = self.apply_on_bench_batch(batch)
+                if inspect.isawaitable(results):
+                    results = await results
+                if hasattr(results, '__aiter__'):
+                    i = 0
+                    async for fault_classes in results:
+                        futures[i].set_result(list(fault_classes))
+                        i += 1
+                else:
+                    for future, fault_classes in zip(futures, results):
+                        future.set_result(list(fault_classes))
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def submit(self, parameter_set, shots):
+        """
+        Function queues the measurement of one parameter set.
+        :param parameter_set: ParameterSet solution
+        :param shots: number of laser shots
+        :return: concurrent.futures.Future with the list of fault classes
+        """
+        return asyncio.run_coroutine_threadsafe(self._measure(parameter_set, shots), self.loop)
+
+    def submit_batch(self, batch):
+        """
+        Function queues a batch of measurements. If the batch bench function is not set, every pair of the batch is
+        queued separately with the single shot bench function.
+        :param batch: list of (ParameterSet, number of shots) pairs
+        :return: list of concurrent.futures.Future objects with the lists of fault classes, one for every pair
+        """
+        if self.apply_on_bench_batch is None:
+            return [self.submit(ps, shots) for ps, shots in batch]
+        futures = [concurrent.futures.Future() for _ in batch]
+        asyncio.run_coroutine_threadsafe(self._measure_batch(batch, futures), self.loop)
+        return futures
+
+    def measure(self, parameter_sets, shots):
+        """
+        Function queues all parameter sets at once and yields the results as the bench finishes them, so the caller
+        can process finished measurements while the bench continues with the next ones.
+        :param parameter_sets: list of ParameterSet solutions
+        :param shots: number of laser shots for every parameter set, or a list with the number for each of them
+        :return: generator of (ParameterSet, list of fault classes) pairs, in the order of completion
+        """
+        parameter_sets = list(parameter_sets)
+        if isinstance(shots, int):
+            shots = [shots] * len(parameter_sets)
+        futures = self.submit_batch(list(zip(parameter_sets, shots)))
+        index = {future: i for i, future in enumerate(futures)}
+        for future in concurrent.futures.as_completed(futures):
+            yield parameter_sets[index[future]], future.result()
+
+    def run_in_background(self, function, *args, **kwargs):
+        """
+        Function runs bookkeeping work (e.g. logging) in the background thread. The functions are executed one after
+        another in the submission order.
+        :return: concurrent.futures.Future with the result of the function
+        """
+        return self.background.submit(function, *args, **kwargs)
@@ -0,0 +1,143 @@
+import abc
+import concurrent.futures
+import inspect
+import os
+import random
+import numpy as np
+
+
+def single_shot_batch(apply_on_bench):
+    """
+    Function wraps a single shot bench function (e.g. dummy_cartography.apply_bench_parameter) into a batch bench
+    function.
+    :param apply_on_bench: function that takes a ParameterSet and returns one fault class
+    :return: batch bench function
+    """
+    def apply_on_bench_batch(batch):
+        for parameter_set, shots in batch:
+            yield [apply_on_bench(parameter_set) for _ in range(shots)]
+    return apply_on_bench_batch
+
+
+class BenchScheduler(abc.ABC):
+    """
+    Base class for schedulers that shard a batch of measurements across several bench workers.
+    The scheduler implements the batch bench protocol, so it is used as the batch bench function of the GA, e.g.
+    GeneticAlgorithm(..., apply_on_bench_batch_function=scheduler.apply_on_bench_batch).
+    The batch is split into contiguous shards (one per worker), so every bench keeps the order given by the sort
+    function. Results are returned in the order of the batch, so the GA updates the TESTED list in the same order
+    regardless of which worker finishes first.
+    If the seed is set, every shard gets its own seed derived from the seed, the batch number and the shard number, so
+    the results do not depend on the timing of the workers (for a given number of workers).
+    """
+
+    def __init__(self, number_of_workers, seed=None):
+        self.number_of_workers = number_of_workers
+        self.seed = seed
+        self.batch_counter = 0
+
+    @abc.abstractmethod
+    def _submit(self, worker_index, shard, seed):
+        """
+        Function starts the measurement of one shard on one worker.
+        :return: concurrent.futures.Future with a list of lists of fault classes
+        """
+
+    def shard_seeds(self, number_of_shards):
+        if self.seed is None:
+            return [None] * number_of_shards
+        seeds = np.random.SeedSequence(self.seed, spawn_key=(self.batch_counter,)).spawn(number_of_shards)
+        return [int(s.generate_state(1)[0]) for s in seeds]
+
+    def apply_on_bench_batch(self, batch):
+        """
+        Function splits the batch across the workers and yields the fault classes in the order of the batch.
+        :param batch: list of (ParameterSet, number of shots) pairs
+        :return: generator of lists of fault classes, one list for every pair in the batch
+        """
+        batch = list(batch)
+        shards = [shard for shard in np.array_split(np.arange(len(batch)), self.number_of_workers) if len(shard)]
+        seeds = self.shard_seeds(len(shards))
+        self.batch_counter += 1
+        futures = []
+        for i, (shard, seed) in enumerate(zip(shards, seeds)):
+            futures.append(self._submit(i, [batch[j] for j in shard], seed))
+        for future in futures:
+            for fault_classes in future.result():
+                yield fault_classes
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ThreadedBenchScheduler(BenchScheduler):
+    """
+    Scheduler for independent bench handles in the same process (e.g. several benches connected to the host).
+    Every handle is a batch bench function and runs its shard in its own thread. Handles that accept a 'seed' keyword
+    argument get the seed of their shard.
+    """
+
+    def __init__(self, bench_functions, seed=None):
+        super().__init__(len(bench_functions), seed)
+        self.bench_functions = list(bench_functions)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.bench_functions),
+                                                              thread_name_prefix='bench')
+
+    @staticmethod
+    def _run(bench_function, shard, seed):
+        if seed is not None and 'seed' in inspect.signature(bench_function).parameters:
+            return [list(fault_classes) for fault_classes in bench_function(shard, seed=seed)]
+        return [list(fault_classes) for fault_classes in bench_function(shard)]
+
+    def _submit(self, worker_index, shard, seed):
+        return self.executor.submit(self._run, self.bench_functions[worker_index], shard, seed)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+_process_bench = None
+
+
+def _init_process_bench(bench_factory):
+    global _process_bench
+    _process_bench = bench_factory()
+
+
+def _measure_in_process(shard, seed):
+    if seed is not None:
+        np.random.seed(seed)
+        random.seed(seed)
+    if hasattr(_process_bench, 'apply_bench_batch'):
+        results = _process_bench.apply_bench_batch(shard)
+    else:
+        results = single_shot_batch(_process_bench.apply_bench_parameter)(shard)
+    return [list(fault_classes) for fault_classes in results]
+
+
+class ProcessPoolBenchScheduler(BenchScheduler):
+    """
+    Scheduler for simulated benches that runs the shards in a pool of processes.
+    Every process creates its own bench with bench_factory (e.g. the dummy_cartography class), and uses
+    apply_bench_batch of the bench if it exists, otherwise apply_bench_parameter.
+    If the seed is set, the global random generators of the process are seeded with the seed of the shard.
+    """
+
+    def __init__(self, bench_factory, processes=None, seed=None):
+        processes = processes or os.cpu_count()
+        super().__init__(processes, seed)
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes,
+                                                               initializer=_init_process_bench,
+                                                               initargs=(bench_factory,))
+
+    def _submit(self, worker_index, shard, seed):
+        return self.executor.submit(_measure_in_process, shard, seed)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
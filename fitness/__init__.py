@@ -1 +1,2 @@
-from .fitness import FAULT, set_fitness_values, maldini_fitness, percentage_fitness
\ No newline at end of file
+from .fitness import FAULT, set_fitness_values, maldini_fitness, maldini_fitness_per_shot, percentage_fitness, \
+    percentage_fitness_vectorized, percentage_fitness_bounds, fitness_bounds, AdaptiveMeasurement
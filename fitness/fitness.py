@@ -1,5 +1,8 @@
 import collections
 import operator
+from statistics import NormalDist
+import numpy as np
+from random_generator import as_generator
 
 
 class fault_class:
@@ -54,6 +57,24 @@ def maldini_fitness(fault_classes):
     :param fault_classes:
     :return: fitness value of the given fault class (numeric value) for GA evaluations
     """
+    return _maldini_fitness(fault_classes, 1)
+    # return 4 + 1.2 * counter[fault_type.FAIL.value] + 0.5 * counter[fault_type.MUTE.value] + 0.2 * counter[
+    #     fault_type.PASS.value], FAULT['mix'].name
+
+
+def maldini_fitness_per_shot(fault_classes, reference_shots=5):
+    """
+    maldini_fitness with the number of shots of every fault class scaled to reference_shots shots (default: the default
+    nb_measurements of the GA). With reference_shots shots the value is the same as the value of maldini_fitness, and
+    values of solutions with different numbers of shots can be compared, so it can be used with AdaptiveMeasurement.
+    :param fault_classes:
+    :param reference_shots: number of shots the counts of the fault classes are scaled to
+    :return: fitness value and string name of fault class
+    """
+    return _maldini_fitness(fault_classes, reference_shots / len(fault_classes))
+
+
+def _maldini_fitness(fault_classes, scale):
     if len(set(fault_classes)) == 1:
         f = FAULT[fault_classes[0]]
         return f.fitness, f.name
@@ -63,10 +84,8 @@ def maldini_fitness(fault_classes):
     ordered.sort(key=operator.attrgetter('fitness'), reverse=True)
     total = 4
     for coeff, fault in zip([1.2, 0.5, 0.2], ordered):
-        total = total + coeff * counter[fault.id]
+        total = total + coeff * counter[fault.id] * scale
     return total, FAULT['mix'].name
-    # return 4 + 1.2 * counter[fault_type.FAIL.value] + 0.5 * counter[fault_type.MUTE.value] + 0.2 * counter[
-    #     fault_type.PASS.value], FAULT['mix'].name
 
 
 def percentage_fitness(fault_classes):
@@ -83,3 +102,133 @@ def percentage_fitness(fault_classes):
         f = FAULT[key]
         total = total + f.fitness * counter[key]
     return total/sum(counter.values()), FAULT['mix'].name
+
+
+def percentage_fitness_vectorized(fault_classes):
+    """
+    percentage_fitness of many parameter sets with the same number of shots at once.
+    :param fault_classes: matrix of fault classes, one row with the shots of every parameter set
+    :return: array of fitness values and array of fault class names
+    """
+    fault_classes = np.asarray(fault_classes)
+    if fault_classes.size == 0:
+        return np.zeros(len(fault_classes)), np.full(len(fault_classes), None, dtype=object)
+    unique, inverse = np.unique(fault_classes, return_inverse=True)
+    inverse = inverse.reshape(fault_classes.shape)
+    values = np.array([FAULT[f].fitness for f in unique.tolist()], dtype=np.float64)[inverse]
+    names = np.array([FAULT[f].name for f in unique.tolist()], dtype=object)[inverse[:, 0]]
+    names[np.any(inverse != inverse[:, :1], axis=1)] = FAULT['mix'].name
+    return values.mean(axis=1), names
+
+
+# vectorized version, used by the random search for batches with a fixed number of shots
+percentage_fitness.vectorized = percentage_fitness_vectorized
+# the value is the mean over the shots, so values of solutions with different numbers of shots can be compared
+# (maldini_fitness counts the shots of every fault class and grows with their number, its variant per_shot does not)
+percentage_fitness.mean_of_shots = True
+maldini_fitness_per_shot.mean_of_shots = True
+maldini_fitness.per_shot = maldini_fitness_per_shot
+
+
+def percentage_fitness_bounds(fault_classes, confidence=0.95):
+    """
+    Confidence interval of the percentage_fitness value, which is the mean of the fitness values of the shots.
+    Normal approximation of the mean, clipped to the smallest and the largest fitness value of the fault classes.
+    :param fault_classes: list of fault classes of the shots
+    :param confidence: confidence level of the interval
+    :return: lower and upper bound of the fitness value
+    """
+    fitness_values = [f.fitness for key, f in FAULT.items() if key != 'mix']
+    low, high = min(fitness_values), max(fitness_values)
+    values = np.array([FAULT[f].fitness for f in fault_classes], dtype=np.float64)
+    if len(values) < 2:
+        return low, high
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * values.std(ddof=1) / np.sqrt(len(values))
+    return float(max(values.mean() - half_width, low)), float(min(values.mean() + half_width, high))
+
+
+def fitness_bounds(fault_classes, fitness_func=percentage_fitness, confidence=0.95, resamples=200, rng=None):
+    """
+    Confidence interval of the fitness value calculated by fitness_func from the fault classes of the shots.
+    For percentage_fitness the interval is calculated directly, for other fitness functions (e.g.
+    maldini_fitness_per_shot) it is estimated by bootstrap resampling of the shots. The interval of a count-based
+    fitness (e.g. maldini_fitness) gets wider with more shots.
+    :param fault_classes: list of fault classes of the shots
+    :param fitness_func: fitness function
+    :param confidence: confidence level of the interval
+    :param resamples: number of bootstrap resamples
+    :param rng: numpy Generator of the bootstrap, default: the default generator of the random_generator module
+    :return: lower and upper bound of the fitness value
+    """
+    if fitness_func is percentage_fitness:
+        return percentage_fitness_bounds(fault_classes, confidence)
+    fault_classes = np.array(fault_classes)
+    samples = fault_classes[as_generator(rng).integers(0, len(fault_classes), size=(resamples, len(fault_classes)))]
+    values = [fitness_func(list(sample))[0] for sample in samples]
+    low, high = np.percentile(values, [50 - 50 * confidence, 50 + 50 * confidence])
+    return float(low), float(high)
+
+
+class AdaptiveMeasurement:
+    """
+    Policy that decides how many laser shots are performed with one parameter set, used instead of a fixed number of
+    measurements (nb_measurements of the GA).
+    First, min_shots shots are performed. If all of them have the same fault class, the measurement stops. Otherwise,
+    more shots are performed until the confidence interval of the fitness value is at most 2 * tolerance wide, or
+    max_shots is reached.
+    The fitness function has to be a mean over the shots (attribute mean_of_shots, e.g. percentage_fitness): the value
+    of a count-based fitness grows with the number of shots, so solutions with more shots would score higher and its
+    interval would never get narrower. A count-based fitness with a variant per shot (attribute per_shot) is replaced
+    by it, maldini_fitness by maldini_fitness_per_shot.
+    """
+
+    def __init__(self, min_shots=3, max_shots=10, tolerance=1.0, confidence=0.95):
+        if min_shots < 1 or max_shots < min_shots:
+            raise ValueError("Adaptive measurement needs 1 <= min_shots <= max_shots.")
+        self.min_shots = min_shots
+        self.max_shots = max_shots
+        self.tolerance = tolerance
+        self.confidence = confidence
+
+    @staticmethod
+    def fitness_function(fitness_func):
+        """
+        :return: fitness function that is used with the adaptive measurement instead of fitness_func
+        :raise ValueError: if the fitness function is not a mean over the shots and has no variant per shot
+        """
+        if getattr(fitness_func, 'mean_of_shots', False):
+            return fitness_func
+        if hasattr(fitness_func, 'per_shot'):
+            return fitness_func.per_shot
+        raise ValueError(f"Adaptive measurement needs a fitness function that is a mean over the shots (e.g. "
+                         f"percentage_fitness), {fitness_func.__name__} depends on the number of shots.")
+
+    def first_shots(self):
+        return self.min_shots
+
+    def more_shots(self, fault_classes, fitness_func=percentage_fitness, rng=None):
+        """
+        :param fault_classes: fault classes of the shots performed so far
+        :param fitness_func: fitness function of the GA (see fitness_function)
+        :param rng: numpy Generator of the GA, used for the bootstrap of fitness_bounds
+        :return: number of additional shots, 0 if the measurement is finished
+        """
+        fitness_func = self.fitness_function(fitness_func)
+        n = len(fault_classes)
+        if n < self.min_shots:
+            return self.min_shots - n
+        if n >= self.max_shots or len(set(fault_classes)) == 1:
+            return 0
+        low, high = fitness_bounds(fault_classes, fitness_func, self.confidence, rng=rng)
+        if high - low <= 2 * self.tolerance:
+            return 0
+        # estimate of the number of shots for the required width, based on the width of the current interval
+        needed = int(np.ceil(n * ((high - low) / (2 * self.tolerance)) ** 2))
+        return max(1, min(needed, self.max_shots) - n)
+
+    def __str__(self):
+        return f"{{\"min_shots\" : {self.min_shots}, \"max_shots\" : {self.max_shots}, " \
+               f"\"tolerance\" : {self.tolerance}, \"confidence\" : {self.confidence}}}"
+
+    def __repr__(self):
+        return self.__str__()
@@ -1,16 +1,26 @@
-from typing import List, Callable, Tuple
+import numbers
+from typing import List, Callable, Tuple, Iterable
 import ga_log
 from parameters import *
 from sort_algorithms import xy_snake_sort
-from initializations import random_initialization, TaguchiInitialization
-from crossovers import uniform_crossover
-from selections import roulette_wheel
-from mutations import uniform_mutation
+from population import Population
+from initializations import random_initialization, vectorized_random_initialization, TaguchiInitialization
+from crossovers import uniform_crossover, uniform_crossover_vectorized
+from selections import roulette_wheel, roulette_wheel_vectorized, elite_indexes
+from mutations import uniform_mutation, uniform_mutation_vectorized
 from local_search import hooke_jeeves
 from fitness import fitness, percentage_fitness
 from stop_conditions import stop_cond_iterations, stop_cond_fitness
 from helper import TabuList
-import operator
+from helper.checkpoint import dump_checkpoint, write_checkpoint, load_checkpoint, get_state, set_state
+from evaluation import EvaluationPipeline, is_asynchronous
+from profiling import NULL_PROFILER
+from random_generator import as_generator, with_rng
+from diversity import NoveltyFilter
+import copy
+import os
+import random
+import numpy as np
 
 # type hint definition for GA function parameters
 StoppingFunction = Callable[[List[ParameterSet], int], bool]
@@ -20,6 +30,10 @@ SelectionFunction = Callable[[List[ParameterSet], int], Tuple[List[ParameterSet]
 CrossoverFunction = Callable[[ParameterSet, ParameterSet], ParameterSet]
 MutationFunction = Callable[[ParameterSet, float], ParameterSet]
 LocalSearch = Callable[[List[ParameterSet], Callable, dict], List[ParameterSet]]
+BatchBenchFunction = Callable[[List[Tuple[ParameterSet, int]]], Iterable[List[int]]]
+VectorizedSelectionFunction = Callable[[np.ndarray, int], Tuple[np.ndarray, np.ndarray]]
+VectorizedCrossoverFunction = Callable[[np.ndarray, np.ndarray], np.ndarray]
+VectorizedMutationFunction = Callable[[np.ndarray, float], np.ndarray]
 
 
 class GeneticAlgorithm:
@@ -40,24 +54,63 @@ class GeneticAlgorithm:
                  crossover: CrossoverFunction = uniform_crossover,
                  mutation: MutationFunction = uniform_mutation,
                  local_search: LocalSearch = hooke_jeeves,
-                 fitness_func=percentage_fitness
+                 fitness_func=percentage_fitness,
+                 apply_on_bench_batch_function: BatchBenchFunction = None,
+                 asynchronous_evaluation=False,
+                 cache=None,
+                 surrogate=None,
+                 surrogate_fraction=0.3,
+                 profiler=None,
+                 rng=None,
+                 novelty_filter=None
                  ):
         set_parameter_limits_from_ini_file(parameter_info_file)
         self.apply_on_bench = apply_on_bench_function
+        self.apply_on_bench_batch = apply_on_bench_batch_function
         self.set_carto_iteration = carto_set_iteration
         self.pop_size = pop_size
         self.mutation_prob = mutation_probability
         self.elite_size = elite_size
         self.nb_measurements = nb_measurements
+        self.shots = 0  # shots fired by the GA, the local search budget is counted with it
+        if not isinstance(nb_measurements, numbers.Integral):
+            # the adaptive measurement needs a fitness that does not grow with the number of shots
+            fitness_func = nb_measurements.fitness_function(fitness_func)
         self.max_iterations = max_iterations
-        self.initialization = initialization_function
+        # numpy Generator of all random decisions of the GA, the operators get it as the keyword argument 'rng'
+        # (operators without the parameter are wrapped and use their own random source)
+        self.rng = as_generator(rng)
+        self.initialization = with_rng(initialization_function)
         self.stop_condition = stop_condition
         self.sort = sort_function
-        self.selection = selection
-        self.crossover = crossover
-        self.mutate = mutation
-        self.local_search = local_search
+        self.selection = with_rng(selection)
+        self.crossover = with_rng(crossover)
+        self.mutate = with_rng(mutation)
+        # local searches with a state (e.g. hooke_jeeves) are created for every GA with their factory
+        factory = getattr(local_search, 'factory', None)
+        self.local_search = with_rng(factory() if factory is not None else local_search)
         self.fitness = fitness_func
+        # coroutine bench functions can only be used with the evaluation pipeline
+        self.asynchronous = asynchronous_evaluation or is_asynchronous(apply_on_bench_function) or \
+            is_asynchronous(apply_on_bench_batch_function)
+        self.pipeline = None
+        self.log = None
+        self.generation = 0  # generation that is being evaluated, used for logging the shots
+        # a user cache (e.g. PersistentCache) replaces the TESTED list and is kept after the run
+        self.clear_cache_after_run = cache is None
+        self.cache_stats = None  # statistics of the evaluation cache (hits, misses, ...) at the end of the last run
+        if cache is not None:
+            self.TESTED = cache
+        self.surrogate = surrogate
+        self.surrogate_fraction = surrogate_fraction
+        self.predicted = set()  # grid indexes of solutions with fitness predicted by the surrogate
+        # function (population, iteration) -> population called after every iteration, set by islands.IslandModel
+        self.migration = None
+        # timers and counters of the phases, profiling.Profiler, the NULL_PROFILER does nothing
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        # duplicate elimination of the reproduction, the default filter removes only exact duplicates
+        self.novelty_filter = novelty_filter if novelty_filter is not None else \
+            NoveltyFilter(reject_evaluated=False, remutations=0)
 
     def generate_population(self):
         """
@@ -65,7 +118,7 @@ class GeneticAlgorithm:
         function set by the user.
         :return: list of solutions representing population
         """
-        pop = self.initialization(self.pop_size)
+        pop = self.initialization(self.pop_size, rng=self.rng)
         if self.pop_size != len(pop):
             self.pop_size = len(pop)
             print("Because of initialization technique, the population size is updated to size", self.pop_size)
@@ -75,19 +128,160 @@ class GeneticAlgorithm:
         if parameter_set.fitness is not None:
             return parameter_set.fitness, parameter_set.fault_class
 
+        if self.apply_on_bench_batch is not None or self.pipeline is not None:
+            return self.evaluate_parameter_sets([parameter_set])[0]
+
         fitness, fault_class = self.TESTED.get(parameter_set, (None, None))
         if fitness is not None:
+            self.profiler.count('cache_hits')
             return fitness, fault_class
+        self.profiler.count('cache_misses')
 
         fault_classes = list()
-        for n in range(0, self.nb_measurements):
-            ## Apply bench parameters & LFI
-            fault_class = self.apply_on_bench(parameter_set)
-            fault_classes.append(fault_class)
+        with self.profiler.phase('bench'):
+            shots = self.first_shots()
+            while shots > 0:
+                for n in range(0, shots):
+                    ## Apply bench parameters & LFI
+                    fault_class = self.apply_on_bench(parameter_set)
+                    fault_classes.append(fault_class)
+                shots = self.more_shots(fault_classes)
+        return self.record_evaluation(parameter_set, fault_classes)
+
+    def first_shots(self):
+        """
+        :return: number of shots performed first with every parameter set
+        """
+        if isinstance(self.nb_measurements, numbers.Integral):
+            return self.nb_measurements
+        return self.nb_measurements.first_shots()
+
+    def more_shots(self, fault_classes):
+        """
+        :param fault_classes: fault classes of the shots performed so far with one parameter set
+        :return: number of additional shots (always 0 for a fixed number of measurements)
+        """
+        if isinstance(self.nb_measurements, numbers.Integral):
+            return 0
+        return self.nb_measurements.more_shots(fault_classes, self.fitness, rng=self.rng)
+
+    def record_evaluation(self, parameter_set, fault_classes):
+        """
+        Function calculates the fitness from the fault classes of the shots, and stores the result in the TESTED list,
+        the log and the surrogate model.
+        :return: fitness value and fault class
+        """
         fit, fault = self.fitness(fault_classes)
-        self.TESTED.add(parameter_set, (fit, fault))
+        self.TESTED.add(parameter_set, (fit, fault), fault_classes)
+        self.profiler.count('evaluations')
+        self.profiler.count('shots', len(fault_classes))
+        self.shots += len(fault_classes)
+        with self.profiler.phase('logging'):
+            self.log_shots(parameter_set, fault_classes)
+        if self.surrogate is not None:
+            self.surrogate.update([parameter_set], fit, fault)
         return fit, fault
 
+    def evaluate_parameter_sets(self, parameter_sets: List[ParameterSet]):
+        """
+        Function that evaluates a list of solutions in the given order.
+        Solutions that already have a fitness value or are in the TESTED list are not sent to the bench.
+        If the batch bench function is set, all the other solutions are sent to the bench in one call as a list of
+        (parameter set, number of shots) pairs, solutions with the same parameter values are sent only once, and the
+        fault classes are processed as the bench streams them back. With asynchronous evaluation, all the other
+        solutions are queued in the evaluation pipeline at once and fitness values are calculated while the bench works
+        on the next solutions. Otherwise, evaluate_parameter_set is called for every solution.
+        :param parameter_sets: list of ParameterSet solutions
+        :return: list of (fitness, fault class) tuples in the order of parameter_sets
+        """
+        if self.apply_on_bench_batch is None and self.pipeline is None:
+            return [self.evaluate_parameter_set(ps) for ps in parameter_sets]
+
+        results = [None] * len(parameter_sets)
+        pending = dict()  # solutions with the same parameter values are shot only once
+        for i, ps in enumerate(parameter_sets):
+            if ps.fitness is not None:
+                results[i] = ps.fitness, ps.fault_class
+                continue
+            fitness, fault_class = self.TESTED.get(ps, (None, None))
+            if fitness is not None:
+                self.profiler.count('cache_hits')
+                results[i] = fitness, fault_class
+                continue
+            self.profiler.count('cache_misses')
+            pending.setdefault(ps, []).append(i)
+
+        # with adaptive measurement, solutions that need more shots are measured again in the next round
+        shots = {ps: self.first_shots() for ps in pending}
+        fault_classes = {ps: [] for ps in pending}
+        # the results are streamed, so the bench phase includes the fitness calculation of the measured solutions
+        with self.profiler.phase('bench'):
+            while shots:
+                batch = list(shots.items())
+                if self.pipeline is not None:
+                    measurements = self.pipeline.measure([ps for ps, _ in batch], [n for _, n in batch])
+                else:
+                    measurements = zip([ps for ps, _ in batch], self.apply_on_bench_batch(batch))
+                shots = dict()
+                for ps, measured in measurements:
+                    fault_classes[ps] += list(measured)
+                    more = self.more_shots(fault_classes[ps])
+                    if more > 0:
+                        shots[ps] = more
+                        continue
+                    fit, fault = self.record_evaluation(ps, fault_classes[ps])
+                    for i in pending[ps]:
+                        results[i] = fit, fault
+        return results
+
+    def screen_parameter_sets(self, parameter_sets: List[ParameterSet]):
+        """
+        Function that evaluates the solutions of a population, using the surrogate model (if set) to decide which
+        solutions are sent to the bench.
+        The surrogate predicts the fitness of all solutions that were not evaluated yet, and only a fraction
+        (surrogate_fraction) of them, the most promising and the most uncertain ones, are evaluated on the bench. The
+        other solutions get the predicted fitness and fault class. Predictions are never stored in the TESTED list,
+        and solutions with a predicted fitness are screened again when they are evaluated in the next generation.
+        :param parameter_sets: list of ParameterSet solutions
+        :return: list of (fitness, fault class) tuples in the order of parameter_sets
+        """
+        if self.surrogate is None:
+            return self.evaluate_parameter_sets(parameter_sets)
+
+        results = [None] * len(parameter_sets)
+        candidates = []
+        for i, ps in enumerate(parameter_sets):
+            predicted = ps.get_grid_index() in self.predicted
+            if ps.fitness is not None and not predicted:
+                results[i] = ps.fitness, ps.fault_class
+                continue
+            fitness, fault_class = self.TESTED.get(ps, (None, None))
+            if fitness is not None:
+                results[i] = fitness, fault_class
+                continue
+            if predicted:
+                ps.update_fitness()
+            candidates.append(i)
+
+        chosen = candidates
+        if self.surrogate.ready() and candidates:
+            with self.profiler.phase('surrogate'):
+                predicted_fitness, uncertainty, predicted_fault = self.surrogate.predict([parameter_sets[i]
+                                                                                          for i in candidates])
+                number = int(np.ceil(self.surrogate_fraction * len(candidates)))
+                selected = self.surrogate.select(predicted_fitness, uncertainty, number)
+            self.profiler.count('surrogate_predictions', len(candidates) - len(selected))
+            chosen = [candidates[j] for j in sorted(selected)]
+            for j in np.setdiff1d(np.arange(len(candidates)), selected):
+                i = candidates[j]
+                results[i] = float(predicted_fitness[j]), predicted_fault[j]
+                self.predicted.add(parameter_sets[i].get_grid_index())
+
+        for i, result in zip(chosen, self.evaluate_parameter_sets([parameter_sets[i] for i in chosen])):
+            results[i] = result
+            self.predicted.discard(parameter_sets[i].get_grid_index())
+        return results
+
     def evaluate_pop(self, population: List[ParameterSet]):
         """
         Function that evaluates the complete population of solutions.
@@ -98,9 +292,10 @@ class GeneticAlgorithm:
         :return: population
         """
         if self.sort is not None:
-            population = self.sort(population)
-        for parameter_set in population:
-            parameter_set.fitness, parameter_set.fault_class = self.evaluate_parameter_set(parameter_set)
+            with self.profiler.phase('sort'):
+                population = self.sort(population)
+        for parameter_set, result in zip(population, self.screen_parameter_sets(population)):
+            parameter_set.fitness, parameter_set.fault_class = result
         return population
 
     def reproduce(self, population):
@@ -109,20 +304,42 @@ class GeneticAlgorithm:
         :param population: list of ParameterSet solutions, population
         :return: new population after reproduction
         """
-        newpop = []
-        parents1, parents2 = self.selection(population, self.elite_size)
+        children = []
+        with self.profiler.phase('selection'):
+            parents1, parents2 = self.selection(population, self.elite_size, rng=self.rng)
         for par1, par2 in zip(parents1, parents2):
-            child = self.crossover(par1, par2)
-            self.mutate(child, self.mutation_prob)
-            newpop += [child]
-            child.created = 'e'
-        newpop += sorted(population, key=operator.attrgetter('fitness'), reverse=True)[:self.elite_size]
-        newpop = set(newpop)
-        while len(newpop) < self.pop_size:
-            ps = ParameterSet()
-            ps.created = 'r'
-            newpop.add(ps)
-        return list(newpop)
+            with self.profiler.phase('crossover'):
+                child = self.crossover(par1, par2, rng=self.rng)
+            with self.profiler.phase('mutation'):
+                self.mutate(child, self.mutation_prob, rng=self.rng)
+            children += [child]
+        fits = np.array([ps.fitness for ps in population], dtype=np.float64)
+        elite = [population[i] for i in elite_indexes(fits, self.elite_size).tolist()]
+        names = ParameterSet.get_param_names()
+        genes = ParameterSet.get_space().encode(np.array([[getattr(ps, name) for name in names]
+                                                          for ps in elite + children]).reshape(-1, len(names)))
+        genes, created = self.filter_children(genes[:len(elite)], genes[len(elite):])
+        newpop = list(elite)
+        for indexes, origin in zip(genes, created):
+            ps = ParameterSet.from_indexes(indexes)
+            ps.created = str(origin)
+            newpop += [ps]
+        return newpop
+
+    def filter_children(self, elite, children):
+        """
+        Function removes duplicates (and, depending on the novelty filter, too close or already evaluated solutions)
+        from the children and fills the population up to the population size.
+        :param elite: gene matrix of the elite
+        :param children: gene matrix of the children
+        :return: gene matrix of the new individuals and their origins ('e' evolved, 'r' random)
+        """
+        with self.profiler.phase('novelty'):
+            genes, created, stats = self.novelty_filter(elite, children, self.pop_size - len(elite), self.TESTED,
+                                                        rng=self.rng)
+        for name, value in stats.items():
+            self.profiler.count(name, value)
+        return genes, created
 
     def one_iteration(self, population):
         """
@@ -131,32 +348,185 @@ class GeneticAlgorithm:
         :param population: list of solutions
         :return: list of solutions, population
         """
-        population = self.reproduce(population)
-        population = self.evaluate_pop(population)
+        with self.profiler.phase('reproduce'):
+            population = self.reproduce(population)
+        with self.profiler.phase('evaluation'):
+            population = self.evaluate_pop(population)
         if self.local_search is not None:
-            population = self.local_search(population, self.evaluate_parameter_set, self.TESTED)
+            with self.profiler.phase('local_search'):
+                population = self.local_search(population, self.local_search_evaluation(), self.TESTED,
+                                               rng=self.rng)
         return population
 
-    def run(self, log_file_name='logfile.pkl'):
+    def local_search_evaluation(self):
+        """
+        :return: evaluation function given to the local search, evaluate_parameter_sets for batched local searches
+        (e.g. batched_hooke_jeeves), evaluate_parameter_set otherwise. It has the attributes 'shots' (function that
+        returns the number of shots fired by the GA so far) and 'first_shots', used by the shot budget of the
+        LocalSearchScheduler.
+        """
+        batched = getattr(self.local_search, 'batched', False)
+        evaluate = self.evaluate_parameter_sets if batched else self.evaluate_parameter_set
+
+        def evaluate_probes(solutions):
+            self.profiler.count('local_search_probes', len(solutions) if batched else 1)
+            return evaluate(solutions)
+        evaluate_probes.shots = lambda: self.shots
+        evaluate_probes.first_shots = self.first_shots
+        return evaluate_probes
+
+    def log_generation(self, iteration, population):
+        """
+        Function that logs one generation. With asynchronous evaluation, a copy of the population is written in the
+        background while the bench evaluates the next generation.
+        """
+        with self.profiler.phase('logging'):
+            if self.pipeline is not None:
+                self.pipeline.run_in_background(self.log.log_generation, iteration, copy.deepcopy(population))
+            else:
+                self.log.log_generation(iteration, population)
+
+    def log_shots(self, parameter_set, fault_classes):
+        if self.log is not None:
+            self.log.log_shots(self.generation, parameter_set, fault_classes)
+
+    def checkpoint_state(self, iteration, population):
+        """
+        :param iteration: iteration that was logged last
+        :param population: evaluated population of that iteration
+        :return: dictionary with the state of the run: population, evaluation cache, visited solutions of the local
+        search, states of the stop condition and the surrogate, and the states of the generator of the GA and of the
+        global numpy and random generators
+        """
+        return {'algorithm_info': str(self),
+                'parameter limits': ParameterSet.get_param_limits(as_dict=True),
+                'iteration': iteration,
+                'pop_size': self.pop_size,
+                'population': population,
+                'predicted': self.predicted,
+                # a persistent cache is already on the disk
+                'cache': None if hasattr(self.TESTED, 'commit') else get_state(self.TESTED),
+                'local_search_visited': getattr(self.local_search, 'visited', None),
+                'stop_condition': get_state(self.stop_condition),
+                'surrogate': get_state(self.surrogate),
+                'rng_state': self.rng.bit_generator.state,
+                # the global generators are used by the simulated benches
+                'numpy_random_state': np.random.get_state(),
+                'random_state': random.getstate()}
+
+    def save_checkpoint(self, file_name, iteration, population):
+        """
+        Function writes the checkpoint of the run atomically. With asynchronous evaluation, the state is pickled
+        immediately and written in the background, after the log of the generation.
+        """
+        with self.profiler.phase('checkpoint'):
+            if hasattr(self.TESTED, 'commit'):
+                self.TESTED.commit()
+            data = dump_checkpoint(self.checkpoint_state(iteration, population))
+            if self.pipeline is not None:
+                self.pipeline.run_in_background(write_checkpoint, file_name, data)
+            else:
+                write_checkpoint(file_name, data)
+
+    def restore_checkpoint(self, state):
+        """
+        Function restores the state saved by save_checkpoint.
+        :param state: dictionary returned by helper.load_checkpoint
+        :return: iteration and population of the checkpoint
+        """
+        if state['parameter limits'] != ParameterSet.get_param_limits(as_dict=True):
+            raise ValueError("Checkpoint was created with different parameter limits", state['parameter limits'])
+        self.pop_size = state['pop_size']
+        self.predicted = state['predicted']
+        set_state(self.TESTED, state['cache'])
+        visited = getattr(self.local_search, 'visited', None)
+        if visited is not None and state['local_search_visited'] is not None:
+            visited.clear()
+            visited.update(state['local_search_visited'])
+        set_state(self.stop_condition, state['stop_condition'])
+        set_state(self.surrogate, state['surrogate'])
+        if 'rng_state' in state:
+            self.rng.bit_generator.state = state['rng_state']
+        np.random.set_state(state['numpy_random_state'])
+        random.setstate(state['random_state'])
+        return state['iteration'], state['population']
+
+    def run(self, log_file_name='logfile.pkl', log_class=ga_log.Log, checkpoint_file=None, checkpoint_every=1,
+            resume_from=None):
         """
         Function that runs the genetic algorithm until the stop condition is satisfied.
         It creates the population and then iterates the algorithm. It prints out the iteration number.
+        With asynchronous evaluation, the bench runs in the evaluation pipeline for the duration of the run.
+        With a checkpoint file, the state of the run is saved after every checkpoint_every logged generations, and the
+        run can be continued with resume_from. The resumed run continues with the same population, cache and random
+        generator states, so it does the same steps as the run without the interruption and the solutions evaluated
+        before the checkpoint are not shot again. The log is kept up to the checkpoint and continued.
+        :param log_file_name: name of the log file (or directory for the ga_log.StreamingLog)
+        :param log_class: ga_log.Log (pickled generations) or ga_log.StreamingLog (append-only column files)
+        :param checkpoint_file: file of the checkpoints, default: None (no checkpoints) or resume_from when resuming
+        :param checkpoint_every: number of generations between two checkpoints
+        :param resume_from: checkpoint file to continue from, a new run is started if the file does not exist
         :return: final population after the genetic algorithm
         """
-        log = ga_log.Log(log_file_name, str(self), ParameterSet.get_param_limits(as_dict=True))
-        population = self.generate_population()
-        population = self.evaluate_pop(population)
-        iteration = 0
+        state = None
+        if resume_from is not None:
+            if os.path.exists(resume_from):
+                state = load_checkpoint(resume_from)
+            else:
+                print("Checkpoint", resume_from, "does not exist, starting a new run.")
+            checkpoint_file = resume_from if checkpoint_file is None else checkpoint_file
+        if hasattr(self.local_search, 'reset'):
+            self.local_search.reset()
+        if state is not None:
+            iteration, population = self.restore_checkpoint(state)
+        resume = {} if state is None else {'resume_iteration': iteration}
+        self.log = log_class(log_file_name, str(self), ParameterSet.get_param_limits(as_dict=True), **resume)
+        if self.asynchronous:
+            self.pipeline = EvaluationPipeline(self.apply_on_bench, self.apply_on_bench_batch).start()
+        self.profiler.run_started()
+        try:
+            if state is None:
+                self.generation = 0
+                self.predicted = set()
+                with self.profiler.phase('initialization'):
+                    population = self.generate_population()
+                with self.profiler.phase('evaluation'):
+                    population = self.evaluate_pop(population)
+                iteration = 0
+                self.profiler.generation_finished(iteration)
+            else:
+                print("Resuming from iteration", iteration)
+                if iteration:
+                    self.set_carto_iteration(iteration)
+            # the checkpointed generation was already logged and its stop condition checked
+            resumed = state is not None
 
-        ## Main loop
-        while not self.stop_condition(population, iteration, self.max_iterations):
-            print("Iteration: ", iteration + 1)
-            log.log_generation(iteration, population)
-            population = self.one_iteration(population)
-            iteration += 1
-            self.set_carto_iteration(iteration)
+            ## Main loop
+            while resumed or not self.stop_condition(population, iteration, self.max_iterations):
+                print("Iteration: ", iteration + 1)
+                if not resumed:
+                    self.log_generation(iteration, population)
+                    if checkpoint_file is not None and iteration % checkpoint_every == 0:
+                        self.save_checkpoint(checkpoint_file, iteration, population)
+                resumed = False
+                self.generation = iteration + 1
+                population = self.one_iteration(population)
+                iteration += 1
+                if self.migration is not None:
+                    with self.profiler.phase('migration'):
+                        population = self.migration(population, iteration)
+                self.set_carto_iteration(iteration)
+                self.profiler.generation_finished(iteration)
+        finally:
+            if self.pipeline is not None:
+                self.pipeline.close()
+                self.pipeline = None
+            self.log.close()
+            self.log = None
 
-        self.TESTED.clear()
+        self.cache_stats = self.TESTED.stats()
+        if self.clear_cache_after_run:
+            self.TESTED.clear()
         return population
 
     def __str__(self):
@@ -181,7 +551,8 @@ class GeneticAlgorithm:
         return {"pop_size": self.pop_size,
                 "mutation_prob": self.mutation_prob,
                 "elite_size": self.elite_size,
-                "nb_measurements": self.nb_measurements,
+                "nb_measurements": int(self.nb_measurements) if isinstance(self.nb_measurements, numbers.Integral) else
+                str(self.nb_measurements),
                 "max_iterations": self.max_iterations,
                 "initialization": self.initialization.__name__,
                 "stop_condition": self.stop_condition.__name__,
@@ -207,8 +578,17 @@ class TaguchiGA(GeneticAlgorithm):
                  mutation: MutationFunction = uniform_mutation,
                  local_search: LocalSearch = hooke_jeeves,
                  fitness_func=percentage_fitness,
-                 factor_levels=2, strength=2):
-        self.ta = TaguchiInitialization(run_size=pop_size, factor_levels=factor_levels, strength=strength)
+                 factor_levels=2, strength=2, oa_cache=None,
+                 apply_on_bench_batch_function: BatchBenchFunction = None,
+                 asynchronous_evaluation=False,
+                 cache=None,
+                 surrogate=None,
+                 surrogate_fraction=0.3,
+                 profiler=None,
+                 rng=None,
+                 novelty_filter=None):
+        self.ta = TaguchiInitialization(run_size=pop_size, factor_levels=factor_levels, strength=strength,
+                                        cache=oa_cache)
         super().__init__(apply_on_bench_function,
                          carto_set_iteration=carto_set_iteration,
                          pop_size=self.ta.run_size,
@@ -221,4 +601,128 @@ class TaguchiGA(GeneticAlgorithm):
                          stop_condition=stop_condition,
                          sort_function=sort_function,
                          selection=selection, crossover=crossover, mutation=mutation, local_search=local_search,
-                         fitness_func=fitness_func)
+                         fitness_func=fitness_func,
+                         apply_on_bench_batch_function=apply_on_bench_batch_function,
+                         asynchronous_evaluation=asynchronous_evaluation,
+                         cache=cache,
+                         surrogate=surrogate,
+                         surrogate_fraction=surrogate_fraction,
+                         profiler=profiler,
+                         rng=rng,
+                         novelty_filter=novelty_filter)
+
+
+class VectorizedGA(GeneticAlgorithm):
+    """
+    Genetic Algorithm that keeps the population in a Population (structure of arrays) instead of a list of
+    ParameterSet objects. Selection, crossover, mutation, clipping and duplicate removal work on whole arrays, which
+    makes large populations against simulated benches feasible.
+    Selection, crossover and mutation have to be the vectorized operators (e.g. roulette_wheel_vectorized,
+    uniform_crossover_vectorized, uniform_mutation_vectorized). Sort functions, local search, stop conditions and the
+    bench function get ParameterSet objects (views or detached copies), same as in the GeneticAlgorithm.
+    """
+
+    def __init__(self, apply_on_bench_function, carto_set_iteration,
+                 pop_size=30, mutation_probability=0.05, elite_size=2,
+                 nb_measurements=5,
+                 max_iterations=50,
+                 parameter_info_file: str = None,
+                 initialization_function: InitializationFunction = vectorized_random_initialization,
+                 stop_condition=stop_cond_iterations,
+                 sort_function: SortingFunction = None,
+                 selection: VectorizedSelectionFunction = roulette_wheel_vectorized,
+                 crossover: VectorizedCrossoverFunction = uniform_crossover_vectorized,
+                 mutation: VectorizedMutationFunction = uniform_mutation_vectorized,
+                 local_search: LocalSearch = hooke_jeeves,
+                 fitness_func=percentage_fitness,
+                 apply_on_bench_batch_function: BatchBenchFunction = None,
+                 asynchronous_evaluation=False,
+                 cache=None,
+                 surrogate=None,
+                 surrogate_fraction=0.3,
+                 profiler=None,
+                 rng=None,
+                 novelty_filter=None
+                 ):
+        super().__init__(apply_on_bench_function, carto_set_iteration,
+                         pop_size=pop_size,
+                         mutation_probability=mutation_probability,
+                         elite_size=elite_size,
+                         nb_measurements=nb_measurements,
+                         max_iterations=max_iterations,
+                         parameter_info_file=parameter_info_file,
+                         initialization_function=initialization_function,
+                         stop_condition=stop_condition,
+                         sort_function=sort_function,
+                         selection=selection, crossover=crossover, mutation=mutation, local_search=local_search,
+                         fitness_func=fitness_func,
+                         apply_on_bench_batch_function=apply_on_bench_batch_function,
+                         asynchronous_evaluation=asynchronous_evaluation,
+                         cache=cache,
+                         surrogate=surrogate,
+                         surrogate_fraction=surrogate_fraction,
+                         profiler=profiler,
+                         rng=rng,
+                         novelty_filter=novelty_filter)
+
+    def generate_population(self):
+        """
+        Function that generates the initial Population. Initializations returning a list of ParameterSet solutions
+        (e.g. Taguchi or LHS) are converted to a Population.
+        :return: Population
+        """
+        pop = super().generate_population()
+        if not isinstance(pop, Population):
+            pop = Population.from_parameter_sets(pop)
+        return pop
+
+    def evaluate_pop(self, population: Population):
+        """
+        Function that evaluates all individuals of the Population without a fitness value.
+        If a sort function is set, the Population is reordered first, the sort function gets a list of detached
+        ParameterSet solutions that remember their row in the Population. Sort functions with an order method
+        (e.g. PathPlanner) get the gene matrix directly.
+        :param population: Population
+        :return: evaluated Population
+        """
+        with self.profiler.phase('sort'):
+            if hasattr(self.sort, 'order'):
+                population = population.take(self.sort.order(population.values()))
+            elif self.sort is not None:
+                population = population.take([ps.index for ps in self.sort(population.to_parameter_sets())])
+        pending = np.flatnonzero(~population.evaluated | np.isin(population.grid_indexes(), list(self.predicted)))
+        results = self.screen_parameter_sets([population[i].detach() for i in pending])
+        for i, (fit, fault) in zip(pending, results):
+            population.fitness[i], population.fault_class[i] = fit, fault
+        return population
+
+    def reproduce(self, population: Population):
+        """
+        Function that creates a new generation with array operations.
+        Children are created from the selected parent indexes, mutated and clipped, the elite is kept and the children
+        go through the novelty filter, which removes duplicates and fills the Population up to the population size.
+        :param population: evaluated Population
+        :return: new Population
+        """
+        with self.profiler.phase('selection'):
+            parents1, parents2 = self.selection(population.fitness, self.pop_size - self.elite_size, rng=self.rng)
+        with self.profiler.phase('crossover'):
+            children = self.crossover(population.genes[parents1], population.genes[parents2], rng=self.rng)
+        with self.profiler.phase('mutation'):
+            children = ParameterSet.get_space().clip_indexes(self.mutate(children, self.mutation_prob, rng=self.rng))
+        elite = population.take(elite_indexes(population.fitness, self.elite_size))
+        # elite goes first, so evaluated copies are kept when removing duplicates
+        genes, created = self.filter_children(elite.genes, children)
+        return Population.concatenate([elite, Population(genes, created=created)])
+
+    def one_iteration(self, population: Population):
+        with self.profiler.phase('reproduce'):
+            population = self.reproduce(population)
+        with self.profiler.phase('evaluation'):
+            population = self.evaluate_pop(population)
+        if self.local_search is not None:
+            with self.profiler.phase('local_search'):
+                population = Population.from_parameter_sets(
+                    self.local_search(population.to_parameter_sets(), self.local_search_evaluation(), self.TESTED,
+                                      rng=self.rng))
+        return population
@@ -1,14 +1,269 @@
+import json
+import os
 import pickle
+import numpy as np
+from parameters import ParameterSet
+from population import Population
 
 
 class Log:
-    def __init__(self, file_name, ga_info, param_limits):
+    def __init__(self, file_name, ga_info, param_limits, resume_iteration=None):
+        """
+        :param resume_iteration: if set and the file exists, the run is resumed from a checkpoint: the log is kept up to
+        this generation and the next generations are appended
+        """
+        if resume_iteration is not None and os.path.exists(file_name):
+            self.file = open(file_name, 'r+b')
+            self._truncate(resume_iteration)
+            return
         self.file = open(file_name, 'wb')
         pickle.dump({'algorithm_info': ga_info}, self.file)
         pickle.dump({'parameter limits': param_limits}, self.file)
+        self.file.flush()
+
+    def _truncate(self, iteration):
+        # generations logged after the checkpoint (and a record cut by a crash) are removed
+        end = 0
+        while True:
+            try:
+                record = pickle.load(self.file)
+            except (EOFError, pickle.UnpicklingError):
+                break
+            if record.get('iteration', -1) > iteration:
+                break
+            end = self.file.tell()
+        self.file.seek(end)
+        self.file.truncate()
 
     def log_generation(self, iteration, population):
         pickle.dump({'iteration': iteration, 'population': population}, self.file)
+        self.file.flush()
+
+    def log_shots(self, generation, parameter_set, fault_classes):
+        # shots are only kept by the StreamingLog
+        pass
+
+    def log_shots_batch(self, generation, population, fault_classes):
+        pass
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
 
     def __del__(self):
-        self.file.close()
+        self.close()
+
+
+# column files of the StreamingLog: file name -> numpy data type
+# 'genes' columns have one value per parameter (float64 if the parameter space has float parameters), other columns
+# one value per row
+INDIVIDUAL_COLUMNS = {'generation': np.int32, 'genes': np.int32, 'fitness': np.float64, 'fault_class': np.int16,
+                      'created': np.uint8}
+SHOT_COLUMNS = {'shot_generation': np.int32, 'shot_genes': np.int32, 'shot_fault_class': np.int64}
+INDEX_COLUMNS = 3  # generation, first row, number of rows
+
+
+class StreamingLog:
+    """
+    Log that writes a run into a directory of append-only column files, one raw binary file per column.
+    Every logged generation appends one row per individual (generation, genes, fitness, fault class, origin) and one
+    row to the generation index, and every measurement appends one row per shot (generation, genes, fault class id).
+    Files are flushed after every write, so a crash loses at most the row that was being written.
+    The log is read with the LogReader, which memory-maps the columns.
+    Fault class names are stored as codes, the names of the codes are in 'fault_classes.txt' (line number is the code,
+    -1 is no fault class).
+    When a run is resumed from a checkpoint (resume_iteration), the rows of the generations after the checkpoint are
+    removed and the next generations are appended.
+    """
+
+    def __init__(self, file_name, ga_info, param_limits, resume_iteration=None):
+        self.directory = file_name
+        space = ParameterSet.get_space()
+        self.genes_dtype = np.dtype(INDIVIDUAL_COLUMNS['genes'] if space.integer else np.float64)
+        self.width = len(space.names)
+        self.fault_class_codes = dict()
+        self.rows = 0
+        columns = list(INDIVIDUAL_COLUMNS) + list(SHOT_COLUMNS) + ['index']
+        if resume_iteration is not None and os.path.exists(os.path.join(self.directory, 'meta.json')):
+            self._truncate(resume_iteration)
+            self.files = {column: open(os.path.join(self.directory, column + '.bin'), 'ab') for column in columns}
+            self.fault_class_file = open(os.path.join(self.directory, 'fault_classes.txt'), 'a')
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as f:
+            json.dump({'format': 1, 'algorithm_info': ga_info, 'parameter limits': param_limits,
+                       'parameter names': space.names, 'parameter types': space.types,
+                       'genes type': self.genes_dtype.name}, f, default=str)
+        self.files = {column: open(os.path.join(self.directory, column + '.bin'), 'wb') for column in columns}
+        self.fault_class_file = open(os.path.join(self.directory, 'fault_classes.txt'), 'w')
+
+    def _column_itemsize(self, column):
+        dtype = {**INDIVIDUAL_COLUMNS, **SHOT_COLUMNS, 'index': np.int64}[column]
+        if column in ('genes', 'shot_genes'):
+            return self.genes_dtype.itemsize * self.width
+        return np.dtype(dtype).itemsize * (INDEX_COLUMNS if column == 'index' else 1)
+
+    def _truncate(self, iteration):
+        """
+        Function removes the rows written after the given generation: generations with a higher number, shots of the
+        later generations and rows after the last complete generation.
+        """
+        reader = LogReader(self.directory)
+        kept = int(np.sum(reader.index[:, 0] <= iteration))
+        self.rows = int(reader.index[kept - 1, 1] + reader.index[kept - 1, 2]) if kept else 0
+        shots = int(np.searchsorted(reader.shots['generation'], iteration, side='right'))
+        self.fault_class_codes = {name: code for code, name in enumerate(reader.fault_class_names[:-1])}
+        del reader
+        lengths = {column: self.rows for column in INDIVIDUAL_COLUMNS}
+        lengths.update({column: shots for column in SHOT_COLUMNS})
+        lengths['index'] = kept
+        for column, rows in lengths.items():
+            with open(os.path.join(self.directory, column + '.bin'), 'r+b') as f:
+                f.truncate(rows * self._column_itemsize(column))
+
+    def _append(self, column, array):
+        f = self.files[column]
+        f.write(np.ascontiguousarray(array).tobytes())
+        f.flush()
+
+    def _fault_class_code(self, fault_class):
+        if fault_class is None:
+            return -1
+        if fault_class not in self.fault_class_codes:
+            self.fault_class_codes[fault_class] = len(self.fault_class_codes)
+            self.fault_class_file.write(f"{fault_class}\n")
+            self.fault_class_file.flush()
+        return self.fault_class_codes[fault_class]
+
+    def log_generation(self, iteration, population):
+        """
+        Function appends all individuals of the population and the index entry of the generation.
+        :param iteration: GA iteration (generation number)
+        :param population: Population or list of ParameterSet solutions
+        """
+        if not isinstance(population, Population):
+            population = Population.from_parameter_sets(population)
+        size = len(population)
+        self._append('generation', np.full(size, iteration, dtype=INDIVIDUAL_COLUMNS['generation']))
+        self._append('genes', population.values().astype(self.genes_dtype))
+        self._append('fitness', population.fitness.astype(INDIVIDUAL_COLUMNS['fitness']))
+        self._append('fault_class', np.array([self._fault_class_code(f) for f in population.fault_class],
+                                             dtype=INDIVIDUAL_COLUMNS['fault_class']))
+        self._append('created', np.frombuffer(''.join(population.created).encode('ascii'),
+                                              dtype=INDIVIDUAL_COLUMNS['created']))
+        # index is written last, a generation is in the index only if all of its rows were written
+        self._append('index', np.array([iteration, self.rows, size], dtype=np.int64))
+        self.rows += size
+
+    def log_shots(self, generation, parameter_set, fault_classes):
+        """
+        Function appends the shots of one measurement.
+        :param generation: generation that was evaluated when the shots were performed
+        :param parameter_set: ParameterSet solution
+        :param fault_classes: list of fault class ids returned by the bench
+        """
+        shots = len(fault_classes)
+        genes = [getattr(parameter_set, name) for name in ParameterSet.get_param_names()]
+        self._append('shot_generation', np.full(shots, generation, dtype=SHOT_COLUMNS['shot_generation']))
+        self._append('shot_genes', np.tile(np.array(genes, dtype=self.genes_dtype), shots))
+        self._append('shot_fault_class', np.array(fault_classes, dtype=SHOT_COLUMNS['shot_fault_class']))
+
+    def log_shots_batch(self, generation, population, fault_classes):
+        """
+        Function appends the shots of many measurements with one write per column.
+        :param generation: generation (or batch) that was evaluated when the shots were performed
+        :param population: Population of the measured parameter sets
+        :param fault_classes: list with the list of fault class ids of every parameter set
+        """
+        lengths = [len(f) for f in fault_classes]
+        shots = sum(lengths)
+        self._append('shot_generation', np.full(shots, generation, dtype=SHOT_COLUMNS['shot_generation']))
+        self._append('shot_genes', np.repeat(population.values().astype(self.genes_dtype), lengths, axis=0))
+        self._append('shot_fault_class', np.array([f for row in fault_classes for f in row],
+                                                  dtype=SHOT_COLUMNS['shot_fault_class']))
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.fault_class_file.close()
+
+    def __del__(self):
+        if hasattr(self, 'files'):
+            self.close()
+
+
+class LogReader:
+    """
+    Lazy reader of a StreamingLog directory. Columns are memory-mapped, so only the rows that are used are read from
+    the disk. Rows written after the last complete generation (e.g. after a crash) are ignored.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        self.algorithm_info = meta['algorithm_info']
+        self.param_limits = meta['parameter limits']
+        self.names = meta['parameter names']
+        self.genes_dtype = np.dtype(meta.get('genes type', 'int32'))
+        with open(os.path.join(directory, 'fault_classes.txt')) as f:
+            self.fault_class_names = np.array([line.rstrip('\n') for line in f] + [None], dtype=object)
+        self.index = self._map('index', np.int64, INDEX_COLUMNS)
+        self.rows = int(self.index[-1, 1] + self.index[-1, 2]) if len(self.index) else 0
+        shots = min(self._rows('shot_generation', np.int32, 1),
+                    self._rows('shot_genes', self.genes_dtype, len(self.names)),
+                    self._rows('shot_fault_class', np.int64, 1))
+        self.shots = {'generation': self._map('shot_generation', np.int32, 1, shots),
+                      'genes': self._map('shot_genes', self.genes_dtype, len(self.names), shots),
+                      'fault_class': self._map('shot_fault_class', np.int64, 1, shots)}
+
+    def _rows(self, column, dtype, width):
+        size = os.path.getsize(os.path.join(self.directory, column + '.bin'))
+        return size // (np.dtype(dtype).itemsize * width)
+
+    def _map(self, column, dtype, width, rows=None):
+        rows = self._rows(column, dtype, width) if rows is None else rows
+        shape = (rows, width) if width > 1 else (rows,)
+        if rows == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.directory, column + '.bin'), dtype=dtype, mode='r', shape=shape)
+
+    def generations(self):
+        """
+        :return: array with the numbers of the logged generations
+        """
+        return np.array(self.index[:, 0])
+
+    def columns(self, iteration=None):
+        """
+        Function returns the individual columns (memory-mapped, not copied) of one generation or of all generations.
+        :param iteration: generation number or None for all generations
+        :return: dictionary column name -> array
+        """
+        if iteration is None:
+            start, end = 0, self.rows
+        else:
+            row = np.flatnonzero(self.index[:, 0] == iteration)
+            if len(row) == 0:
+                raise KeyError("Generation", iteration, "is not in the log.")
+            start, end = int(self.index[row[0], 1]), int(self.index[row[0], 1] + self.index[row[0], 2])
+        columns = {'generation': self._map('generation', np.int32, 1, self.rows),
+                   'genes': self._map('genes', self.genes_dtype, len(self.names), self.rows),
+                   'fitness': self._map('fitness', np.float64, 1, self.rows),
+                   'fault_class': self._map('fault_class', np.int16, 1, self.rows),
+                   'created': self._map('created', np.uint8, 1, self.rows)}
+        return {name: column[start:end] for name, column in columns.items()}
+
+    def population(self, iteration):
+        """
+        Function loads one generation as a Population.
+        :param iteration: generation number
+        :return: Population
+        """
+        columns = self.columns(iteration)
+        return Population.from_values(columns['genes'], fitness=columns['fitness'],
+                                      fault_class=self.fault_class_names[columns['fault_class']],
+                                      created=list(np.array(columns['created']).tobytes().decode('ascii')))
+
+    def __len__(self):
+        return len(self.index)
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import sqlite3
+from parameters import ParameterSet, DEFAULT_PARAMETERS
+
+
+class PersistentCache:
+    """
+    Evaluation cache stored in an SQLite database, so the evaluated parameter sets are shared between runs (GA, random
+    search, local search) on the same chip.
+    It has the same interface as the TabuList (get, add, clear), so it can be used as the TESTED list of the GA.
+    Entries are keyed by the chip name and stored in the tables of the hash of the parameter limits, so runs with
+    different chips or different parameter grids do not mix. Every entry keeps the fitness value, the fault class and
+    the history of all shots.
+    """
+
+    def __init__(self, file_name, chip='default', commit_every=1):
+        """
+        :param file_name: path to the SQLite database, created if it does not exist
+        :param chip: name of the chip (or bench configuration) the measurements belong to
+        :param commit_every: number of added entries after which the changes are written to the disk
+        """
+        self.file_name = file_name
+        self.chip = chip
+        self.commit_every = commit_every
+        self.__uncommitted = 0
+        self.hits = 0
+        self.misses = 0
+        self.__space = None
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+
+    @staticmethod
+    def limits_hash(space=None):
+        """
+        :param space: ParameterSpace, default: the current space
+        :return: short hash of the parameter limits (and of the names and types of the parameters)
+        """
+        space = ParameterSet.get_space() if space is None else space
+        limits = space.limits.tolist()
+        if space.names != DEFAULT_PARAMETERS:
+            limits = [space.names, space.types, limits]
+        limits = json.dumps(limits)
+        return hashlib.sha1(limits.encode()).hexdigest()[:16]
+
+    def _schema(self):
+        """
+        Function prepares the tables and statements of the current ParameterSpace. Every space (parameter names, types
+        and limits) has its own tables, named by the limits hash, so the cache can be created before the parameter
+        limits are set and one database can hold runs with different parameter spaces.
+        :return: ParameterSpace
+        """
+        space = ParameterSet.get_space()
+        if space is self.__space:
+            return space
+        limits = self.limits_hash(space)
+        self.__evaluations, self.__shots = f'evaluations_{limits}', f'shots_{limits}'
+        names = [f'"{name}"' for name in space.names]
+        columns = ', '.join(f'{name} {"INTEGER" if t == "int" else "REAL"}' for name, t in zip(names, space.types))
+        key = ', '.join(['chip'] + names)
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS {self.__evaluations} (chip TEXT, {columns}, '
+                                f'fitness REAL, fault_class TEXT, PRIMARY KEY ({key}))')
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS {self.__shots} (chip TEXT, {columns}, fault_class)')
+        self.connection.execute(f'CREATE INDEX IF NOT EXISTS {self.__shots}_key ON {self.__shots} ({key})')
+        self.connection.commit()
+        where = ' AND '.join(f'{name} = ?' for name in ['chip'] + names)
+        self.__select = f'SELECT fitness, fault_class FROM {self.__evaluations} WHERE {where}'
+        self.__select_shots = f'SELECT fault_class FROM {self.__shots} WHERE {where} ORDER BY rowid'
+        placeholders = ', '.join(['?'] * (len(names) + 1))
+        self.__insert = f'INSERT OR REPLACE INTO {self.__evaluations} VALUES ({placeholders}, ?, ?)'
+        self.__insert_shot = f'INSERT INTO {self.__shots} VALUES ({placeholders}, ?)'
+        self.__space = space
+        return space
+
+    def _key(self, parameter_set):
+        # the statements are prepared for the space of the key, so the key is computed before they are used
+        space = self._schema()
+        return (self.chip,) + tuple(space.to_python([getattr(parameter_set, name) for name in space.names]))
+
+    def get(self, key, default_value):
+        """
+        :param key: ParameterSet solution
+        :param default_value: returned if the solution was not evaluated on this chip
+        :return: (fitness, fault class) of the solution
+        """
+        db_key = self._key(key)
+        row = self.connection.execute(self.__select, db_key).fetchone()
+        if row is None:
+            self.misses += 1
+            return default_value
+        self.hits += 1
+        return row[0], row[1]
+
+    def get_fault_classes(self, key):
+        """
+        :param key: ParameterSet solution
+        :return: list of fault classes of all the shots performed with the solution on this chip
+        """
+        db_key = self._key(key)
+        return [row[0] for row in self.connection.execute(self.__select_shots, db_key)]
+
+    def add(self, key, value=None, fault_classes=None):
+        """
+        Function stores the evaluation of a solution.
+        :param key: ParameterSet solution
+        :param value: (fitness, fault class) tuple
+        :param fault_classes: list of fault classes of the shots, appended to the shot history
+        """
+        db_key = self._key(key)
+        fitness, fault_class = value if value is not None else (None, None)
+        self.connection.execute(self.__insert, db_key + (fitness, fault_class))
+        if fault_classes is not None:
+            self.connection.executemany(self.__insert_shot, [db_key + (f,) for f in fault_classes])
+        self.__uncommitted += 1
+        if self.__uncommitted >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self.__uncommitted = 0
+
+    def clear(self):
+        """
+        Function deletes all the entries of this chip and the current parameter limits from the database.
+        """
+        self._schema()
+        self.connection.execute(f'DELETE FROM {self.__evaluations} WHERE chip = ?', (self.chip,))
+        self.connection.execute(f'DELETE FROM {self.__shots} WHERE chip = ?', (self.chip,))
+        self.commit()
+
+    def stats(self):
+        """
+        :return: dictionary with the number of entries of this chip and the number of hits and misses
+        """
+        lookups = self.hits + self.misses
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def __contains__(self, key):
+        db_key = self._key(key)
+        return self.connection.execute(self.__select, db_key).fetchone() is not None
+
+    def __len__(self):
+        self._schema()
+        return self.connection.execute(f'SELECT COUNT(*) FROM {self.__evaluations} WHERE chip = ?',
+                                       (self.chip,)).fetchone()[0]
+
+    def close(self):
+        if getattr(self, 'connection', None) is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
+
+    def __del__(self):
+        self.close()
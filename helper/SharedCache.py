@@ -0,0 +1,48 @@
+from .TabuList import TabuList
+
+
+class SharedCache:
+    """
+    Evaluation cache shared between processes, e.g. between the islands of the islands.IslandModel.
+    The entries are kept in a dictionary proxy of a multiprocessing.Manager, so every process sees the evaluations
+    of the other processes. It has the same interface as the TabuList (get, add, clear), keys are the grid indexes of
+    the solutions. Hits and misses are counted per process. The cache is not bounded.
+    """
+
+    def __init__(self, shared_dict):
+        """
+        :param shared_dict: dictionary created by a multiprocessing.Manager (manager.dict())
+        """
+        self.d = shared_dict
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, key, value=None, fault_classes=None):
+        self.d[TabuList.key(key)] = value
+
+    def get(self, key, default_value):
+        value = self.d.get(TabuList.key(key), None)
+        if value is None:
+            self.misses += 1
+            return default_value
+        self.hits += 1
+        return value
+
+    def stats(self):
+        """
+        :return: dictionary with the size of the cache and the number of hits and misses of this process
+        """
+        lookups = self.hits + self.misses
+        return {'size': len(self.d), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def clear(self):
+        self.d.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return TabuList.key(key) in self.d
+
+    def __len__(self):
+        return len(self.d)
@@ -1,27 +1,92 @@
+import collections
+import time
+
+
 class TabuList:
+    """
+    Bounded cache of evaluated solutions.
+    Solutions are keyed by their grid index (see ParameterSet.get_grid_index), so float and numpy int variants of the
+    same spot are the same entry. When the cache is full, the entries are evicted depending on the policy:
+    - 'fifo': the oldest added entry is evicted,
+    - 'lru': the least recently used (added or found) entry is evicted,
+    - 'ttl': like 'fifo', and additionally entries older than ttl seconds are dropped.
+    The cache counts hits, misses and evictions, see stats().
+    """
+
+    POLICIES = ('fifo', 'lru', 'ttl')
 
-    def __init__(self, max_len=100000):
+    def __init__(self, max_len=100000, policy='fifo', ttl=None):
+        if policy not in TabuList.POLICIES:
+            raise ValueError("Unknown eviction policy", policy, "use one of", TabuList.POLICIES)
+        if policy == 'ttl' and ttl is None:
+            raise ValueError("Time to live (ttl) in seconds has to be set for the 'ttl' eviction policy.")
         self.max_len = max_len
-        self.l = [None] * self.max_len
-        self.d = dict()
-        self.__counter = 0
-
-    def add(self, key, value=None):
-        el = self.l[self.__counter]
-        if el is not None:
-            del self.d[el]
-
-        nb = len(self.d)
-        self.d[key] = value
-        if len(self.d) == nb:
-            return
-        self.l[self.__counter] = key
-        self.__counter = (self.__counter + 1) % self.max_len
+        self.policy = policy
+        self.ttl = ttl
+        self.d = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(parameter_set):
+        get_grid_index = getattr(parameter_set, 'get_grid_index', None)
+        return parameter_set if get_grid_index is None else get_grid_index()
+
+    def _expire(self):
+        now = time.monotonic()
+        while self.d:
+            key, (_, added) = next(iter(self.d.items()))
+            if now - added < self.ttl:
+                return
+            del self.d[key]
+            self.evictions += 1
+
+    def add(self, key, value=None, fault_classes=None):
+        # fault_classes (shot history) is only kept by the PersistentCache
+        key = self.key(key)
+        if self.policy == 'ttl':
+            self.d[key] = (value, time.monotonic())
+            self.d.move_to_end(key)
+            self._expire()
+        else:
+            self.d[key] = value
+            if self.policy == 'lru':
+                self.d.move_to_end(key)
+        while len(self.d) > self.max_len:
+            self.d.popitem(last=False)
+            self.evictions += 1
 
     def get(self, key, default_value):
-        return self.d.get(key, default_value)
+        key = self.key(key)
+        if self.policy == 'ttl':
+            self._expire()
+        if key not in self.d:
+            self.misses += 1
+            return default_value
+        self.hits += 1
+        if self.policy == 'lru':
+            self.d.move_to_end(key)
+        value = self.d[key]
+        return value[0] if self.policy == 'ttl' else value
+
+    def stats(self):
+        """
+        :return: dictionary with the size of the cache and the number of hits, misses and evictions
+        """
+        lookups = self.hits + self.misses
+        return {'size': len(self.d), 'max_len': self.max_len, 'policy': self.policy, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
 
     def clear(self):
-        self.l = [None] * self.max_len
         self.d.clear()
-        self.__counter = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return self.key(key) in self.d
+
+    def __len__(self):
+        return len(self.d)
@@ -1,2 +1,5 @@
 from .helper_functions import *
-from .TabuList import TabuList
\ No newline at end of file
+from .TabuList import TabuList
+from .PersistentCache import PersistentCache
+from .SharedCache import SharedCache
+from .checkpoint import save_checkpoint, load_checkpoint
@@ -0,0 +1,79 @@
+import os
+import pickle
+import tempfile
+import types
+
+CHECKPOINT_FORMAT = 1
+
+
+def get_state(obj):
+    """
+    :param obj: component of the GA (stop condition, surrogate, cache, ...)
+    :return: state of the object to store in a checkpoint, obj.get_state() if the object has it, the attributes of the
+    object for other class instances, None for functions (they do not have a state)
+    """
+    if obj is None or isinstance(obj, (types.FunctionType, types.BuiltinFunctionType)):
+        return None
+    if hasattr(obj, 'get_state'):
+        return obj.get_state()
+    if hasattr(obj, '__dict__'):
+        return dict(vars(obj))
+    return None
+
+
+def set_state(obj, state):
+    """
+    Function restores the state returned by get_state in place, so references to the object stay valid.
+    """
+    if state is None:
+        return
+    if hasattr(obj, 'set_state'):
+        obj.set_state(state)
+    else:
+        vars(obj).update(state)
+
+
+def dump_checkpoint(state):
+    """
+    :param state: dictionary with the state of the algorithm
+    :return: pickled checkpoint, so the state can be written later (e.g. in a background thread) without being copied
+    """
+    return pickle.dumps(dict(state, format=CHECKPOINT_FORMAT), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def write_checkpoint(file_name, data):
+    """
+    Function writes the pickled checkpoint atomically: the data is written to a temporary file in the same directory,
+    synced to the disk and renamed to file_name, so file_name always holds a complete checkpoint, even if the process
+    dies while writing.
+    :param file_name: path of the checkpoint file
+    :param data: bytes returned by dump_checkpoint
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    fd, temporary = tempfile.mkstemp(prefix=os.path.basename(file_name) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, file_name)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def save_checkpoint(file_name, state):
+    write_checkpoint(file_name, dump_checkpoint(state))
+
+
+def load_checkpoint(file_name):
+    """
+    :param file_name: path of the checkpoint file
+    :return: dictionary with the state of the algorithm
+    """
+    with open(file_name, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('format') != CHECKPOINT_FORMAT:
+        raise ValueError("Unknown checkpoint format", state.get('format'), "in", file_name)
+    return state
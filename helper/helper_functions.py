@@ -1,8 +1,8 @@
 import numpy as np
-import random
+from random_generator import as_generator
 
 
-def randrange_float(start, stop, step, precision=0.1):
+def randrange_float(start, stop, step, precision=0.1, rng=None):
     """
     Helper function for getting random float values from a given interval with a step and precision.
     Random value is from an interval [start, stop), the value is < stop.
@@ -11,10 +11,12 @@ def randrange_float(start, stop, step, precision=0.1):
     :param stop: upper bound for the random value, exclusive
     :param step: step of the random float values
     :param precision: precision of the float number
+    :param rng: numpy Generator, default: the default generator of the random_generator module
     :return: Random value from an interval [start, stop) with a given step and precision.
     """
     f = 1 / precision
-    return random.randrange(start * f, stop * f, step * f) / f
+    start, stop, step = (int(round(v * f)) for v in (start, stop, step))
+    return (start + step * int(as_generator(rng).integers((stop - start + step - 1) // step))) / f
 
 
 def converter(obj):
@@ -1 +1,4 @@
-from .initializations import random_initialization, TaguchiInitialization, taguchi_from_file, taguchi_from_example, index_array_to_population, latin_hypercube_sampling_mdu, latin_hypercube_sampling_pydoe2
\ No newline at end of file
+from .initializations import random_initialization, vectorized_random_initialization, TaguchiInitialization, taguchi_from_file, taguchi_from_example, index_array_to_population, latin_hypercube_sampling_mdu, latin_hypercube_sampling_pydoe2
+from .orthogonal_arrays import OrthogonalArrayCache, orthogonal_strength, generate_orthogonal_array
+from .space_filling import space_filling_initialization, sobol_indexes, halton_indexes, lhs_indexes, \
+    maximin_lhs_indexes, stratified_indexes, centered_l2_discrepancy, min_pairwise_distance, design_quality
@@ -1,30 +1,55 @@
 from parameters import *
+from population import Population
+from random_generator import as_generator
 import oapackage  # Orthogonal Array Package
+from . import orthogonal_arrays
 import lhsmdu
 import pyDOE2
 
 # type hint definition for GA initializations function for generating population
-# function takes integer which is the size of the population and returns a list
+# function takes integer which is the size of the population (and the numpy Generator of the GA) and returns a list
 # of parameter sets which are the solutions for the GA
-# InitializationFunction = Callable[[int], List[ParameterSet]]
+# InitializationFunction = Callable[[int, np.random.Generator], List[ParameterSet]]
 
 
-def random_initialization(pop_size):
+def random_initialization(pop_size, rng=None):
     """
     Function that creates a population of solutions (parameter sets) with random values.
     :param pop_size: size of the population
+    :param rng: numpy Generator, default: the default generator of the random_generator module
     :return: list of solutions representing population for GA
     """
+    rng = as_generator(rng)
     pop = set()
     while len(pop) < pop_size:
-        pop.add(ParameterSet())
+        pop.add(ParameterSet.random(rng))
     return list(pop)
 
 
+def vectorized_random_initialization(pop_size, rng=None):
+    """
+    Function that creates a Population of unique solutions with random values, drawn with array operations.
+    :param pop_size: size of the population
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: Population for the VectorizedGA
+    """
+    rng = as_generator(rng)
+    pop = Population.random(pop_size, rng=rng).unique()
+    while len(pop) < pop_size:
+        pop = Population.concatenate([pop, Population.random(pop_size - len(pop), rng=rng)]).unique()
+    return pop
+
+
 class TaguchiInitialization:
     # factor_levels can be int or list of ints (if list should be the size of number of factors)
     # number of factors is number of parameters in parameterSet class
-    def __init__(self, run_size=16, factor_levels=2, strength=2):
+    def __init__(self, run_size=16, factor_levels=2, strength=2, cache=None):
+        """
+        :param run_size: number of runs of the orthogonal array (population size)
+        :param factor_levels: number of levels of every factor (parameter), int or list of ints
+        :param strength: strength of the orthogonal array
+        :param cache: OrthogonalArrayCache of the arrays, default: orthogonal_arrays.default_cache (memory only)
+        """
         self.number_of_factors = ParameterSet.get_parameter_number()
         if isinstance(factor_levels, int):
             self.factor_levels = [factor_levels] * self.number_of_factors
@@ -38,64 +63,85 @@ class TaguchiInitialization:
                 self.factor_levels = factor_levels
         self.run_size = run_size
         self.strength = strength
+        self.cache = cache
 
-    def taguchi_initialization(self, pop_size):
+    def taguchi_initialization(self, pop_size, rng=None):
         """
         Creates population using Taguchi method.
         :param pop_size: size of the population
+        :param rng: numpy Generator of the random grid points within the levels
         :return: list of solutions representing population for GA
         """
 
-        arrayclass = oapackage.arraydata_t(self.factor_levels, self.run_size, self.strength, self.number_of_factors)
-        arrays = [arrayclass.create_root()]
-        for extension_column in range(2, self.number_of_factors):
-            if not arrays:
-                return random_initialization(self.run_size)
-            arrays = oapackage.extend_arraylist([arrays[0]], arrayclass)
-
-        if not arrays:
-            return random_initialization(self.run_size)
-
-        oa_pop = np.array(arrays[0])
-        return [ParameterSet.get_parameterset_from_indexes(oa, self.factor_levels) for oa in oa_pop]
+        cache = self.cache if self.cache is not None else orthogonal_arrays.default_cache
+        oa_pop = cache.get(self.factor_levels, self.run_size, self.strength)
+        if oa_pop is None:
+            print(f"No orthogonal array with {self.run_size} runs, strength {self.strength} and factor levels "
+                  f"{self.factor_levels} was found, the population is initialized randomly.")
+            return random_initialization(self.run_size, rng)
+        return indexes_to_population(ParameterSet.get_space().from_level_indexes(oa_pop, self.factor_levels, rng))
 
 
 def taguchi_from_example(example_index: int):
-    def taguchi_example_to_population(pop_size: int):
+    def taguchi_example_to_population(pop_size: int, rng=None):
         array = np.array(oapackage.exampleArray(example_index))
-        return oa_to_population(array)
+        return oa_to_population(array, rng)
     return taguchi_example_to_population
 
 
-def taguchi_from_file(file_path: str):
-    def taguchi_from_file_to_population(pop_size: int):
-        array = np.genfromtxt(file_path, delimiter=',')
-        return oa_to_population(array)
+def taguchi_from_file(file_path: str, cache=None):
+    """
+    :param file_path: text file with an orthogonal array, e.g. oa.csv
+    :param cache: OrthogonalArrayCache to which the array is added, default: orthogonal_arrays.default_cache
+    :return: initialization function with the array of the file, which is read only once
+    """
+    array = (cache if cache is not None else orthogonal_arrays.default_cache).preload(file_path)
+
+    def taguchi_from_file_to_population(pop_size: int, rng=None):
+        return oa_to_population(array, rng)
     return taguchi_from_file_to_population
 
 
 def index_array_to_population(array):
-    return lambda _: oa_to_population(array)
+    return lambda _, rng=None: oa_to_population(array, rng)
 
 
-def oa_to_population(array):
-    number_of_factors = ParameterSet().get_parameter_number()
+def oa_to_population(array, rng=None):
+    number_of_factors = ParameterSet.get_parameter_number()
     array = array[:, :number_of_factors]
     if array.shape[1] < number_of_factors:
         raise ValueError("Wrong number of parameters in the orthogonal array example used.")
     factor_levels = list(map(lambda col: len(set(col)), array.T))
-    return [ParameterSet.get_parameterset_from_indexes(oa, factor_levels) for oa in array]
+    return indexes_to_population(ParameterSet.get_space().from_level_indexes(array, factor_levels, rng))
+
+
+def indexes_to_population(indexes):
+    """
+    :param indexes: matrix of grid indexes, one row per solution
+    :return: list of ParameterSet solutions
+    """
+    space = ParameterSet.get_space()
+    values = space.decode(indexes.astype(np.int64)).tolist()
+    return [ParameterSet(*space.to_python(row)) for row in values]
 
 
-def latin_hypercube_sampling_mdu(pop_size=15):
-    number_of_factors = ParameterSet().get_parameter_number()
-    array = np.array(lhsmdu.sample(number_of_factors, pop_size)).T  # Latin Hypercube Sampling with multi-dimensional uniformity
-    return [ParameterSet.get_parameterset_from_uniform(ps) for ps in array]
+def latin_hypercube_sampling_mdu(pop_size=15, rng=None):
+    number_of_factors = ParameterSet.get_parameter_number()
+    # lhsmdu draws from the global numpy generator (its randomSeed argument is not used), so the global generator is
+    # seeded from rng for the sampling and restored afterwards
+    global_state = np.random.get_state()
+    np.random.seed(int(as_generator(rng).integers(2 ** 31)))
+    try:
+        array = np.array(lhsmdu.sample(number_of_factors, pop_size)).T  # Latin Hypercube Sampling with multi-dimensional uniformity
+    finally:
+        np.random.set_state(global_state)
+    return indexes_to_population(ParameterSet.get_space().from_uniform(array))
 
 
 def latin_hypercube_sampling_pydoe2(criterion=None):
-    def lhs_pydoe2(pop_size=15):
-        number_of_factors = ParameterSet().get_parameter_number()
-        array = pyDOE2.lhs(number_of_factors, samples=pop_size)
-        return [ParameterSet.get_parameterset_from_uniform(ps) for ps in array]
+    def lhs_pydoe2(pop_size=15, rng=None):
+        number_of_factors = ParameterSet.get_parameter_number()
+        seed = int(as_generator(rng).integers(2 ** 31))  # pyDOE2 takes a seed, not a Generator
+        array = pyDOE2.lhs(number_of_factors, samples=pop_size, random_state=seed)
+        return indexes_to_population(ParameterSet.get_space().from_uniform(array))
     return lhs_pydoe2
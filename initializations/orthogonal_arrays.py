@@ -0,0 +1,203 @@
+import io
+import itertools
+import math
+import multiprocessing
+import os
+import time
+import numpy as np
+import oapackage  # Orthogonal Array Package
+from helper.checkpoint import write_checkpoint
+
+
+def orthogonal_strength(array):
+    """
+    :param array: matrix of level indexes, one row per run
+    :return: largest strength t, for which every combination of levels of every t columns appears equally often
+    """
+    array = np.asarray(array, dtype=np.int64)
+    levels = [len(np.unique(column)) for column in array.T]
+    strength = 0
+    for t in range(1, array.shape[1] + 1):
+        for columns in itertools.combinations(range(array.shape[1]), t):
+            combinations, counts = np.unique(array[:, columns], axis=0, return_counts=True)
+            if len(combinations) != math.prod(levels[c] for c in columns) or np.any(counts != counts[0]):
+                return strength
+        strength = t
+    return strength
+
+
+def oa_exists(factor_levels, run_size, strength):
+    """
+    Necessary condition for an orthogonal array: the run size is a multiple of the number of level combinations of
+    every strength columns. oapackage does not check it and can crash for impossible classes.
+    """
+    return all(run_size % math.prod(c) == 0 for c in itertools.combinations(factor_levels, min(strength,
+                                                                                                len(factor_levels))))
+
+
+def generate_orthogonal_array(factor_levels, run_size, strength, deadline=None):
+    """
+    Function searches one orthogonal array depth first: the arrays of the current column are extended one after
+    another, so a dead end goes back to the next array instead of failing (oapackage.extend_arraylist creates all
+    extensions of a column).
+    :param factor_levels: list with the number of levels of every factor
+    :param run_size: number of runs
+    :param strength: strength of the array
+    :param deadline: time.perf_counter() value after which the search stops, None for no limit
+    :return: matrix of level indexes (int64) or None if no array was found
+    """
+    if not oa_exists(factor_levels, run_size, strength):
+        return None
+    arrayclass = oapackage.arraydata_t(list(factor_levels), run_size, strength, len(factor_levels))
+    options = oapackage.OAextend()
+    options.setAlgorithmAuto(arrayclass)
+    stack = [[arrayclass.create_root()]]
+    while stack:
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        if not stack[-1]:
+            stack.pop()
+            continue
+        array = stack[-1].pop(0)
+        if array.n_columns >= len(factor_levels):
+            return np.array(array, dtype=np.int64)
+        stack.append(list(oapackage.extend_arraylist([array], arrayclass, options)))
+    return None
+
+
+def _generate_in_process(connection, factor_levels, run_size, strength):
+    connection.send(generate_orthogonal_array(factor_levels, run_size, strength))
+    connection.close()
+
+
+class OrthogonalArrayCache:
+    """
+    Cache of orthogonal arrays keyed by (factor levels, run size, strength), the number of factors is the length of
+    the factor levels. Arrays are kept in memory and, with a directory, as .npy files, so the arrays of repeated
+    campaigns are generated only once.
+    Arrays are generated in a separate process, which is stopped after time_limit seconds: the extension of
+    oapackage can blow up combinatorially for large run sizes and strengths, and one call can not be interrupted.
+    Arrays from files (e.g. oa.csv) are added with preload.
+    """
+
+    def __init__(self, directory=None, time_limit=10.0, start_method=None):
+        """
+        :param directory: directory of the array files, None to keep the arrays only in memory
+        :param time_limit: time limit of the generation of one array in seconds, None to generate in this process
+        without a limit
+        :param start_method: multiprocessing start method of the generation process, default: the default method of
+        the platform
+        """
+        self.directory = directory
+        self.time_limit = time_limit
+        self.start_method = start_method
+        self.arrays = dict()  # key -> array, None if no array was found
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(factor_levels, run_size, strength):
+        return tuple(int(level) for level in factor_levels), int(run_size), int(strength)
+
+    def file_name(self, key):
+        factor_levels, run_size, strength = key
+        return os.path.join(self.directory, f"oa_{run_size}_{strength}_{'-'.join(map(str, factor_levels))}.npy")
+
+    def get(self, factor_levels, run_size, strength=2, time_limit=None):
+        """
+        :param factor_levels: list with the number of levels of every factor
+        :param run_size: number of runs
+        :param strength: strength of the array
+        :param time_limit: time limit of the generation, default: time limit of the cache
+        :return: orthogonal array (matrix of level indexes, one row per run) or None if there is no array in the cache
+        and none was found in the time limit
+        """
+        key = self.key(factor_levels, run_size, strength)
+        if key in self.arrays:
+            return self.arrays[key]
+        array = self._find(key)
+        if array is None and self.directory is not None and os.path.exists(self.file_name(key)):
+            array = np.load(self.file_name(key))
+        if array is None:
+            array = self.generate(*key, time_limit=self.time_limit if time_limit is None else time_limit)
+            if array is not None:
+                self._save(key, array)
+        self.arrays[key] = array
+        return array
+
+    def generate(self, factor_levels, run_size, strength, time_limit=None):
+        """
+        :return: generated orthogonal array or None if none was found in the time limit
+        """
+        if time_limit is None:
+            return generate_orthogonal_array(factor_levels, run_size, strength)
+        if not oa_exists(factor_levels, run_size, strength):
+            return None
+        context = multiprocessing.get_context(self.start_method)
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_generate_in_process, args=(sender, factor_levels, run_size, strength),
+                                  daemon=True)
+        process.start()
+        sender.close()
+        try:
+            return receiver.recv() if receiver.poll(time_limit) else None
+        except EOFError:
+            # the process died without a result
+            return None
+        finally:
+            process.terminate()
+            process.join()
+            receiver.close()
+
+    def add(self, array, strength=None):
+        """
+        Function adds an orthogonal array to the cache (and to the directory). Columns with other values than 0, 1, ...
+        are mapped to level indexes in the order of their values.
+        :param array: matrix with one row per run
+        :param strength: strength of the array, default: the strength computed from the array
+        :return: array of level indexes
+        """
+        array = np.asarray(array)
+        array = np.stack([np.unique(column, return_inverse=True)[1].ravel() for column in array.T], axis=1)
+        factor_levels = [int(np.max(column)) + 1 for column in array.T]
+        if strength is None:
+            strength = orthogonal_strength(array)
+        key = self.key(factor_levels, len(array), strength)
+        self.arrays[key] = array
+        self._save(key, array)
+        return array
+
+    def preload(self, file_path, strength=None, delimiter=','):
+        """
+        Function adds the orthogonal array of a text file (e.g. oa.csv, one run per line) to the cache.
+        :return: array of level indexes
+        """
+        return self.add(np.genfromtxt(file_path, delimiter=delimiter), strength)
+
+    def _find(self, key):
+        """
+        :return: array in memory with the same run size, at least the same strength and more factors, whose first
+        columns have the factor levels of key (a subset of the columns of an orthogonal array is orthogonal)
+        """
+        factor_levels, run_size, strength = key
+        for (levels, size, other_strength), array in self.arrays.items():
+            if array is not None and size == run_size and other_strength >= strength and \
+                    levels[:len(factor_levels)] == factor_levels:
+                return array[:, :len(factor_levels)]
+        return None
+
+    def _save(self, key, array):
+        if self.directory is not None and not os.path.exists(self.file_name(key)):
+            data = io.BytesIO()
+            np.save(data, array)
+            write_checkpoint(self.file_name(key), data.getvalue())
+
+    def clear(self):
+        """
+        Function empties the memory of the cache, the files stay in the directory.
+        """
+        self.arrays.clear()
+
+
+# cache of TaguchiInitialization without an own cache
+default_cache = OrthogonalArrayCache()
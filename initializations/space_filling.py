@@ -0,0 +1,213 @@
+import math
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.stats import qmc
+from parameters import ParameterSet
+from population import Population
+from random_generator import as_generator
+from .initializations import indexes_to_population
+
+
+# Samplers of space-filling designs on the grid of the ParameterSpace: (size, numpy Generator) -> matrix of grid indexes
+
+
+def _cells(unit):
+    """
+    :param unit: points in [0, 1), one row per point
+    :return: grid indexes of the cells of the points, every grid point has a cell of the same size
+    """
+    levels = ParameterSet.get_space().levels
+    return np.minimum((np.asarray(unit) * levels).astype(np.int64), levels - 1)
+
+
+def _seed(rng):
+    return np.random.default_rng(as_generator(rng).integers(2 ** 63))
+
+
+def sobol_indexes(size, rng=None, scramble=True):
+    """
+    :param size: number of points
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :param scramble: if True, the sequence is scrambled (Owen scrambling and digital shift)
+    :return: grid indexes of the first size points of a Sobol sequence (of 2^m points, m as small as possible)
+    """
+    sampler = qmc.Sobol(len(ParameterSet.get_space().levels), scramble=scramble, seed=_seed(rng))
+    return _cells(sampler.random_base2(max(math.ceil(math.log2(max(size, 1))), 0))[:size])
+
+
+def halton_indexes(size, rng=None, scramble=True):
+    """
+    :param size: number of points
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :param scramble: if True, the digits of the sequence are permuted at random
+    :return: grid indexes of a Halton sequence
+    """
+    sampler = qmc.Halton(len(ParameterSet.get_space().levels), scramble=scramble, seed=_seed(rng))
+    return _cells(sampler.random(size))
+
+
+def lhs_indexes(size, rng=None):
+    """
+    Latin hypercube sampling on the grid: every axis is split into size strata of (almost) the same number of grid
+    points and every stratum is taken once. Axes with fewer grid points than size take every point size / levels
+    times.
+    :param size: number of points
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: matrix of grid indexes
+    """
+    rng = as_generator(rng)
+    levels = ParameterSet.get_space().levels
+    strata = np.arange(size)[:, None]
+    low = strata * levels // size
+    high = np.maximum((strata + 1) * levels // size, low + 1)
+    indexes = np.minimum(low + (rng.random((size, len(levels))) * (high - low)).astype(np.int64), levels - 1)
+    # every column is shuffled on its own (Generator.permuted needs numpy 1.20)
+    for column in range(indexes.shape[1]):
+        indexes[:, column] = indexes[rng.permutation(size), column]
+    return indexes
+
+
+def maximin_lhs_indexes(size, rng=None, candidates=10, iterations=None):
+    """
+    Maximin Latin hypercube sampling on the grid: the best of several Latin hypercubes (largest minimal distance
+    between two points) is improved by swapping the values of one axis between a point of the closest pair and
+    another point, a swap keeps the Latin hypercube and is kept if the minimal distance does not decrease.
+    :param size: number of points
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :param candidates: number of random Latin hypercubes
+    :param iterations: number of swaps, default: 10 * size for up to 2000 points, 0 for larger designs (the swaps use
+    the matrix of all distances)
+    :return: matrix of grid indexes
+    """
+    rng = as_generator(rng)
+    designs = [lhs_indexes(size, rng) for _ in range(max(candidates, 1))]
+    best = max(designs, key=min_pairwise_distance)
+    if iterations is None:
+        iterations = 10 * size if size <= 2000 else 0
+    if iterations <= 0 or size < 3:
+        return best
+    points = _unit(best)
+    distances = np.sum((points[:, None] - points[None]) ** 2, axis=-1)
+    np.fill_diagonal(distances, np.inf)
+    nearest = np.argmin(distances, axis=1)
+    for _ in range(iterations):
+        i = int(np.argmin(distances[np.arange(size), nearest]))
+        p = i if rng.random() < 0.5 else int(nearest[i])
+        q = int(rng.integers(size - 1))
+        q += q >= p
+        column = int(rng.integers(points.shape[1]))
+        critical = distances[i, nearest[i]]
+        best[[p, q], column] = best[[q, p], column]
+        points[[p, q], column] = points[[q, p], column]
+        rows = np.sum((points[[p, q]][:, None] - points[None]) ** 2, axis=-1)
+        rows[0, p] = rows[1, q] = np.inf
+        if np.min(rows) < critical:
+            # the swap creates a closer pair, it is undone
+            best[[p, q], column] = best[[q, p], column]
+            points[[p, q], column] = points[[q, p], column]
+            continue
+        changed = [p, q]
+        distances[changed] = rows
+        distances[:, changed] = rows.T
+        # rows whose nearest point moved away are searched again
+        stale = np.flatnonzero(np.isin(nearest, changed))
+        nearest[stale] = np.argmin(distances[stale], axis=1)
+        nearest[changed] = np.argmin(rows, axis=1)
+        closer = np.argmin(distances[:, changed], axis=1)
+        update = distances[np.arange(size), np.array(changed)[closer]] < distances[np.arange(size), nearest]
+        nearest[update] = np.array(changed)[closer[update]]
+    return best
+
+
+def stratified_indexes(size, rng=None):
+    """
+    Grid-stratified sampling: every axis is split into k equal strata (k^d cells, k as large as possible with
+    k^d <= size, at most the number of grid points), size different cells are chosen (every cell once before any
+    cell twice) and a random grid point is taken from every chosen cell.
+    :param size: number of points
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: matrix of grid indexes
+    """
+    rng = as_generator(rng)
+    levels = ParameterSet.get_space().levels
+    k = np.minimum(max(int(math.floor(size ** (1 / len(levels)) + 1e-9)), 1), levels)
+    cells = math.prod(k.tolist())
+    chosen = np.concatenate([rng.permutation(cells) for _ in range(-(-size // cells))])[:size]
+    strata = np.stack(np.unravel_index(chosen, k.tolist()), axis=1)
+    low = strata * levels // k
+    high = (strata + 1) * levels // k
+    return low + (rng.random(strata.shape) * (high - low)).astype(np.int64)
+
+
+# Quality of a design: the grid indexes are mapped to the centres of their cells in the unit hypercube
+
+
+def _unit(indexes):
+    """
+    :return: centres of the grid cells of the indexes in [0, 1]
+    """
+    return (np.asarray(indexes, dtype=np.float64) + 0.5) / ParameterSet.get_space().levels
+
+
+def _as_indexes(design):
+    """
+    :param design: matrix of grid indexes, Population or list of ParameterSet solutions
+    :return: matrix of grid indexes
+    """
+    if isinstance(design, Population):
+        return design.genes
+    if len(design) and isinstance(design[0], ParameterSet):
+        return Population.from_parameter_sets(design).genes
+    return np.asarray(design)
+
+
+def centered_l2_discrepancy(design):
+    """
+    :param design: matrix of grid indexes, Population or list of ParameterSet solutions
+    :return: centred L2 discrepancy of the design (lower is more uniform), O(n^2)
+    """
+    return float(qmc.discrepancy(_unit(_as_indexes(design)), method='CD'))
+
+
+def min_pairwise_distance(design):
+    """
+    :param design: matrix of grid indexes, Population or list of ParameterSet solutions
+    :return: smallest Euclidean distance between two points of the design in the unit hypercube (larger is better),
+    0 for duplicates
+    """
+    points = _unit(_as_indexes(design))
+    if len(points) < 2:
+        return float('inf')
+    distances, _ = cKDTree(points).query(points, k=2)
+    return float(np.min(distances[:, 1]))
+
+
+def design_quality(design):
+    """
+    :param design: matrix of grid indexes, Population or list of ParameterSet solutions
+    :return: dictionary with the centred L2 discrepancy, the minimal pairwise distance and the number of duplicates
+    """
+    indexes = _as_indexes(design)
+    return {'centered_l2_discrepancy': centered_l2_discrepancy(indexes),
+            'min_pairwise_distance': min_pairwise_distance(indexes),
+            'duplicates': len(indexes) - len(np.unique(indexes, axis=0))}
+
+
+SAMPLERS = {'sobol': sobol_indexes, 'halton': halton_indexes, 'lhs': lhs_indexes, 'maximin_lhs': maximin_lhs_indexes,
+            'stratified': stratified_indexes}
+
+
+def space_filling_initialization(method='sobol', vectorized=False, **options):
+    """
+    :param method: name of the sampler (key of SAMPLERS) or sampler function (size, rng) -> grid indexes
+    :param vectorized: if True, the initialization returns a Population (for the VectorizedGA)
+    :param options: other arguments of the sampler, e.g. scramble or candidates
+    :return: initialization function (pop_size, rng) -> list of ParameterSet solutions or Population
+    """
+    sampler = SAMPLERS[method] if isinstance(method, str) else method
+
+    def space_filling(pop_size, rng=None):
+        indexes = sampler(pop_size, rng=rng, **options)
+        return Population(indexes) if vectorized else indexes_to_population(indexes)
+    space_filling.__name__ = f"{method if isinstance(method, str) else method.__name__}_initialization"
+    return space_filling
@@ -0,0 +1,2 @@
+from .islands import IslandModel, Migration, QueueBench, ring_topology, complete_topology, random_topology, \
+    best_emigrants, random_emigrants, replace_worst, replace_random
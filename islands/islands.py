@@ -0,0 +1,386 @@
+import copy
+import multiprocessing
+import operator
+import os
+import queue
+import random
+import threading
+import traceback
+import numpy as np
+import ga_log
+from ga import GeneticAlgorithm
+from helper import SharedCache, PersistentCache
+from population import Population
+from random_generator import as_generator, with_rng
+
+
+# Topology = Callable[[int, int], List[List[int]]], (migration epoch, number of islands) -> target islands of every island
+
+
+def ring_topology(epoch, islands):
+    """
+    Every island sends its migrants to the next island.
+    """
+    return [[(i + 1) % islands] if islands > 1 else [] for i in range(islands)]
+
+
+def complete_topology(epoch, islands):
+    """
+    Every island sends its migrants to all other islands.
+    """
+    return [[j for j in range(islands) if j != i] for i in range(islands)]
+
+
+def random_topology(targets=1, seed=0):
+    """
+    Function creates a topology where every island sends its migrants to random islands, different in every epoch.
+    All islands compute the same targets from the seed and the epoch.
+    :param targets: number of target islands of every island
+    :param seed: seed of the random targets
+    :return: topology function
+    """
+    def random_targets(epoch, islands):
+        rng = np.random.default_rng((seed, epoch))
+        return [[int(j) for j in rng.choice([j for j in range(islands) if j != i], min(targets, islands - 1),
+                                            replace=False)] for i in range(islands)]
+    random_targets.__name__ = f'random_topology({targets})'
+    return random_targets
+
+
+# EmigrantSelection = Callable[[List[ParameterSet], int, np.random.Generator], List[ParameterSet]]
+
+
+def best_emigrants(population, number, rng=None):
+    """
+    :return: the number best solutions of the population
+    """
+    return sorted(population, key=operator.attrgetter('fitness'), reverse=True)[:number]
+
+
+def random_emigrants(population, number, rng=None):
+    """
+    :return: number random solutions of the population
+    """
+    chosen = as_generator(rng).choice(len(population), min(number, len(population)), replace=False)
+    return [population[i] for i in chosen]
+
+
+# Replacement = Callable[[List[ParameterSet], List[ParameterSet], np.random.Generator], List[ParameterSet]]
+
+
+def replace_worst(population, immigrants, rng=None):
+    """
+    Function replaces the worst solutions of the population with the immigrants that are not in the population.
+    """
+    immigrants = [ps for ps in dict.fromkeys(immigrants) if ps not in population]
+    order = sorted(range(len(population)), key=lambda i: population[i].fitness)
+    population = list(population)
+    for i, ps in zip(order, immigrants):
+        population[i] = ps
+    return population
+
+
+def replace_random(population, immigrants, rng=None):
+    """
+    Function replaces random solutions of the population with the immigrants that are not in the population. The best
+    solution is never replaced.
+    """
+    immigrants = [ps for ps in dict.fromkeys(immigrants) if ps not in population]
+    best = max(range(len(population)), key=lambda i: population[i].fitness)
+    candidates = [i for i in range(len(population)) if i != best]
+    chosen = as_generator(rng).choice(candidates, min(len(immigrants), len(candidates)), replace=False)
+    population = list(population)
+    for i, ps in zip(chosen, immigrants):
+        population[i] = ps
+    return population
+
+
+class Migration:
+    """
+    Migration step of one island, called by the GA after every iteration (GeneticAlgorithm.migration).
+    Every interval iterations (one migration epoch), the island sends its emigrants to its target islands and waits for
+    the immigrants of all islands that send to it in the same epoch, so the islands exchange solutions synchronously
+    and the runs are reproducible. Islands that finished their run are not waited for.
+    The immigrants keep their fitness (all islands shoot the same chip) and have the origin 'm'.
+    Random emigrants and replacements are drawn from the generator rng of the migration.
+    """
+
+    def __init__(self, index, inboxes, topology=ring_topology, interval=5, migrants=2, emigrants=best_emigrants,
+                 replacement=replace_worst, rng=None):
+        self.index = index
+        self.inboxes = inboxes
+        self.topology = topology
+        self.interval = interval
+        self.migrants = migrants
+        self.emigrants = with_rng(emigrants)
+        self.replacement = with_rng(replacement)
+        self.rng = as_generator(rng)
+        self.stopped = set()
+        self.pending = dict()  # epoch -> {source island: list of immigrants}
+
+    def sources(self, epoch):
+        targets = self.topology(epoch, len(self.inboxes))
+        return [s for s in range(len(self.inboxes)) if self.index in targets[s] and s not in self.stopped]
+
+    def receive(self, epoch):
+        """
+        :return: list of the immigrants of the epoch
+        """
+        while True:
+            received = self.pending.get(epoch, {})
+            if all(s in received for s in self.sources(epoch)):
+                self.pending.pop(epoch, None)
+                return [ps for s in sorted(received) for ps in received[s]]
+            source, source_epoch, immigrants = self.inboxes[self.index].get()
+            if source_epoch is None:
+                self.stopped.add(source)
+            else:
+                self.pending.setdefault(source_epoch, {})[source] = immigrants
+
+    def __call__(self, population, iteration):
+        if self.interval < 1 or iteration % self.interval:
+            return population
+        epoch = iteration // self.interval
+        vectorized = isinstance(population, Population)
+        solutions = population.to_parameter_sets() if vectorized else population
+        emigrants = [copy.deepcopy(ps) for ps in self.emigrants(solutions, self.migrants, rng=self.rng)]
+        for ps in emigrants:
+            ps.created = 'm'
+        for target in self.topology(epoch, len(self.inboxes))[self.index]:
+            self.inboxes[target].put((self.index, epoch, emigrants))
+        immigrants = self.receive(epoch)
+        if not immigrants:
+            return population
+        solutions = self.replacement(solutions, immigrants, rng=self.rng)
+        return Population.from_parameter_sets(solutions) if vectorized else solutions
+
+    def stop(self):
+        """
+        Function tells the other islands that this island does not send migrants anymore.
+        """
+        for i, inbox in enumerate(self.inboxes):
+            if i != self.index:
+                inbox.put((self.index, None, None))
+
+
+class QueueBench:
+    """
+    Bench function of an island when all islands share one bench: measurements are sent to the request queue of the
+    IslandModel, which performs them one after another on the bench of the main process.
+    """
+
+    def __init__(self, index, requests, responses):
+        self.index = index
+        self.requests = requests
+        self.responses = responses
+
+    def apply_on_bench(self, parameter_set):
+        self.requests.put((self.index, 'shot', parameter_set))
+        return self.responses.get()
+
+    def apply_on_bench_batch(self, batch):
+        self.requests.put((self.index, 'batch', batch))
+        return self.responses.get()
+
+
+def _no_iteration(n):
+    return n
+
+
+def _island_log_file(log_file_name, index):
+    if '{}' in log_file_name:
+        return log_file_name.format(index)
+    base, extension = os.path.splitext(log_file_name)
+    return f'{base}_island{index}{extension}'
+
+
+def _run_island(index, island, model, inboxes, results, cache, requests, responses, seed_sequence):
+    """
+    Function runs one island in its process and puts (island index, final population or None, error) to results.
+    The GA and the migration of the island get independent generators spawned from the seed sequence of the island.
+    """
+    ga_sequence, migration_sequence = seed_sequence.spawn(2)
+    migration = Migration(index, inboxes, model['topology'], model['interval'], model['migrants'], model['emigrants'],
+                          model['replacement'], rng=np.random.default_rng(migration_sequence))
+    try:
+        if model['seed'] is not None:
+            # the simulated benches of bench_factory use the global generators
+            np.random.seed(seed_sequence.generate_state(1)[0])
+            random.seed(int(seed_sequence.generate_state(1)[0]))
+        island = dict(island)
+        ga_class = island.pop('ga_class', model['ga_class'])
+        kwargs = dict(model['ga_kwargs'], **island)
+        kwargs.setdefault('rng', np.random.default_rng(ga_sequence))
+        if model['bench_factory'] is not None:
+            bench = model['bench_factory']()
+            bench_function = bench.apply_bench_parameter
+            if hasattr(bench, 'apply_bench_batch'):
+                kwargs.setdefault('apply_on_bench_batch_function', bench.apply_bench_batch)
+        else:
+            bench = QueueBench(index, requests, responses[index])
+            bench_function = bench.apply_on_bench
+            if model['batch_bench']:
+                kwargs['apply_on_bench_batch_function'] = bench.apply_on_bench_batch
+        ga = ga_class(bench_function, model['carto_set_iteration'], **kwargs)
+        if model['cache_file'] is not None:
+            # the cache is opened after the GA set the parameter limits, every process has its own connection
+            ga.TESTED = PersistentCache(model['cache_file'], chip=model['chip'])
+            ga.clear_cache_after_run = False
+        elif cache is not None:
+            ga.TESTED = cache
+            ga.clear_cache_after_run = False
+        ga.migration = migration
+        population = ga.run(_island_log_file(model['log_file_name'], index), model['log_class'])
+        if isinstance(population, Population):
+            population = population.to_parameter_sets()
+        migration.stop()
+        results.put((index, population, None))
+    except BaseException:
+        migration.stop()
+        results.put((index, None, traceback.format_exc()))
+
+
+class IslandModel:
+    """
+    Island model: several genetic algorithms (islands) with different settings run in parallel processes and exchange
+    their best solutions (migration), so the search does not converge to one area of the chip.
+    Every island is a dictionary of constructor arguments of the GA class (e.g. selection, crossover, initialization
+    function), added to the common arguments ga_kwargs.
+    With a bench_factory (simulated benches), every island process creates its own bench, so the islands scale with
+    the number of cores. With apply_on_bench_function (one hardware bench), the bench stays in the main process and
+    the measurements of all islands go to one queue and are performed one after another.
+    The islands share the evaluation cache: an in-memory SharedCache, or a PersistentCache file (cache_file).
+    Processes are started with the given multiprocessing start method; except with 'fork', the islands and the bench
+    factory have to be picklable (e.g. functions defined at the module level).
+    """
+
+    def __init__(self, islands, ga_class=GeneticAlgorithm, ga_kwargs=None, bench_factory=None,
+                 apply_on_bench_function=None, apply_on_bench_batch_function=None, carto_set_iteration=_no_iteration,
+                 topology=ring_topology, interval=5, migrants=2, emigrants=best_emigrants, replacement=replace_worst,
+                 cache_file=None, chip='default', seed=None, start_method=None):
+        """
+        :param islands: list of dictionaries with the GA arguments of every island, e.g. {'selection': ktournament(3)}
+        :param ga_class: GA class of the islands, an island can set its own with the key 'ga_class'
+        :param ga_kwargs: GA arguments common to all islands (pop_size, max_iterations, parameter_info_file, ...)
+        :param bench_factory: function creating the bench of an island process (e.g. dummy_cartography), it has the
+        method apply_bench_parameter and optionally apply_bench_batch
+        :param apply_on_bench_function: bench function shared by all islands, used if bench_factory is None
+        :param apply_on_bench_batch_function: batch version of the shared bench function, default: None
+        :param carto_set_iteration: function called by every island with its iteration number
+        :param topology: function (epoch, number of islands) -> list of target islands of every island
+        :param interval: number of iterations between two migrations
+        :param migrants: number of emigrants of an island in every migration
+        :param emigrants: function (population, number) -> list of emigrants
+        :param replacement: function (population, immigrants) -> population
+        :param cache_file: SQLite file of a PersistentCache shared by the islands, default: None (SharedCache)
+        :param chip: chip name of the PersistentCache
+        :param seed: seed of the islands, every island gets independent generators spawned from it (random seed if
+        None)
+        :param start_method: multiprocessing start method, default: the default method of the platform
+        """
+        if bench_factory is None and apply_on_bench_function is None and apply_on_bench_batch_function is None:
+            raise ValueError("Island model needs a bench factory or a shared bench function.")
+        self.islands = islands
+        self.ga_class = ga_class
+        self.ga_kwargs = dict(ga_kwargs or {})
+        self.bench_factory = bench_factory
+        self.apply_on_bench = apply_on_bench_function
+        self.apply_on_bench_batch = apply_on_bench_batch_function
+        self.carto_set_iteration = carto_set_iteration
+        self.topology = topology
+        self.interval = interval
+        self.migrants = migrants
+        self.emigrants = emigrants
+        self.replacement = replacement
+        self.cache_file = cache_file
+        self.chip = chip
+        self.seed = seed
+        self.context = multiprocessing.get_context(start_method)
+        self.populations = None
+        self.cache_stats = None  # size of the shared in-memory evaluation cache at the end of the last run
+
+    def _serve_bench(self, requests, responses):
+        """
+        Function performs the measurements of the request queue on the shared bench until it gets None.
+        """
+        while True:
+            request = requests.get()
+            if request is None:
+                return
+            index, kind, payload = request
+            if kind == 'batch':
+                if self.apply_on_bench_batch is not None:
+                    response = [list(fault_classes) for fault_classes in self.apply_on_bench_batch(payload)]
+                else:
+                    response = [[self.apply_on_bench(ps) for _ in range(shots)] for ps, shots in payload]
+            else:
+                response = self.apply_on_bench(payload)
+            responses[index].put(response)
+
+    def run(self, log_file_name='logfile_island{}.pkl', log_class=ga_log.Log):
+        """
+        Function runs all islands until their stop conditions are satisfied.
+        :param log_file_name: log file of the islands, '{}' is replaced with the island number (otherwise the number is
+        added before the extension)
+        :param log_class: log class of the islands
+        :return: list with the final population (list of ParameterSet solutions) of every island
+        """
+        model = {'ga_class': self.ga_class, 'ga_kwargs': self.ga_kwargs, 'bench_factory': self.bench_factory,
+                 'batch_bench': self.apply_on_bench_batch is not None, 'carto_set_iteration': self.carto_set_iteration,
+                 'topology': self.topology, 'interval': self.interval, 'migrants': self.migrants,
+                 'emigrants': self.emigrants, 'replacement': self.replacement, 'cache_file': self.cache_file,
+                 'chip': self.chip, 'seed': self.seed, 'log_file_name': log_file_name, 'log_class': log_class}
+        n = len(self.islands)
+        with self.context.Manager() as manager:
+            inboxes = [manager.Queue() for _ in range(n)]
+            results = manager.Queue()
+            cache = SharedCache(manager.dict()) if self.cache_file is None else None
+            requests, responses, server = None, None, None
+            if self.bench_factory is None:
+                requests, responses = manager.Queue(), [manager.Queue() for _ in range(n)]
+                server = threading.Thread(target=self._serve_bench, args=(requests, responses), daemon=True)
+                server.start()
+            seed_sequences = np.random.SeedSequence(self.seed).spawn(n)
+            processes = [self.context.Process(target=_run_island, name=f'island{i}',
+                                              args=(i, island, model, inboxes, results, cache, requests, responses,
+                                                    seed_sequences[i]))
+                         for i, island in enumerate(self.islands)]
+            for p in processes:
+                p.start()
+            populations, errors = [None] * n, []
+            finished = False
+            try:
+                for _ in range(n):
+                    while True:
+                        try:
+                            index, population, error = results.get(timeout=1.0)
+                            break
+                        except queue.Empty:
+                            dead = [i for i, p in enumerate(processes) if p.exitcode not in (None, 0)]
+                            if dead:
+                                raise RuntimeError(f"Island process {dead[0]} died with exit code "
+                                                   f"{processes[dead[0]].exitcode}.")
+                    populations[index] = population
+                    if error is not None:
+                        errors.append(f"Island {index}:\n{error}")
+                finished = True
+            finally:
+                for p in processes:
+                    if not finished:
+                        p.terminate()
+                    p.join()
+                if server is not None:
+                    requests.put(None)
+                    server.join()
+            if errors:
+                raise RuntimeError("Island failed.\n" + "\n".join(errors))
+            if cache is not None:
+                self.cache_stats = {'size': len(cache)}
+        self.populations = populations
+        return populations
+
+    def best(self):
+        """
+        :return: best solution of all islands after the run
+        """
+        return max((ps for population in self.populations for ps in population), key=operator.attrgetter('fitness'))
@@ -1 +1,3 @@
-from .local_search import hooke_jeeves
\ No newline at end of file
+from .local_search import hooke_jeeves, serial_hooke_jeeves, batched_hooke_jeeves, get_interesting_points
+from .methods import BudgetedEvaluator, compass_search, pattern_search, nelder_mead, coordinate_descent
+from .scheduler import LocalSearchScheduler
@@ -3,36 +3,77 @@ import copy
 from fitness import FAULT
 from helper import TabuList
 from parameters import ParameterSet
+from population import Population
+from random_generator import as_generator
 
 
-# LocalSearch = Callable[[List[ParameterSet]], List[ParameterSet]]
+# LocalSearch = Callable[[List[ParameterSet], EvaluationFunction, TabuList, np.random.Generator], List[ParameterSet]]
 # EvaluationFunction = Callable[[float, float, float, int, int], Tuple[float, str]]
 # EvaluatePopulation = Callable[[List[ParameterSet]], None]
 
-local_search_visited = set()
 
-
-def get_interesting_points(population):
+def interesting_indexes(population, visited, threshold=0.85):
+    """
+    :param population: list of evaluated ParameterSet solutions
+    :param visited: set of solutions that were already used as starting points of the local search
+    :param threshold: fraction of the highest fault class fitness a solution needs to be interesting
+    :return: indexes of the interesting solutions that were not visited yet
+    """
     max_fitness = max([f.fitness for f in FAULT.values()])
-    indexes = np.where(np.array([s.fitness for s in population]) > 0.85 * max_fitness)[0]
-    indexes = [i for i in indexes if population[i] not in local_search_visited]
+    indexes = np.where(np.array([s.fitness for s in population]) > threshold * max_fitness)[0]
+    return [i for i in indexes if population[i] not in visited]
+
 
-    max_solutions_for_local_search = 3
-    if len(indexes) > max_solutions_for_local_search:
-        indexes = np.random.choice(indexes, max_solutions_for_local_search, replace=False)
-    local_search_visited.update(set(np.array(population)[indexes]))
+def get_interesting_points(population, visited, threshold=0.85, max_points=3, rng=None):
+    """
+    Function chooses the starting points of the local search (at most max_points random interesting solutions) and
+    adds them to the visited set.
+    :param visited: set of visited solutions of the local search
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: indexes of the chosen solutions
+    """
+    indexes = interesting_indexes(population, visited, threshold)
+    if len(indexes) > max_points:
+        indexes = as_generator(rng).choice(indexes, max_points, replace=False)
+    visited.update(set(np.array(population)[indexes]))
     return indexes
 
 
-def hooke_jeeves(population, evaluation_function, TESTED: TabuList):
+def replace_worst(population, indexes, improved):
+    """
+    Function puts the results of the local search in the population: every solution that was improved replaces the
+    worst solution of the population that was not a starting point of the local search (or the starting point itself).
+    :param population: list of ParameterSet solutions
+    :param indexes: indexes of the starting points
+    :param improved: list of (index of the starting point, improved ParameterSet solution) pairs
+    :return: population
+    """
+    indexes_sorted_pop = np.argsort(np.array([ps.fitness for ps in population]))  # from worst to best solutions
+    worst_i = 0
+    for i, ps in improved:
+        while indexes_sorted_pop[worst_i] in indexes and indexes_sorted_pop[worst_i] != i:
+            worst_i += 1
+        population[indexes_sorted_pop[worst_i]] = ps
+        worst_i += 1
+    return population
+
+
+def hooke_jeeves(population, evaluation_function, TESTED: TabuList, rng=None, visited=None):
     """
     Function that performs Hooke-Jeeves algorithm as the local search.
     Solutions that were better after local search replace the starting point of the local search.
     The solutions in the population have to be evaluated before the HJ alg, otherwise, unexpected behavior.
+    The GA does not call this function directly, it creates its own search with serial_hooke_jeeves (attribute
+    'factory'), which remembers the starting points of the previous generations.
     :param evaluation_function:
     :param population: list of ParameterSet solutions
+    :param rng: numpy Generator of the starting points and of the order of the explored parameters
+    :param visited: set of solutions used as starting points before, updated with the new starting points, default:
+    an empty set
     :return: population after local search
     """
+    rng = as_generator(rng)
+    visited = set() if visited is None else visited
 
     def explore(x, Dx):
         """
@@ -46,8 +87,8 @@ def hooke_jeeves(population, evaluation_function, TESTED: TabuList):
         params = vars(p)
         p.created = 'l'
         param_names = p.get_param_names()
-        for i, key in np.random.permutation(list(zip(range(len(param_names)), param_names))):
-            i = int(i)
+        for i in rng.permutation(len(param_names)):
+            i, key = int(i), param_names[i]
             value = params[key]
             orig_fit, orig_fault = p.fitness, p.fault_class
             p.update(key, value + Dx[i])
@@ -66,7 +107,7 @@ def hooke_jeeves(population, evaluation_function, TESTED: TabuList):
             p.update_fitness(fitness, fault_class)
         return p
 
-    indexes = get_interesting_points(population)
+    indexes = get_interesting_points(population, visited, rng=rng)
     if len(indexes) < 1:
         # no interesting points
         return population
@@ -97,3 +138,178 @@ def hooke_jeeves(population, evaluation_function, TESTED: TabuList):
             population[indexes_sorted_pop[worst_i]] = copy.deepcopy(xb)  # xb is the resulting point in the end
             worst_i += 1
     return population
+
+
+def serial_hooke_jeeves():
+    """
+    Function creates the Hooke-Jeeves local search (hooke_jeeves) with its own set of visited solutions, reset at the
+    start of every GA run and stored in the GA checkpoints, so GAs in one process (e.g. islands in threads) do not
+    share it.
+    :return: local search function
+    """
+
+    def hooke_jeeves_serial(population, evaluation_function, TESTED: TabuList, rng=None):
+        return hooke_jeeves(population, evaluation_function, TESTED, rng=rng, visited=visited)
+
+    visited = set()
+    hooke_jeeves_serial.__name__ = 'hooke_jeeves'
+    hooke_jeeves_serial.visited = visited
+    hooke_jeeves_serial.reset = visited.clear
+    return hooke_jeeves_serial
+
+
+# the GA creates its own instance of local searches with a factory, so their visited solutions are not shared
+hooke_jeeves.factory = serial_hooke_jeeves
+
+
+def _batch_evaluator(evaluation_function):
+    """
+    Function creates the evaluation function of the batched local search.
+    Probes with the same parameter values are evaluated only once per local search, and all new probes of a call are
+    sent to evaluation_function as one list (the GA checks the TESTED list and sends the rest to the bench in one batch).
+    :param evaluation_function: function that takes a list of ParameterSet solutions and returns a list of
+    (fitness, fault class) tuples
+    :return: function that takes a gene matrix and returns the fitness array and the list of fault classes
+    """
+    known = dict()
+
+    def evaluate(genes):
+        keys = [tuple(row) for row in genes.tolist()]
+        new = list(dict.fromkeys(k for k in keys if k not in known))
+        if new:
+            parameter_sets = Population.from_values(np.array(new), created='l').to_parameter_sets()
+            for key, result in zip(new, evaluation_function(parameter_sets)):
+                known[key] = result
+        return np.array([known[k][0] for k in keys], dtype=np.float64), [known[k][1] for k in keys]
+
+    return evaluate
+
+
+def _batched_explore(x, fitness, fault_classes, Dx, evaluate):
+    """
+    Exploration step of the Hooke-Jeeves algorithm for several points at once.
+    The full stencil (+Dx and -Dx in every dimension) of all points is evaluated in one batch. In every dimension, +Dx
+    is accepted if it is not worse than the starting point, otherwise -Dx if it is not worse, as in the serial
+    exploration. The accepted moves are then combined into one point, which is evaluated in a second batch; if the
+    combined point is worse than the best single move, the best single move is the result of the exploration.
+
+    :param x: gene matrix of the starting points
+    :param fitness: fitness values of the starting points
+    :param fault_classes: fault classes of the starting points
+    :param Dx: matrix of local steps, one row per point
+    :param evaluate: batch evaluation function
+    :return: gene matrix, fitness values and fault classes of the explored points
+    """
+    mins, maxs, _ = ParameterSet.get_param_limits(as_array=True).T
+    k, d = x.shape
+    moves = np.einsum('ij,kj->kij', np.eye(d, dtype=x.dtype), Dx)  # moves[p, i] is the step of point p in dimension i
+    probes = np.clip(np.concatenate([x[:, None, :] + moves, x[:, None, :] - moves], axis=1), mins, maxs)
+    probe_fitness, probe_faults = evaluate(probes.reshape(-1, d))
+    probe_fitness = probe_fitness.reshape(k, 2 * d)
+    use_plus = probe_fitness[:, :d] >= fitness[:, None]
+    use_minus = ~use_plus & (probe_fitness[:, d:] >= fitness[:, None])
+    accepted = np.concatenate([use_plus, use_minus], axis=1)
+
+    xn, fn, cn = x.copy(), fitness.copy(), list(fault_classes)
+    best = np.argmax(np.where(accepted, probe_fitness, -np.inf), axis=1)
+    for p in np.flatnonzero(accepted.any(axis=1)):
+        xn[p], fn[p], cn[p] = probes[p, best[p]], probe_fitness[p, best[p]], probe_faults[p * 2 * d + best[p]]
+
+    combine = np.flatnonzero(accepted.sum(axis=1) > 1)
+    if len(combine):
+        steps = (use_plus[combine].astype(x.dtype) - use_minus[combine].astype(x.dtype)) * Dx[combine]
+        combined = np.clip(x[combine] + steps, mins, maxs)
+        combined_fitness, combined_faults = evaluate(combined)
+        for j, p in enumerate(combine):
+            if combined_fitness[j] >= fn[p]:
+                xn[p], fn[p], cn[p] = combined[j], combined_fitness[j], combined_faults[j]
+    return xn, fn, cn
+
+
+def _batched_pattern_search(genes, fitness, fault_classes, evaluate):
+    """
+    Hooke-Jeeves pattern search of several points in lockstep: in every round, the exploration of all active points is
+    one batch and their pattern moves are another batch.
+    :return: gene matrix, fitness values and fault classes of the best points found
+    """
+    mins, maxs, steps = ParameterSet.get_param_limits(as_array=True).T
+    xb, fb, cb = genes.copy(), fitness.copy(), list(fault_classes)
+    xp, fp, cp = xb.copy(), fb.copy(), list(cb)
+    # exploration deltas in whole grid steps, multiplied by the step of every axis (also float axes) for the probes
+    multiple = np.full(genes.shape, 2, dtype=np.int64)
+    active = np.flatnonzero(np.all(multiple >= 1, axis=1))
+    while len(active):
+        xn, fn, cn = _batched_explore(xp[active], fp[active], [cp[p] for p in active], multiple[active] * steps,
+                                      evaluate)
+        better = fn > fb[active]
+        moved = active[better]
+        if len(moved):
+            # pattern move: go further in the direction of the improvement and explore from there
+            pattern = np.clip(2 * xn[better] - xb[moved], mins, maxs)
+            pattern_fitness, pattern_faults = evaluate(pattern)
+            for j, (p, q) in enumerate(zip(moved, np.flatnonzero(better))):
+                xb[p], fb[p], cb[p] = xn[q], fn[q], cn[q]
+                xp[p], fp[p], cp[p] = pattern[j], pattern_fitness[j], pattern_faults[j]
+        stay = active[~better]
+        multiple[stay] //= 2  # decrease the exploration delta, and reset the starting point
+        xp[stay], fp[stay] = xb[stay], fb[stay]
+        for p in stay:
+            cp[p] = cb[p]
+        active = np.flatnonzero(np.all(multiple >= 1, axis=1))
+    return xb, fb, cb
+
+
+def batched_hooke_jeeves(parallel_points=True):
+    """
+    Function creates the Hooke-Jeeves local search that evaluates its probes in batches.
+    Instead of probing one coordinate at a time, every exploration evaluates the full +-Dx stencil of the point as one
+    batch. Probes already evaluated in this local search are not evaluated again, and the GA does not send the probes
+    in the TESTED list to the bench.
+    The returned function has the attribute 'batched', so the GA gives it the batch evaluation function
+    (GeneticAlgorithm.evaluate_parameter_sets) instead of evaluate_parameter_set. Every returned function has its own
+    set of visited solutions, reset at the start of every GA run.
+    :param parallel_points: if True, all the interesting points are searched in lockstep and the probes of all points
+    go to the bench in one batch, otherwise the points are searched one after another
+    :return: local search function
+    """
+
+    def hooke_jeeves_batched(population, evaluation_function, TESTED: TabuList, rng=None):
+        """
+        Function that performs the batched Hooke-Jeeves algorithm as the local search.
+        Solutions that were better after local search replace the worst solutions of the population, as in
+        hooke_jeeves. The solutions in the population have to be evaluated before.
+        :param population: list of ParameterSet solutions
+        :param evaluation_function: function that evaluates a list of ParameterSet solutions
+        :param rng: numpy Generator of the starting points
+        :return: population after local search
+        """
+        indexes = get_interesting_points(population, visited, rng=rng)
+        if len(indexes) < 1:
+            # no interesting points
+            return population
+        evaluate = _batch_evaluator(evaluation_function)
+        names = ParameterSet.get_param_names()
+        genes = np.array([[getattr(population[i], name) for name in names] for i in indexes], dtype=np.float64)
+        fitness = np.array([population[i].fitness for i in indexes], dtype=np.float64)
+        fault_classes = [population[i].fault_class for i in indexes]
+        groups = [np.arange(len(indexes))] if parallel_points else [[p] for p in range(len(indexes))]
+        for group in groups:
+            genes[group], fitness[group], found = _batched_pattern_search(genes[group], fitness[group],
+                                                                          [fault_classes[p] for p in group], evaluate)
+            for p, fault_class in zip(group, found):
+                fault_classes[p] = fault_class
+
+        improved = []
+        for p, i in enumerate(indexes):
+            if fitness[p] > population[i].fitness:
+                xb = ParameterSet(*ParameterSet.get_space().to_python(genes[p]))
+                xb.update_fitness(float(fitness[p]), fault_classes[p])
+                xb.created = 'l'
+                improved.append((i, xb))
+        return replace_worst(population, indexes, improved)
+
+    visited = set()
+    hooke_jeeves_batched.batched = True
+    hooke_jeeves_batched.visited = visited
+    hooke_jeeves_batched.reset = visited.clear
+    return hooke_jeeves_batched
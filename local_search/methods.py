@@ -0,0 +1,250 @@
+import numpy as np
+from parameters import ParameterSet
+from population import Population
+from random_generator import as_generator
+
+
+# LocalSearchMethod = Callable[[np.ndarray, float, str, BudgetedEvaluator], Tuple[np.ndarray, float, str]]
+
+
+class BudgetedEvaluator:
+    """
+    Evaluation function of the local search methods, with a limited number of laser shots.
+    It takes a gene matrix and returns the fitness values and fault classes of the rows. Rows that were already
+    evaluated in this local search or that are in the TESTED list are free, the other rows cost the shots the GA fired
+    to evaluate them (attribute 'shots' of the evaluation function, the number of shots fired so far), so the budget
+    follows nb_measurements and the AdaptiveMeasurement of the GA. Evaluation functions without the attribute count
+    one shot per evaluation.
+    The new rows of a call are evaluated in chunks of as many rows as the remaining shots pay for at the mean number of
+    shots per evaluation (the first shots of the GA before the first evaluation), so only a measurement that needs more
+    shots than the mean (AdaptiveMeasurement) can spend more than the budget.
+    When the budget is exhausted, the remaining rows are not evaluated and get the fitness -inf, so they are never
+    accepted as improvements.
+    All new rows of a call are sent to evaluation_function as one list.
+    The evaluator also carries the numpy Generator of the randomized methods (coordinate_descent).
+    """
+
+    def __init__(self, evaluation_function, TESTED, budget=0, rng=None):
+        """
+        :param evaluation_function: function that takes a list of ParameterSet solutions and returns a list of
+        (fitness, fault class) tuples (GeneticAlgorithm.local_search_evaluation)
+        :param TESTED: TabuList (or PersistentCache) with the evaluated solutions
+        :param budget: number of shots
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        """
+        self.evaluation_function = evaluation_function
+        self.TESTED = TESTED
+        self.remaining = budget
+        self.rng = as_generator(rng)
+        self.evaluations = 0
+        self.shots = 0
+        self.shot_counter = getattr(evaluation_function, 'shots', None)
+        first_shots = getattr(evaluation_function, 'first_shots', None)
+        self.first_shots = first_shots() if first_shots is not None else 1
+        self.known = dict()
+        self.space = ParameterSet.get_space()
+        self.mins, self.maxs, self.steps = self.space.mins, self.space.maxs, self.space.steps
+
+    def add_budget(self, shots):
+        self.remaining += shots
+
+    @property
+    def exhausted(self):
+        return self.remaining <= 0
+
+    @property
+    def shots_per_evaluation(self):
+        """
+        :return: mean number of shots of the evaluations so far, the first shots of the GA before the first evaluation
+        """
+        return self.shots / self.evaluations if self.evaluations else self.first_shots
+
+    def snap(self, genes):
+        """
+        :param genes: gene matrix with any values
+        :return: gene matrix with the closest values on the parameter grid
+        """
+        return self.space.decode(self.space.encode(genes))
+
+    def __call__(self, genes):
+        genes = np.clip(np.atleast_2d(genes), self.mins, self.maxs)
+        keys = [tuple(row) for row in genes.tolist()]
+        unknown = [k for k in dict.fromkeys(keys) if k not in self.known]
+        if unknown:
+            parameter_sets = Population.from_values(np.array(unknown), created='l').to_parameter_sets()
+            cached = [ps in self.TESTED for ps in parameter_sets]
+            # solutions in the TESTED list do not cost anything, the others are evaluated while the budget lasts, in
+            # chunks of as many rows as the remaining shots pay for at the current number of shots per evaluation
+            free = [i for i, c in enumerate(cached) if c]
+            pending = [i for i, c in enumerate(cached) if not c]
+            while True:
+                affordable = max(int(self.remaining // self.shots_per_evaluation), 0)
+                new, pending = pending[:affordable], pending[affordable:]
+                chosen = sorted(free + new)
+                if not chosen:
+                    break
+                fired = self.shot_counter() if self.shot_counter is not None else 0
+                results = self.evaluation_function([parameter_sets[i] for i in chosen])
+                fired = self.shot_counter() - fired if self.shot_counter is not None else len(new)
+                for i, result in zip(chosen, results):
+                    self.known[unknown[i]] = result
+                self.remaining -= fired
+                self.shots += fired
+                self.evaluations += len(new)
+                free = []
+                if not new or not pending:
+                    break
+        fitness = np.array([self.known[k][0] if k in self.known else -np.inf for k in keys], dtype=np.float64)
+        return fitness, [self.known[k][1] if k in self.known else None for k in keys]
+
+
+def _compass(x, delta):
+    """
+    :return: matrix of the 2 * d compass probes around x (+delta and -delta in every dimension)
+    """
+    moves = np.diag(delta)
+    return np.concatenate([x + moves, x - moves])
+
+
+def compass_search(x, fitness, fault_class, evaluate: BudgetedEvaluator, initial_step=2):
+    """
+    Compass search on the parameter grid.
+    All 2 * d compass probes around the current point are evaluated as one batch, and the search moves to the best probe
+    if it is better than the current point. Otherwise, the step is halved. The search stops when the step is smaller
+    than the grid step or when the budget is exhausted.
+    :param x: gene vector of the starting point
+    :param fitness: fitness of the starting point
+    :param fault_class: fault class of the starting point
+    :param evaluate: BudgetedEvaluator
+    :param initial_step: initial step in number of grid steps
+    :return: gene vector, fitness and fault class of the best point found
+    """
+    # the step is a whole number of grid steps, so float axes are also probed at their single grid step
+    multiple = np.full(len(x), int(initial_step))
+    while np.all(multiple >= 1) and not evaluate.exhausted:
+        probes = _compass(x, multiple * evaluate.steps)
+        probe_fitness, probe_faults = evaluate(probes)
+        best = int(np.argmax(probe_fitness))
+        if probe_fitness[best] > fitness:
+            x, fitness, fault_class = evaluate.snap(probes[best]), probe_fitness[best], probe_faults[best]
+        else:
+            multiple = multiple // 2
+    return x, fitness, fault_class
+
+
+def pattern_search(x, fitness, fault_class, evaluate: BudgetedEvaluator, initial_step=2):
+    """
+    Pattern search on the parameter grid: compass search where every successful move is followed by pattern moves in
+    the same direction, doubling the move while the fitness improves.
+    :param x: gene vector of the starting point
+    :param fitness: fitness of the starting point
+    :param fault_class: fault class of the starting point
+    :param evaluate: BudgetedEvaluator
+    :param initial_step: initial step in number of grid steps
+    :return: gene vector, fitness and fault class of the best point found
+    """
+    multiple = np.full(len(x), int(initial_step))
+    while np.all(multiple >= 1) and not evaluate.exhausted:
+        probes = _compass(x, multiple * evaluate.steps)
+        probe_fitness, probe_faults = evaluate(probes)
+        best = int(np.argmax(probe_fitness))
+        if probe_fitness[best] <= fitness:
+            multiple = multiple // 2
+            continue
+        direction = evaluate.snap(probes[best]) - x
+        x, fitness, fault_class = evaluate.snap(probes[best]), probe_fitness[best], probe_faults[best]
+        while not evaluate.exhausted:
+            direction = 2 * direction
+            pattern = evaluate.snap(x + direction)
+            if np.array_equal(pattern, x):
+                break
+            pattern_fitness, pattern_faults = evaluate(pattern)
+            if pattern_fitness[0] <= fitness:
+                break
+            x, fitness, fault_class = pattern, pattern_fitness[0], pattern_faults[0]
+    return x, fitness, fault_class
+
+
+def nelder_mead(x, fitness, fault_class, evaluate: BudgetedEvaluator, initial_step=2, max_iterations=100):
+    """
+    Nelder-Mead simplex search on the parameter grid (maximization).
+    The simplex starts with the point and its neighbours at initial_step grid steps in every dimension. Reflection,
+    expansion, contraction and shrink points are rounded to the closest grid point. The search stops when the simplex
+    collapses to one point, after max_iterations or when the budget is exhausted.
+    :param x: gene vector of the starting point
+    :param fitness: fitness of the starting point
+    :param fault_class: fault class of the starting point
+    :param evaluate: BudgetedEvaluator
+    :param initial_step: initial size of the simplex in number of grid steps
+    :param max_iterations: maximal number of iterations
+    :return: gene vector, fitness and fault class of the best point found
+    """
+    d = len(x)
+    simplex = np.concatenate([[x], evaluate.snap(x + np.diag(initial_step * evaluate.steps))])
+    values, faults = evaluate(simplex[1:])
+    values = np.concatenate([[fitness], values])
+    faults = [fault_class] + faults
+
+    for _ in range(max_iterations):
+        if evaluate.exhausted or np.all(simplex == simplex[0]):
+            break
+        order = np.argsort(-values, kind='stable')
+        simplex, values, faults = simplex[order], values[order], [faults[i] for i in order]
+        centroid = simplex[:-1].mean(axis=0)
+        reflected = evaluate.snap(2 * centroid - simplex[-1])
+        f_reflected, c_reflected = evaluate(reflected)
+        if f_reflected[0] > values[0]:
+            expanded = evaluate.snap(3 * centroid - 2 * simplex[-1])
+            f_expanded, c_expanded = evaluate(expanded)
+            if f_expanded[0] > f_reflected[0]:
+                simplex[-1], values[-1], faults[-1] = expanded, f_expanded[0], c_expanded[0]
+            else:
+                simplex[-1], values[-1], faults[-1] = reflected, f_reflected[0], c_reflected[0]
+            continue
+        if f_reflected[0] > values[d - 1]:
+            simplex[-1], values[-1], faults[-1] = reflected, f_reflected[0], c_reflected[0]
+            continue
+        contracted = evaluate.snap((centroid + simplex[-1]) / 2)
+        f_contracted, c_contracted = evaluate(contracted)
+        if f_contracted[0] > values[-1]:
+            simplex[-1], values[-1], faults[-1] = contracted, f_contracted[0], c_contracted[0]
+            continue
+        # shrink towards the best point, all new points in one batch
+        shrunk = evaluate.snap((simplex[0] + simplex[1:]) / 2)
+        if np.array_equal(shrunk, simplex[1:]):
+            break
+        f_shrunk, c_shrunk = evaluate(shrunk)
+        simplex[1:], values[1:], faults[1:] = shrunk, f_shrunk, c_shrunk
+
+    best = int(np.argmax(values))
+    if values[best] > fitness:
+        return simplex[best], values[best], faults[best]
+    return x, fitness, fault_class
+
+
+def coordinate_descent(x, fitness, fault_class, evaluate: BudgetedEvaluator, initial_step=2):
+    """
+    Randomized coordinate search on the parameter grid.
+    In every step, one random dimension is probed at +step and -step (one batch), and the search moves to the better
+    probe if it improves the fitness. Otherwise, the step of that dimension is halved. The search stops when the steps
+    of all dimensions are smaller than the grid step or when the budget is exhausted.
+    :param x: gene vector of the starting point
+    :param fitness: fitness of the starting point
+    :param fault_class: fault class of the starting point
+    :param evaluate: BudgetedEvaluator
+    :param initial_step: initial step in number of grid steps
+    :return: gene vector, fitness and fault class of the best point found
+    """
+    multiple = np.full(len(x), int(initial_step))
+    while np.any(multiple >= 1) and not evaluate.exhausted:
+        i = evaluate.rng.choice(np.flatnonzero(multiple >= 1))
+        move = np.zeros(len(x))
+        move[i] = multiple[i] * evaluate.steps[i]
+        probes = np.array([x + move, x - move])
+        probe_fitness, probe_faults = evaluate(probes)
+        best = int(np.argmax(probe_fitness))
+        if probe_fitness[best] > fitness:
+            x, fitness, fault_class = evaluate.snap(probes[best]), probe_fitness[best], probe_faults[best]
+        else:
+            multiple[i] //= 2
+    return x, fitness, fault_class
@@ -0,0 +1,121 @@
+import numpy as np
+from statistics import NormalDist
+from scipy.spatial import cKDTree
+from helper import TabuList
+from parameters import ParameterSet
+from .local_search import interesting_indexes, replace_worst
+from .methods import BudgetedEvaluator, pattern_search
+
+
+class LocalSearchScheduler:
+    """
+    Local search that runs a grid search method (pattern_search, compass_search, nelder_mead, coordinate_descent) from
+    the interesting solutions of the population, with a fixed shot budget per generation.
+    The candidates are the interesting solutions that were not used as starting points before. Their expected
+    improvement over the best solution of the population is estimated from their fitness and the spread of the fitness
+    of their nearest neighbours in the population. The candidates with the highest expected improvement (at most
+    max_points) get a share of the budget proportional to it; candidates whose share does not pay for min_evaluations
+    evaluations are dropped, and the budget a search does not use goes to the next candidate.
+    The budget is counted in the shots the GA fires for the evaluations (see BudgetedEvaluator), so it follows
+    nb_measurements and the AdaptiveMeasurement of the GA. Solutions in the TESTED list do not use the budget. Every
+    scheduler has its own set of visited solutions, reset at the start of every GA run, so several GAs in one process
+    do not share it.
+    The scheduler gets the batch evaluation function of the GA (it has the attribute 'batched').
+    """
+    batched = True
+
+    def __init__(self, method=pattern_search, budget=100, threshold=0.85, max_points=3, min_evaluations=None,
+                 neighbours=5):
+        """
+        :param method: local search method, function (x, fitness, fault class, BudgetedEvaluator) -> (x, fitness,
+        fault class)
+        :param budget: number of shots per generation
+        :param threshold: fraction of the highest fault class fitness a solution needs to be a candidate
+        :param max_points: maximal number of starting points per generation
+        :param min_evaluations: minimal number of evaluations of one search, default: 2 * number of parameters
+        :param neighbours: number of neighbours used to estimate the fitness spread around a candidate
+        """
+        self.method = method
+        self.budget = budget
+        self.threshold = threshold
+        self.max_points = max_points
+        self.min_evaluations = 2 * len(ParameterSet.get_param_names()) if min_evaluations is None else min_evaluations
+        self.neighbours = neighbours
+        self.visited = set()
+        self.__name__ = f'local_search_scheduler({method.__name__})'
+
+    def reset(self):
+        self.visited.clear()
+
+    def expected_improvement(self, population, candidates):
+        """
+        :param population: list of evaluated ParameterSet solutions
+        :param candidates: indexes of the candidate solutions
+        :return: array with the expected improvement of every candidate
+        """
+        names = ParameterSet.get_param_names()
+        mins, maxs, _ = ParameterSet.get_param_limits(as_array=True).T
+        genes = np.array([[getattr(ps, name) for name in names] for ps in population])
+        genes = (genes - mins) / np.maximum(maxs - mins, 1)
+        fitness = np.array([ps.fitness for ps in population], dtype=np.float64)
+        best = np.max(fitness)
+        k = min(self.neighbours + 1, len(population))
+        _, neighbours = cKDTree(genes).query(genes[candidates], k=k)
+        spread = np.std(fitness[np.asarray(neighbours).reshape(len(candidates), k)], axis=1)
+        spread = np.maximum(spread, 1e-3 * max(abs(best), 1.0))
+        normal = NormalDist()
+        ei = []
+        for mu, sigma in zip(fitness[candidates], spread):
+            z = (mu - best) / sigma
+            ei.append((mu - best) * normal.cdf(z) + sigma * normal.pdf(z))
+        return np.array(ei)
+
+    def allocate(self, ei, shots, shots_per_evaluation=1):
+        """
+        :param ei: expected improvement of the candidates
+        :param shots: number of shots to split
+        :param shots_per_evaluation: expected number of shots of one evaluation, a share has to pay for min_evaluations
+        :return: list of (candidate position, number of shots) pairs, from the highest expected improvement
+        """
+        order = list(np.argsort(-ei, kind='stable')[:self.max_points])
+        while order:
+            weights = ei[order] if np.sum(ei[order]) > 0 else np.ones(len(order))
+            shares = np.floor(shots * weights / np.sum(weights)).astype(int)
+            if shares[-1] >= self.min_evaluations * shots_per_evaluation or len(order) == 1:
+                return list(zip(order, shares))
+            order.pop()
+        return []
+
+    def __call__(self, population, evaluation_function, TESTED: TabuList, rng=None):
+        """
+        Function that performs the local search with the budget of one generation.
+        Solutions that were better after local search replace the worst solutions of the population, as in
+        hooke_jeeves. The solutions in the population have to be evaluated before.
+        :param population: list of ParameterSet solutions
+        :param evaluation_function: function that evaluates a list of ParameterSet solutions, with the attributes
+        'shots' and 'first_shots' (GeneticAlgorithm.local_search_evaluation)
+        :param rng: numpy Generator of the randomized methods
+        :return: population after local search
+        """
+        candidates = interesting_indexes(population, self.visited, self.threshold)
+        if len(candidates) < 1 or self.budget < 1:
+            return population
+        evaluate = BudgetedEvaluator(evaluation_function, TESTED, rng=rng)
+        allocation = self.allocate(self.expected_improvement(population, candidates), self.budget,
+                                   evaluate.shots_per_evaluation)
+        indexes = [candidates[p] for p, _ in allocation]
+        self.visited.update(population[i] for i in indexes)
+
+        names = ParameterSet.get_param_names()
+        improved = []
+        for i, (_, share) in zip(indexes, allocation):
+            evaluate.add_budget(share)
+            start = population[i]
+            x = np.array([getattr(start, name) for name in names], dtype=np.float64)
+            x, fitness, fault_class = self.method(x, start.fitness, start.fault_class, evaluate)
+            if fitness > start.fitness:
+                ps = ParameterSet(*ParameterSet.get_space().to_python(x))
+                ps.update_fitness(float(fitness), fault_class)
+                ps.created = 'l'
+                improved.append((i, ps))
+        return replace_worst(population, indexes, improved)
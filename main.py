@@ -4,7 +4,8 @@ import json
 import numpy as np
 from initializations import TaguchiInitialization, taguchi_from_example, taguchi_from_file
 import fitness
-from helper import converter
+from helper import converter, PersistentCache
+from parameters import set_parameter_limits_from_ini_file
 from sort_algorithms import greedy_euclidean
 from crossovers import uniform_crossover, average_crossover
 from bench_connection import dummy_cartography
@@ -17,10 +18,13 @@ POPULATION_SIZE = 36
 ITERATIONS = 50
 MUTATION_PROB = 0.05  # mutation probability
 ELITE_SIZE = 2
+SEED = None  # seed of the random generator of the GA, None for a random seed
 
 ########## FAULT INJECTION PARAMETERS ############
 NB_MEASUREMENTS = 5  # with the same parameter set (same spot)
 parameter_info_file = 'parameter_info.ini'
+# SQLite file with evaluations shared between runs on the same chip, e.g. 'evaluations.sqlite', None for no cache
+cache_file = None
 
 
 def dummy_set_iteration(n):
@@ -36,6 +40,9 @@ if __name__ == "__main__":
     
     # construct the cartography class
     carto = dummy_cartography()
+    # the cache stores the parameters of the parameter space, so the limits are loaded first
+    set_parameter_limits_from_ini_file(parameter_info_file)
+    cache = PersistentCache(cache_file, chip='dummy_cartography') if cache_file else None
     
     # create the genetic algorithm instance 
     # (define the parameters and functions of the GA)
@@ -51,7 +58,9 @@ if __name__ == "__main__":
                                   stop_condition=stop_cond_iterations,
                                   selection=ktournament(),
                                   crossover=average_crossover,
-                                  sort_function=greedy_euclidean)
+                                  sort_function=greedy_euclidean,
+                                  cache=cache,
+                                  rng=SEED)
     
     # print information about the GA
     print(gen_alg)
@@ -63,3 +72,4 @@ if __name__ == "__main__":
         # done in the GeneticAlgorithm::run function
         population = gen_alg.run()
         print(population)
+        print("Evaluation cache:", gen_alg.cache_stats)
@@ -0,0 +1,27 @@
+import fitness
+from benchmarks import run_suite, write_results, load_results, compare_results
+
+########## BENCHMARK PARAMETERS ###########
+CHIPS = None  # names of the synthetic chips (benchmarks.CHIPS), None for all
+ALGORITHMS = None  # names of the algorithms (benchmarks.ALGORITHMS), None for all
+SEEDS = (0, 1, 2)
+SETTINGS = {'pop_size': 30, 'max_iterations': 10, 'nb_measurements': 5, 'random_points': 300,
+            'parameter_info_file': 'parameter_info.ini'}
+results_file = 'benchmark_results.json'
+# results of an earlier run to compare with, e.g. 'benchmark_baseline.json', None for no comparison
+baseline_file = None
+
+
+if __name__ == "__main__":
+    fitness.set_fitness_values('fitness.info')
+
+    results = run_suite(CHIPS, ALGORITHMS, SEEDS, SETTINGS)
+    write_results(results_file, results, SETTINGS)
+    print("Results written to", results_file)
+
+    if baseline_file is not None:
+        regressions = compare_results(load_results(baseline_file), results)
+        for chip, algorithm, metric, before, after in regressions:
+            print(f"Regression: {chip} {algorithm} {metric}: {before:.4g} -> {after:.4g}")
+        if not regressions:
+            print("No regressions against", baseline_file)
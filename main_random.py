@@ -1,42 +1,52 @@
-import collections
-import json
+import math
 import numpy as np
 import fitness
-from helper import converter
-from bench_connection import dummy_cartography
-from parameters import ParameterSet
-
-NB_DIFF_TESTS = 1000  # how many points (parameter sets) should be tested
+from helper import PersistentCache
+from bench_connection import vectorized_dummy_cartography
+from parameters import ParameterSet, set_parameter_limits_from_ini_file
+from random_search import RandomSearch
+from sort_algorithms import PathPlanner
+
+NB_DIFF_TESTS = 1000  # how many points (parameter sets) should be tested, None for the whole grid
+BATCH_SIZE = 1000  # points sent to the bench at once, every batch is ordered with the path planner
+ORDER = 'random'  # 'random' for the random search, 'sequential' for a sweep of the whole grid in order
+SEED = None  # seed of the random generator, None for a random seed
+NB_BEST = 10  # number of best points printed at the end
 
 ########## FAULT INJECTION PARAMETERS ############
 NB_MEASUREMENTS = 5  # with the same parameter set (same spot)
 parameter_info_file = 'parameter_info.ini'
+# SQLite file with evaluations shared between runs on the same chip, e.g. 'evaluations.sqlite', None for no cache
+cache_file = None
+# directory of the streaming log (ga_log.LogReader), None for no log
+log_directory = 'random_search_log'
 
 
 if __name__ == "__main__":
     fitness.set_fitness_values('fitness.info')
+    set_parameter_limits_from_ini_file(parameter_info_file)
 
-    # run_times defines how many times you want to run the same GA
+    # run_times defines how many times you want to run the same search
     run_times = 1
 
     # construct the cartography class
-    carto = dummy_cartography()
+    carto = vectorized_dummy_cartography()
+    cache = PersistentCache(cache_file, chip='dummy_cartography') if cache_file else None
+
+    search = RandomSearch(carto.apply_bench_parameter,
+                          carto.apply_bench_batch,
+                          nb_measurements=NB_MEASUREMENTS,
+                          fitness_func=fitness.percentage_fitness,
+                          sort_function=PathPlanner(time_limit=0.5),
+                          batch_size=BATCH_SIZE,
+                          cache=cache,
+                          order=ORDER,
+                          rng=np.random.default_rng(SEED))
+    print(search)
 
     for i in range(run_times):
-        all_points = set()
-        while len(all_points) < NB_DIFF_TESTS:
-            ps = ParameterSet()
-            if ps in all_points:
-                print('skipping', ps)
-                continue
-            ## evaluate the parameter set
-            fault_classes = list()
-            for n in range(0, NB_MEASUREMENTS):
-                ## Apply bench parameters & LFI
-                fault_classes.append(carto.apply_bench_parameter(ps))
-            ps.fitness, ps.fault_class = fitness.percentage_fitness(fault_classes)
-            all_points.add(ps)
-            print(ps)
-
-
-
+        print("Running random search ", i + 1)
+        population = search.run(NB_DIFF_TESTS, log_directory)
+        print(len(population), "points of", math.prod(ParameterSet.get_space().levels.tolist()), "evaluated")
+        for j in np.argsort(-population.fitness, kind='stable')[:NB_BEST]:
+            print(population[int(j)])
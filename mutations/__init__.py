@@ -1 +1,2 @@
-from .mutations import uniform_mutation
\ No newline at end of file
+from .mutations import uniform_mutation, gaussian_mutation, polynomial_mutation, uniform_mutation_vectorized, \
+    gaussian_mutation_vectorized, polynomial_mutation_vectorized, for_parameter_sets
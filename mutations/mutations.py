@@ -1,24 +1,132 @@
 from parameters import *
-import random
+from random_generator import as_generator
 
-# MutationFunction = Callable[[ParameterSet, float], ParameterSet]
+# MutationFunction = Callable[[ParameterSet, float, np.random.Generator], ParameterSet]
 
 
-def uniform_mutation(solution: ParameterSet, mutation_prob=0.05):
+def uniform_mutation(solution: ParameterSet, mutation_prob=0.05, rng=None):
     """
     Function takes a ParameterSet solution and changes some of the parameter values with probability
     self.mutation_prob. The values are replaced by the new random value (mutation) from the allowed interval
     for the given parameter.
-    :param mutation_prob:
+    :param mutation_prob: mutation probability, one value or one value per parameter (per-gene rates)
     :param solution: ParameterSet solution
+    :param rng: numpy Generator, default: the default generator of the random_generator module
     :return: ParameterSet solution after mutation
     """
     # uniform, operator replaces the value of the chosen gene with a uniform random value selected between the user-specified upper and lower bounds for that gene.
-    rand = random.random
-    limits = ParameterSet.get_param_limits(for_expanding=True, as_dict=True)
-    if rand() < mutation_prob: solution.x = random.randrange(*limits['x'])
-    if rand() < mutation_prob: solution.y = random.randrange(*limits['y'])
-    if rand() < mutation_prob: solution.delay = random.randrange(*limits['delay'])
-    if rand() < mutation_prob: solution.power_width = random.randrange(*limits['power_width'])
-    if rand() < mutation_prob: solution.intensity = random.randrange(*limits['intensity'])
-    return solution
\ No newline at end of file
+    rng = as_generator(rng)
+    space = ParameterSet.get_space()
+    for column, (name, mutate) in enumerate(zip(space.names, rng.random(len(space.names)) < mutation_prob)):
+        if mutate:
+            setattr(solution, name, space.random_value(column, rng))
+    return solution
+
+# VectorizedMutationFunction = Callable[[np.ndarray, float, np.random.Generator], np.ndarray]
+
+
+def uniform_mutation_vectorized(genes: np.ndarray, mutation_prob=0.05, rng=None):
+    """
+    Uniform mutation (see uniform_mutation) for a whole gene matrix at once.
+    Every gene is replaced with probability mutation_prob by a random grid index of its parameter.
+    :param genes: gene matrix of grid indexes, one row per solution
+    :param mutation_prob: mutation probability, one value or one value per parameter (per-gene rates)
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: gene matrix after mutation (the input is modified in place)
+    """
+    rng = as_generator(rng)
+    levels = ParameterSet.get_space().levels
+    mask = _mutation_mask(genes.shape, mutation_prob, rng)
+    rows, columns = np.nonzero(mask)
+    genes[rows, columns] = rng.integers(0, levels[columns])
+    return genes
+
+
+def _mutation_mask(shape, mutation_prob, rng):
+    """
+    :param mutation_prob: mutation probability, one value or one value per parameter (per-gene rates)
+    :return: boolean mask of the genes to mutate
+    """
+    return rng.random(shape) < np.asarray(mutation_prob, dtype=np.float64)
+
+
+def gaussian_mutation_vectorized(sigma=0.1):
+    """
+    :param sigma: standard deviation of the step, relative to the axis of the parameter, one value or one value per
+    parameter
+    :return: Gaussian mutation for gene matrices
+    """
+    def gaussian_mutation_vectorized(genes: np.ndarray, mutation_prob=0.05, rng=None):
+        """
+        Gaussian mutation: every gene is moved with probability mutation_prob by a normally distributed number of grid
+        steps (at least one step), the result is snapped and clipped to the grid.
+        :param genes: gene matrix of grid indexes, one row per solution
+        :param mutation_prob: mutation probability, one value or one value per parameter
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: gene matrix after mutation (the input is modified in place)
+        """
+        rng = as_generator(rng)
+        levels = ParameterSet.get_space().levels
+        rows, columns = np.nonzero(_mutation_mask(genes.shape, mutation_prob, rng))
+        scale = np.broadcast_to(np.asarray(sigma, dtype=np.float64) * (levels - 1), levels.shape)[columns]
+        steps = np.rint(rng.normal(0, scale)).astype(np.int64)
+        # a mutation that is rounded to no change moves one step
+        steps[steps == 0] = rng.choice([-1, 1], size=int(np.sum(steps == 0)))
+        genes[rows, columns] = np.clip(genes[rows, columns] + steps, 0, levels[columns] - 1)
+        return genes
+    return gaussian_mutation_vectorized
+
+
+def polynomial_mutation_vectorized(eta=20):
+    """
+    :param eta: distribution index, a large eta creates small steps
+    :return: polynomial mutation for gene matrices
+    """
+    def polynomial_mutation_vectorized(genes: np.ndarray, mutation_prob=0.05, rng=None):
+        """
+        Polynomial mutation (Deb): every gene is moved with probability mutation_prob by delta times the axis of its
+        parameter (at least one step), delta in [-1, 1] has a polynomial distribution around 0. The result is snapped
+        and clipped to the grid.
+        :param genes: gene matrix of grid indexes, one row per solution
+        :param mutation_prob: mutation probability, one value or one value per parameter
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: gene matrix after mutation (the input is modified in place)
+        """
+        rng = as_generator(rng)
+        levels = ParameterSet.get_space().levels
+        rows, columns = np.nonzero(_mutation_mask(genes.shape, mutation_prob, rng))
+        u = rng.random(len(rows))
+        delta = np.where(u < 0.5, (2 * u) ** (1 / (eta + 1)) - 1, 1 - (2 * (1 - u)) ** (1 / (eta + 1)))
+        steps = np.rint(delta * (levels[columns] - 1)).astype(np.int64)
+        # a mutation that is rounded to no change moves one step in the direction of delta
+        zero = steps == 0
+        steps[zero] = np.where(delta[zero] < 0, -1, 1)
+        genes[rows, columns] = np.clip(genes[rows, columns] + steps, 0, levels[columns] - 1)
+        return genes
+    return polynomial_mutation_vectorized
+
+
+def for_parameter_sets(mutation, name=None):
+    """
+    Function turns a vectorized mutation into a mutation of one ParameterSet solution.
+    :param mutation: vectorized mutation, (gene matrix, mutation probability, rng) -> gene matrix
+    :param name: name of the new mutation, default: name of the vectorized mutation without '_vectorized'
+    :return: mutation (solution, mutation probability, rng) -> solution, changed in place
+    """
+    def mutate(solution: ParameterSet, mutation_prob=0.05, rng=None):
+        space = ParameterSet.get_space()
+        genes = space.encode([[getattr(solution, n) for n in space.names]])
+        genes = mutation(genes, mutation_prob, rng=rng)[0]
+        for n, value in zip(space.names, space.to_python(space.decode(genes).tolist())):
+            setattr(solution, n, value)
+        return solution
+    mutate.__name__ = name or mutation.__name__.replace('_vectorized', '')
+    return mutate
+
+
+def gaussian_mutation(sigma=0.1):
+    return for_parameter_sets(gaussian_mutation_vectorized(sigma))
+
+
+def polynomial_mutation(eta=20):
+    return for_parameter_sets(polynomial_mutation_vectorized(eta))
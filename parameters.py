@@ -1,33 +1,202 @@
 # -*- coding: utf-8 -*-
-import random
 import numpy as np
 import copy
 import configparser
+from random_generator import as_generator
+
+
+# default parameters and the names of the ParameterSet class attributes with their [min, max, step] limits
+DEFAULT_PARAMETERS = ['x', 'y', 'delay', 'power_width', 'intensity']
+LIMIT_ATTRIBUTES = [('XMIN', 'XMAX', 'XSTEP'), ('YMIN', 'YMAX', 'YSTEP'), ('DMIN', 'DMAX', 'DSTEP'),
+                    ('PWMIN', 'PWMAX', 'PWSTEP'), ('IMIN', 'IMAX', 'ISTEP')]
+PARAMETER_TYPES = {'int': int, 'float': float}
 
 
 def set_parameter_limits_from_ini_file(file_name: str):
     if file_name == None:
         return
-    config = configparser.ConfigParser(allow_no_value=False, strict=True, empty_lines_in_values=False,
-                                       interpolation=None)
-    config.read(file_name)
-    if not config.has_section('parameter_info'):
-        raise ValueError("Parameter info file has to start with a section name: parameter_info.")
-    ParameterSet.XMIN = config.getint('parameter_info', 'XMIN')
-    ParameterSet.XMAX = config.getint('parameter_info', 'XMAX')
-    ParameterSet.XSTEP = config.getint('parameter_info', 'XSTEP')
-    ParameterSet.YMIN = config.getint('parameter_info', 'YMIN')
-    ParameterSet.YMAX = config.getint('parameter_info', 'YMAX')
-    ParameterSet.YSTEP = config.getint('parameter_info', 'YSTEP')
-    ParameterSet.DMIN = config.getint('parameter_info', 'DMIN')
-    ParameterSet.DMAX = config.getint('parameter_info', 'DMAX')
-    ParameterSet.DSTEP = config.getint('parameter_info', 'DSTEP')
-    ParameterSet.PWMIN = config.getint('parameter_info', 'PWMIN')
-    ParameterSet.PWMAX = config.getint('parameter_info', 'PWMAX')
-    ParameterSet.PWSTEP = config.getint('parameter_info', 'PWSTEP')
-    ParameterSet.IMIN = config.getint('parameter_info', 'IMIN')
-    ParameterSet.IMAX = config.getint('parameter_info', 'IMAX')
-    ParameterSet.ISTEP = config.getint('parameter_info', 'ISTEP')
+    ParameterSet.set_space(ParameterSpace.from_ini_file(file_name))
+
+
+class ParameterSpace:
+    """
+    Grid of all allowed parameter values, built once from the parameter limits.
+    Every parameter has the values min, min + step, ... up to max, so a solution is either described by its physical
+    values or by its grid indexes (index of the value on the axis of every parameter). The space converts between the
+    two (encode, decode) and clips values or indexes to the grid, for one solution or a whole matrix at once.
+    The parameters (any number, any names) and their types ('int' or 'float') come from the parameter info file; the
+    default space has the five parameters x, y, delay, power_width and intensity, with the limits of the ParameterSet
+    class attributes (XMIN ... ISTEP). The current space is returned by ParameterSet.get_space().
+    """
+
+    def __init__(self, names, limits, types=None, legacy=False):
+        """
+        :param names: parameter names
+        :param limits: [min, max, step] of every parameter
+        :param types: 'int' or 'float' for every parameter, default: all 'int'
+        :param legacy: True if the limits are the ParameterSet class attributes of the default parameters
+        """
+        self.names = list(names)
+        self.types = ['int'] * len(self.names) if types is None else list(types)
+        for t in self.types:
+            if t not in PARAMETER_TYPES:
+                raise ValueError("Unknown parameter type", t, "allowed types are", list(PARAMETER_TYPES))
+        self.integer = all(t == 'int' for t in self.types)
+        self.dtype = np.int64 if self.integer else np.float64
+        self.legacy = legacy
+        self.limits = np.array(limits, dtype=self.dtype).reshape(len(self.names), 3)
+        self.mins, self.maxs, self.steps = (np.ascontiguousarray(column) for column in self.limits.T)
+        self.levels = np.floor((self.maxs - self.mins) / self.steps + 1e-9).astype(np.int64) + 1
+        self.axes = [np.arange(self.levels[i]) * self.steps[i] + self.mins[i] for i in range(len(self.names))]
+        self.columns = {name: i for i, name in enumerate(self.names)}
+        # python copies for the per-solution functions (faster than numpy scalars)
+        self.converters = [PARAMETER_TYPES[t] for t in self.types]
+        self.grid = list(zip(self.mins.tolist(), self.steps.tolist(), self.levels.tolist()))
+        self.bounds = dict(zip(self.names, zip(self.mins.tolist(), self.maxs.tolist(), self.converters)))
+        self.key = tuple(self.limits.ravel().tolist())
+
+    @classmethod
+    def from_ini_file(cls, file_name: str):
+        """
+        Function reads the parameter space from a parameter info file, either with the section 'parameter_info' (limits
+        XMIN ... ISTEP of the five default parameters) or with the section 'parameters', where every line defines one
+        parameter as 'name = min, max, step' or 'name = min, max, step, type'.
+        """
+        config = configparser.ConfigParser(allow_no_value=False, strict=True, empty_lines_in_values=False,
+                                           interpolation=None)
+        config.read(file_name)
+        if config.has_section('parameters'):
+            names, limits, types = [], [], []
+            for name, definition in config.items('parameters'):
+                fields = [field.strip() for field in definition.split(',')]
+                if len(fields) not in (3, 4):
+                    raise ValueError("Parameter", name, "has to be defined as: min, max, step[, type].")
+                parameter_type = fields[3] if len(fields) == 4 else 'int'
+                if parameter_type not in PARAMETER_TYPES:
+                    raise ValueError("Unknown type", parameter_type, "of parameter", name)
+                names.append(name)
+                limits.append([PARAMETER_TYPES[parameter_type](float(field)) for field in fields[:3]])
+                types.append(parameter_type)
+            return cls(names, limits, types)
+        if not config.has_section('parameter_info'):
+            raise ValueError("Parameter info file has to start with a section name: parameter_info or parameters.")
+        limits = [[config.getint('parameter_info', attribute) for attribute in attributes]
+                  for attributes in LIMIT_ATTRIBUTES]
+        return cls(DEFAULT_PARAMETERS, limits, legacy=True)
+
+    def to_python(self, values):
+        """
+        :param values: physical values of one solution
+        :return: list of python values with the type of every parameter
+        """
+        return [int(round(v)) if c is int else float(round(v, 12)) for c, v in zip(self.converters, values)]
+
+    def value(self, column, index):
+        """
+        :return: physical value of the grid index of one parameter
+        """
+        low, step, _ = self.grid[column]
+        value = low + int(index) * step
+        return int(round(value)) if self.converters[column] is int else float(round(value, 12))
+
+    def index(self, column, value):
+        """
+        :return: grid index of the physical value of one parameter (closest grid point)
+        """
+        low, step, levels = self.grid[column]
+        return min(max(int(round((value - low) / step)), 0), levels - 1)
+
+    def random_value(self, column, rng=None):
+        """
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: uniformly drawn value of the axis of one parameter
+        """
+        return self.value(column, as_generator(rng).integers(self.grid[column][2]))
+
+    @property
+    def size(self):
+        """
+        :return: number of points of the grid
+        """
+        return int(np.prod(self.levels))
+
+    def encode(self, values):
+        """
+        :param values: physical values, vector of one solution or matrix with one row per solution
+        :return: grid indexes of the closest grid points (int64)
+        """
+        indexes = np.rint((np.asarray(values) - self.mins) / self.steps).astype(np.int64)
+        return np.clip(indexes, 0, self.levels - 1, out=indexes)
+
+    def decode(self, indexes, out=None):
+        """
+        :param indexes: grid indexes, vector of one solution or matrix with one row per solution
+        :param out: optional output array
+        :return: physical values
+        """
+        values = np.multiply(indexes, self.steps, out=out)
+        return np.add(values, self.mins, out=values)
+
+    def clip(self, values, out=None):
+        """
+        :return: physical values clipped to the min and max of their parameter
+        """
+        return np.clip(values, self.mins, self.maxs, out=out)
+
+    def clip_indexes(self, indexes, out=None):
+        """
+        :return: grid indexes clipped to the axes of their parameter
+        """
+        return np.clip(indexes, 0, self.levels - 1, out=out)
+
+    def clip_value(self, name, value):
+        """
+        :param name: parameter name
+        :param value: physical value
+        :return: value clipped to the min and max of the parameter, rounded to the nearest integer (python int) for an
+        int parameter and converted to a python float for a float parameter
+        """
+        low, high, converter = self.bounds[name]
+        value = min(max(value, low), high)
+        return int(round(value)) if converter is int else float(value)
+
+    def flat_index(self, indexes):
+        """
+        :param indexes: matrix of grid indexes, one row per solution
+        :return: one integer per solution, the position of the solution in the whole grid (mixed radix number)
+        """
+        return np.ravel_multi_index(np.asarray(indexes).T, self.levels)
+
+    def random_indexes(self, size, rng=None):
+        """
+        :param size: number of solutions
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: matrix of uniformly drawn grid indexes
+        """
+        return as_generator(rng).integers(0, self.levels, size=(size, len(self.levels)))
+
+    def from_uniform(self, array):
+        """
+        :param array: values in [0, 1], vector of one solution or matrix with one row per solution
+        :return: grid indexes, 0 is the first and 1 the last value of every axis
+        """
+        return np.rint(np.asarray(array) * (self.levels - 1)).astype(np.int64)
+
+    def from_level_indexes(self, indexes, levels, rng=None):
+        """
+        Function maps factor levels (e.g. of an orthogonal array) to grid indexes: every axis is split in as many equal
+        parts as the factor has levels, and a random grid point is taken from the part of the level.
+        :param indexes: level of every factor, vector of one solution or matrix with one row per solution
+        :param levels: number of levels of every factor
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: grid indexes
+        """
+        indexes, levels = np.asarray(indexes, dtype=np.int64), np.asarray(levels, dtype=np.int64)
+        part = np.round(self.levels / levels).astype(np.int64)
+        low = indexes * part
+        high = np.where(indexes < levels - 1, (indexes + 1) * part, self.levels)
+        draws = as_generator(rng).random(indexes.shape)
+        return np.minimum(low + (draws * (high - low)).astype(np.int64), self.levels - 1)
 
 
 class ParameterSet:
@@ -51,65 +220,107 @@ class ParameterSet:
     IMAX = 100
     ISTEP = 1
 
-    def __init__(self, x=None, y=None, delay=None, power_width=None, intensity=None):
-        limits = ParameterSet.get_param_limits(for_expanding=True, as_dict=True)
-        self.x = random.randrange(*limits['x']) if x is None else x
-        self.y = random.randrange(*limits['y']) if y is None else y
-        self.delay = random.randrange(*limits['delay']) if delay is None else delay
-        self.power_width = random.randrange(*limits['power_width']) if power_width is None else power_width
-        self.intensity = random.randrange(*limits['intensity']) if intensity is None else intensity
+    _space = None
+
+    def __init__(self, *values, **named_values):
+        """
+        Parameter values are given in the order of the parameter names or by name, e.g. ParameterSet(x=10, y=20).
+        Parameters without a value get a random value from their axis, drawn from the default generator of the
+        random_generator module (ParameterSet.random takes a generator).
+        """
+        space = ParameterSet.get_space()
+        if len(values) > len(space.names):
+            raise TypeError("Too many parameter values, parameter set has", len(space.names), "parameters.")
+        for column, name in enumerate(space.names):
+            value = values[column] if column < len(values) else named_values.pop(name, None)
+            setattr(self, name, space.random_value(column) if value is None else value)
+        if named_values:
+            raise TypeError("Unknown parameters", list(named_values))
         self.fitness = None
         self.fault_class = None
         self.created = 'i'
 
     @staticmethod
-    def get_parameterset_from_indexes(indexes, levels):
-        if len(indexes) != len(levels):
-            raise ValueError()
+    def get_space():
+        """
+        Function returns the current ParameterSpace. The default space (five parameters with the limits of the class
+        attributes) is built again only when the limits change.
+        :return: ParameterSpace
+        """
+        space = ParameterSet._space
+        if space is not None and not space.legacy:
+            return space
+        key = tuple(getattr(ParameterSet, attribute) for attributes in LIMIT_ATTRIBUTES for attribute in attributes)
+        if space is None or space.key != key:
+            space = ParameterSet._space = ParameterSpace(DEFAULT_PARAMETERS,
+                                                         np.reshape(key, (len(LIMIT_ATTRIBUTES), 3)), legacy=True)
+        return space
+
+    @staticmethod
+    def set_space(space):
+        """
+        Function sets the parameter space of all solutions. The class attributes XMIN ... ISTEP are updated for the
+        default parameters of the space.
+        :param space: ParameterSpace, or None for the default space
+        """
+        ParameterSet._space = space
+        if space is None:
+            return
+        for name, attributes in zip(DEFAULT_PARAMETERS, LIMIT_ATTRIBUTES):
+            if name in space.columns and space.converters[space.columns[name]] is int:
+                for attribute, value in zip(attributes, space.limits[space.columns[name]].tolist()):
+                    setattr(ParameterSet, attribute, value)
 
-        limits = ParameterSet.get_param_limits(for_expanding=True)
-        if len(indexes) != len(limits):
-            raise ValueError("To many indexes for creating parameter set. Parameter set has", len(limits),
-                             "parameters.")
+    @staticmethod
+    def random(rng=None):
+        """
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: ParameterSet with values drawn uniformly from the axis of every parameter
+        """
+        space = ParameterSet.get_space()
+        return ParameterSet.from_indexes(space.random_indexes(1, rng)[0])
 
-        ps = []
-        for i in range(0, len(indexes)):
-            parts = levels[i]
-            values = np.arange(*limits[i])
-            index = indexes[i]
-            part = round(len(values) / parts, 0)
-            ps.append(values[random.randrange(index * part, (index + 1) * part if index < parts - 1 else len(values))])
-        return ParameterSet(*tuple(ps))
+    @staticmethod
+    def from_indexes(indexes):
+        """
+        :param indexes: grid indexes of one solution
+        :return: ParameterSet with the values of the grid point
+        """
+        space = ParameterSet.get_space()
+        return ParameterSet(*space.to_python(space.decode(np.asarray(indexes, dtype=np.int64)).tolist()))
+
+    @staticmethod
+    def get_parameterset_from_indexes(indexes, levels, rng=None):
+        if len(indexes) != len(levels):
+            raise ValueError()
+        if len(indexes) != ParameterSet.get_parameter_number():
+            raise ValueError("To many indexes for creating parameter set. Parameter set has",
+                             ParameterSet.get_parameter_number(), "parameters.")
+        return ParameterSet.from_indexes(ParameterSet.get_space().from_level_indexes(indexes, levels, rng))
 
     @staticmethod
     def get_parameterset_from_uniform(array):
-        if len(array) != 5:  # number of parameters
+        if len(array) != ParameterSet.get_parameter_number():
             raise ValueError()
-        limits = ParameterSet.get_param_limits(for_expanding=True)
-        ps = []
-        for i in range(0, len(array)):
-            values = np.arange(*limits[i])
-            index = int(np.round(array[i] * (len(values) - 1), 0))
-            ps.append(values[index])
-        return ParameterSet(*tuple(ps))
+        return ParameterSet.from_indexes(ParameterSet.get_space().from_uniform(array))
 
     @staticmethod
-    def get_param_limits(for_expanding=False, as_dict=False):
+    def get_param_limits(for_expanding=False, as_dict=False, as_array=False):
+        """
+        Function returns the limits of all parameters as [min, max, step] triplets.
+        :param for_expanding: if True, max is increased by one step so the limits can be used with range functions
+        :param as_dict: if True, limits are returned as a dictionary with parameter names as keys
+        :param as_array: if True, limits are returned as an integer numpy array of shape (number of parameters, 3)
+        :return: limits of the parameters
+        """
+        limits = ParameterSet.get_space().limits.copy()
         if for_expanding:
-            limits = [[ParameterSet.XMIN, ParameterSet.XMAX + ParameterSet.XSTEP, ParameterSet.XSTEP],
-                      [ParameterSet.YMIN, ParameterSet.YMAX + ParameterSet.YSTEP, ParameterSet.YSTEP],
-                      [ParameterSet.DMIN, ParameterSet.DMAX + ParameterSet.DSTEP, ParameterSet.DSTEP],
-                      [ParameterSet.PWMIN, ParameterSet.PWMAX + ParameterSet.PWSTEP, ParameterSet.PWSTEP],
-                      [ParameterSet.IMIN, ParameterSet.IMAX + ParameterSet.ISTEP, ParameterSet.ISTEP]]
-        else:
-            limits = [[ParameterSet.XMIN, ParameterSet.XMAX, ParameterSet.XSTEP],
-                      [ParameterSet.YMIN, ParameterSet.YMAX, ParameterSet.YSTEP],
-                      [ParameterSet.DMIN, ParameterSet.DMAX, ParameterSet.DSTEP],
-                      [ParameterSet.PWMIN, ParameterSet.PWMAX, ParameterSet.PWSTEP],
-                      [ParameterSet.IMIN, ParameterSet.IMAX, ParameterSet.ISTEP]]
+            limits[:, 1] += limits[:, 2]
+        if as_array:
+            return limits
+        limits = limits.tolist()
         if as_dict:
-            return {'x': limits[0], 'y': limits[1], 'delay': limits[2],
-                    'power_width': limits[3], 'intensity': limits[4]}
+            return dict(zip(ParameterSet.get_param_names(), limits))
         return limits
 
     @staticmethod
@@ -119,35 +330,42 @@ class ParameterSet:
         :param s: ParameterSet solution
         :return: list of parameter names of the ParameterSet
         """
-        # ps = copy.deepcopy(self)
-        # params = vars(ps)
-        # params.pop('fitness', None)
-        # params.pop('fault_class', None)
-        # params.pop('created', None)
-        return ['x', 'y', 'delay', 'power_width', 'intensity']
+        return ParameterSet.get_space().names
 
     @staticmethod
     def get_parameter_number():
-        return 5
+        return len(ParameterSet.get_space().names)
+
+    def get_grid_index(self):
+        """
+        Function returns the index of the solution in the grid of all allowed parameter values (defined by the min and
+        step values of the parameters). Values that are close (e.g. float and int variants of the same value) get the
+        same index. For values outside the limits, a tuple with the index of every parameter is returned instead.
+        :return: integer grid index of the solution
+        """
+        index = 0
+        indexes = []
+        outside = False
+        space = ParameterSet.get_space()
+        for (low, step, levels), name in zip(space.grid, space.names):
+            i = int(round((getattr(self, name) - low) / step))
+            outside = outside or not 0 <= i < levels
+            indexes.append(i)
+            index = index * levels + i
+        return tuple(indexes) if outside else index
 
     @staticmethod
     def clip(parameter, value):
         """
         Function that clips the value of parameter to its min or max value if the value is not in the range.
+        The value of an int parameter is rounded to the nearest integer (see ParameterSpace.clip_value), so e.g.
+        update('x', 10.6) sets x to 11. Before the ParameterSpace, x, y and delay kept float values and power_width
+        and intensity were truncated.
         :param parameter: parameter name: string
         :param value: new value that can be out of rande: float or int
         :return: clipped value of the parameter
         """
-        if parameter == 'x':
-            return np.clip(value, ParameterSet.XMIN, ParameterSet.XMAX)
-        if parameter == 'y':
-            return np.clip(value, ParameterSet.YMIN, ParameterSet.YMAX)
-        if parameter == 'delay':
-            return np.clip(value, ParameterSet.DMIN, ParameterSet.DMAX)
-        if parameter == 'power_width':
-            return int(np.clip(value, ParameterSet.PWMIN, ParameterSet.PWMAX))
-        if parameter == 'intensity':
-            return int(np.clip(value, ParameterSet.IMIN, ParameterSet.IMAX))
+        return ParameterSet.get_space().clip_value(parameter, value)
 
     def update_fitness(self, fitness=None, fault_class: str = None):
         """
@@ -171,24 +389,16 @@ class ParameterSet:
         :param reset_fitness: bool value for resetting fitness. Default is True.
         :return: No return value, the object is updated
         """
-        if key == 'x':
-            self.x = np.clip(value, ParameterSet.XMIN, ParameterSet.XMAX)
-        elif key == 'y':
-            self.y = np.clip(value, ParameterSet.YMIN, ParameterSet.YMAX)
-        elif key == 'delay':
-            self.delay = np.clip(value, ParameterSet.DMIN, ParameterSet.DMAX)
-        elif key == 'power_width':
-            self.power_width = int(np.clip(value, ParameterSet.PWMIN, ParameterSet.PWMAX))
-        elif key == 'intensity':
-            self.intensity = int(np.clip(value, ParameterSet.IMIN, ParameterSet.IMAX))
+        if key in ParameterSet.get_space().columns:
+            setattr(self, key, ParameterSet.clip(key, value))
         if not reset_fitness:
             return
         self.fitness = None
         self.fault_class = None
 
     def __str__(self):
-        return f"{self.created} (x={self.x}, y={self.y}, delay={self.delay}, " \
-               f"power width={self.power_width}, intensity={self.intensity}, fitness={self.fitness}, fault class={self.fault_class})"
+        values = ", ".join(f"{name.replace('_', ' ')}={getattr(self, name)}" for name in self.get_param_names())
+        return f"{self.created} ({values}, fitness={self.fitness}, fault class={self.fault_class})"
 
     def __repr__(self):
         return self.__str__()
@@ -199,23 +409,17 @@ class ParameterSet:
         :param other: ParameterSet object
         :return: True if all parameter values are the same with the other object, False otherwise.
         """
-        if not np.isclose(self.x, other.x):
-            return False
-        if not np.isclose(self.y, other.y):
-            return False
-        if not np.isclose(self.delay, other.delay):
-            return False
-        if not np.isclose(self.power_width, other.power_width):
-            return False
-        if not np.isclose(self.intensity, other.intensity):
-            return False
+        for name in self.get_param_names():
+            if not np.isclose(getattr(self, name), getattr(other, name)):
+                return False
         return True
 
     def __ne__(self, other):
         return not self == other
 
     def __hash__(self):
-        return hash((self.x, self.y, self.delay, self.power_width, self.intensity))
+        # hash of the grid index, so solutions that are equal (np.isclose) have the same hash
+        return hash(self.get_grid_index())
 
     def __sub__(self, other):
         """
@@ -227,15 +431,7 @@ class ParameterSet:
         """
         if type(self) != type(other):
             raise NotImplemented
-        ps = ParameterSet()
-        ps.x = np.clip(self.x - other.x, ParameterSet.XMIN, ParameterSet.XMAX)
-        ps.y = np.clip(self.y - other.y, ParameterSet.YMIN, ParameterSet.YMAX)
-        ps.delay = np.clip(self.delay - other.delay, ParameterSet.DMIN, ParameterSet.DMAX)
-        ps.power_width = int(np.clip(self.power_width - other.power_width, ParameterSet.PWMIN, ParameterSet.PWMAX))
-        ps.intensity = int(np.clip(self.intensity - other.power_width, ParameterSet.IMIN, ParameterSet.IMAX))
-        ps.fitness = None
-        ps.fault_class = None
-        return ps
+        return ParameterSet._from_operation(lambda name: getattr(self, name) - getattr(other, name))
 
     def __mul__(self, other):
         """
@@ -247,15 +443,7 @@ class ParameterSet:
         """
         if type(self) != type(other):
             raise NotImplemented
-        ps = ParameterSet()
-        ps.x = np.clip(self.x * other.x, ParameterSet.XMIN, ParameterSet.XMAX)
-        ps.y = np.clip(self.y * other.y, ParameterSet.YMIN, ParameterSet.YMAX)
-        ps.delay = np.clip(self.delay * other.delay, ParameterSet.DMIN, ParameterSet.DMAX)
-        ps.power_width = int(np.clip(self.power_width * other.power_width, ParameterSet.PWMIN, ParameterSet.PWMAX))
-        ps.intensity = int(np.clip(self.intensity * other.power_width, ParameterSet.IMIN, ParameterSet.IMAX))
-        ps.fitness = None
-        ps.fault_class = None
-        return ps
+        return ParameterSet._from_operation(lambda name: getattr(self, name) * getattr(other, name))
 
     def __rmul__(self, other):
         """
@@ -268,12 +456,12 @@ class ParameterSet:
         """
         if type(other) not in [float, int]:
             raise NotImplemented
-        ps = ParameterSet()
-        ps.x = np.clip(self.x * other, ParameterSet.XMIN, ParameterSet.XMAX)
-        ps.y = np.clip(self.y * other, ParameterSet.YMIN, ParameterSet.YMAX)
-        ps.delay = np.clip(self.delay * other, ParameterSet.DMIN, ParameterSet.DMAX)
-        ps.power_width = int(np.clip(self.power_width * other, ParameterSet.PWMIN, ParameterSet.PWMAX))
-        ps.intensity = int(np.clip(self.intensity * other, ParameterSet.IMIN, ParameterSet.IMAX))
-        ps.fitness = None
-        ps.fault_class = None
-        return ps
+        return ParameterSet._from_operation(lambda name: getattr(self, name) * other)
+
+    @staticmethod
+    def _from_operation(operation):
+        """
+        :param operation: function that takes a parameter name and returns the new value of the parameter
+        :return: new ParameterSet with the clipped values, without fitness
+        """
+        return ParameterSet(*[ParameterSet.clip(name, operation(name)) for name in ParameterSet.get_param_names()])
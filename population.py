@@ -0,0 +1,227 @@
+import numpy as np
+from parameters import ParameterSet
+
+
+class ParameterSetView(ParameterSet):
+    """
+    ParameterSet that reads and writes its values directly from/to one row of a Population.
+    Views are created by indexing a Population with an integer, e.g. population[3].
+    Copying a view (copy.copy or copy.deepcopy) returns a detached ParameterSet with the same values.
+    """
+
+    def __init__(self, population, index):
+        object.__setattr__(self, '_population', population)
+        object.__setattr__(self, 'index', index)
+
+    def __getattr__(self, name):
+        # only called for names that are not attributes of the view: the parameters
+        if not name.startswith('_'):
+            space = ParameterSet.get_space()
+            column = space.columns.get(name)
+            if column is not None:
+                return space.value(column, self._population.genes[self.index, column])
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        space = ParameterSet.get_space()
+        column = space.columns.get(name)
+        if column is None:
+            object.__setattr__(self, name, value)
+        else:
+            self._population.genes[self.index, column] = space.index(column, value)
+
+    def detach(self):
+        """
+        Function returns a standalone ParameterSet with the same values, fitness, fault class and origin.
+        :return: ParameterSet that is not connected to the population
+        """
+        ps = ParameterSet.from_indexes(self._population.genes[self.index])
+        ps.update_fitness(self.fitness, self.fault_class)
+        ps.created = self.created
+        ps.index = self.index
+        return ps
+
+    def __copy__(self):
+        return self.detach()
+
+    def __deepcopy__(self, memo):
+        return self.detach()
+
+    def __reduce__(self):
+        return self.detach().__reduce__()
+
+
+def _column_property(column, to_python=None, to_column=None):
+    def getter(self):
+        value = getattr(self._population, column)[self.index]
+        return value if to_python is None else to_python(value)
+
+    def setter(self, value):
+        getattr(self._population, column)[self.index] = value if to_column is None else to_column(value)
+
+    return property(getter, setter)
+
+
+ParameterSetView.fitness = _column_property('fitness',
+                                            to_python=lambda f: None if np.isnan(f) else float(f),
+                                            to_column=lambda f: np.nan if f is None else f)
+ParameterSetView.fault_class = _column_property('fault_class')
+ParameterSetView.created = _column_property('created', to_python=str)
+
+
+class Population:
+    """
+    Class that represents a population of solutions as a structure of arrays.
+    Genes (one column per parameter of the ParameterSpace) are stored as an int32 matrix of grid indexes with one row
+    per individual, and fitness, fault class and origin ('i' initial, 'e' evolved, 'r' random, 'l' local
+    search) are stored as columns. Physical values are returned by values() and by the ParameterSetViews.
+    Indexing with an integer returns a ParameterSetView, indexing with a slice, a mask or an index array returns a new
+    Population.
+    """
+
+    def __init__(self, genes, fitness=None, fault_class=None, created='i'):
+        self.genes = np.array(genes, dtype=np.int32).reshape(-1, ParameterSet.get_parameter_number())
+        size = len(self.genes)
+        self.fitness = np.full(size, np.nan) if fitness is None else np.array(fitness, dtype=np.float64)
+        self.fault_class = np.full(size, None, dtype=object)
+        if fault_class is not None:
+            self.fault_class[:] = fault_class
+        self.created = np.full(size, 'i', dtype='U1')
+        self.created[:] = created
+
+    @classmethod
+    def random(cls, size, created='i', rng=None):
+        """
+        Function creates a population with values drawn uniformly from the allowed interval of every parameter.
+        Same distribution as ParameterSet(), but all values are drawn with a single call.
+        :param size: number of individuals
+        :param created: origin of the individuals
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: Population with random, not evaluated individuals
+        """
+        return cls(ParameterSet.get_space().random_indexes(size, rng), created=created)
+
+    @classmethod
+    def from_values(cls, values, fitness=None, fault_class=None, created='i'):
+        """
+        Function creates a population from a matrix of physical values, one row per individual.
+        Values are moved to the closest grid point.
+        """
+        return cls(ParameterSet.get_space().encode(values), fitness=fitness, fault_class=fault_class, created=created)
+
+    @classmethod
+    def from_parameter_sets(cls, parameter_sets):
+        """
+        Function creates a population from a list of ParameterSet solutions.
+        :param parameter_sets: list of ParameterSet solutions
+        :return: Population with the same values, fitness, fault classes and origins
+        """
+        names = ParameterSet.get_param_names()
+        values = np.array([[getattr(ps, name) for name in names] for ps in parameter_sets],
+                          dtype=np.float64).reshape(-1, len(names))
+        fitness = [np.nan if ps.fitness is None else ps.fitness for ps in parameter_sets]
+        pop = cls.from_values(values, fitness=fitness)
+        pop.fault_class[:] = [ps.fault_class for ps in parameter_sets]
+        pop.created[:] = [ps.created for ps in parameter_sets]
+        return pop
+
+    @classmethod
+    def concatenate(cls, populations):
+        pop = cls(np.concatenate([p.genes for p in populations]),
+                  fitness=np.concatenate([p.fitness for p in populations]))
+        pop.fault_class = np.concatenate([p.fault_class for p in populations])
+        pop.created = np.concatenate([p.created for p in populations])
+        return pop
+
+    def to_parameter_sets(self):
+        """
+        Function converts the population to a list of standalone ParameterSet solutions.
+        Every ParameterSet has an additional attribute 'index' with its row in this population.
+        :return: list of ParameterSet solutions
+        """
+        # values are decoded for the whole matrix at once, detach() decodes row by row
+        space = ParameterSet.get_space()
+        parameter_sets = []
+        for index, values in enumerate(self.values().tolist()):
+            ps = ParameterSet(*space.to_python(values))
+            fitness = self.fitness[index]
+            ps.update_fitness(None if np.isnan(fitness) else float(fitness), self.fault_class[index])
+            ps.created = str(self.created[index])
+            ps.index = index
+            parameter_sets.append(ps)
+        return parameter_sets
+
+    def take(self, indexes):
+        pop = Population(self.genes[indexes], fitness=self.fitness[indexes])
+        pop.fault_class = self.fault_class[indexes]
+        pop.created = self.created[indexes]
+        return pop
+
+    def values(self):
+        """
+        :return: matrix of the physical values of the individuals (int64 if all parameters are int, else float64)
+        """
+        return ParameterSet.get_space().decode(self.genes.astype(np.int64))
+
+    def grid_indexes(self):
+        """
+        Function returns the grid index (see ParameterSet.get_grid_index) of every individual.
+        :return: int64 array of grid indexes
+        """
+        return ParameterSet.get_space().flat_index(self.genes)
+
+    @property
+    def evaluated(self):
+        """
+        :return: boolean mask of individuals that have a fitness value
+        """
+        return ~np.isnan(self.fitness)
+
+    def reset_fitness(self, indexes=slice(None)):
+        self.fitness[indexes] = np.nan
+        self.fault_class[indexes] = None
+
+    def clip(self):
+        """
+        Function clips all grid indexes to the axes of their parameter, in place.
+        :return: self
+        """
+        ParameterSet.get_space().clip_indexes(self.genes, out=self.genes)
+        return self
+
+    def unique(self):
+        """
+        Function removes duplicated individuals (same values of all parameters).
+        The first occurrence is kept and the order of the individuals is preserved.
+        :return: new Population without duplicates
+        """
+        _, first = np.unique(self.genes, axis=0, return_index=True)
+        return self.take(np.sort(first))
+
+    def __len__(self):
+        return len(self.genes)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += len(self)
+            if not 0 <= item < len(self):
+                raise IndexError("Population index out of range.")
+            return ParameterSetView(self, int(item))
+        return self.take(item)
+
+    def __setitem__(self, index, parameter_set: ParameterSet):
+        self.genes[index] = ParameterSet.get_space().encode([getattr(parameter_set, name)
+                                                             for name in ParameterSet.get_param_names()])
+        self.fitness[index] = np.nan if parameter_set.fitness is None else parameter_set.fitness
+        self.fault_class[index] = parameter_set.fault_class
+        self.created[index] = parameter_set.created
+
+    def __iter__(self):
+        return (ParameterSetView(self, i) for i in range(len(self)))
+
+    def __str__(self):
+        return str(list(self))
+
+    def __repr__(self):
+        return self.__str__()
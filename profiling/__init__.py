@@ -0,0 +1,2 @@
+from .profiler import Profiler, NullProfiler, NULL_PROFILER, Hook
+from .exporters import PrometheusExporter, CSVExporter, JSONLinesExporter, prometheus_text
@@ -0,0 +1,114 @@
+import csv
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .profiler import Hook
+
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def prometheus_text(snapshot, prefix='memetic_ga'):
+    """
+    :param snapshot: dictionary returned by Profiler.snapshot
+    :param prefix: prefix of the metric names
+    :return: snapshot in the Prometheus text exposition format
+    """
+    lines = [f'# TYPE {prefix}_phase_seconds_total counter',
+             f'# TYPE {prefix}_phase_calls_total counter']
+    for name, timer in sorted(snapshot['phases'].items()):
+        lines.append(f'{prefix}_phase_seconds_total{{phase="{name}"}} {timer["seconds"]:.9g}')
+        lines.append(f'{prefix}_phase_calls_total{{phase="{name}"}} {timer["calls"]}')
+    for name, value in sorted(snapshot['counters'].items()):
+        metric = f'{prefix}_{_metric_name(name)}_total'
+        lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+    lines += [f'# TYPE {prefix}_generation gauge', f'{prefix}_generation {snapshot["iteration"]}'
+              if snapshot['iteration'] is not None else f'{prefix}_generation NaN',
+              f'# TYPE {prefix}_run_seconds gauge', f'{prefix}_run_seconds {snapshot["time"]:.9g}']
+    return '\n'.join(lines) + '\n'
+
+
+class PrometheusExporter(Hook):
+    """
+    Hook that serves the metrics of the last finished generation in the Prometheus text format on a local HTTP
+    endpoint (http://address:port/metrics), from a background thread.
+    """
+
+    def __init__(self, port=9108, address='127.0.0.1', prefix='memetic_ga'):
+        self.prefix = prefix
+        self.text = prometheus_text({'iteration': None, 'time': 0.0, 'phases': {}, 'counters': {}}, prefix)
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = exporter.text.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((address, port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='prometheus', daemon=True)
+        self.thread.start()
+
+    def generation_finished(self, snapshot):
+        self.text = prometheus_text(snapshot, self.prefix)
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class CSVExporter(Hook):
+    """
+    Hook that appends the metrics of every generation to a CSV file, one row per metric (iteration, time, kind, name,
+    value), so new phases or counters do not change the columns. Timers have the kinds 'seconds' and 'calls'.
+    """
+
+    def __init__(self, file_name):
+        self.file = open(file_name, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(['iteration', 'time', 'kind', 'name', 'value'])
+
+    def generation_finished(self, snapshot):
+        iteration, t = snapshot['iteration'], f"{snapshot['time']:.6f}"
+        for name, timer in sorted(snapshot['phases'].items()):
+            self.writer.writerow([iteration, t, 'seconds', name, f"{timer['seconds']:.9g}"])
+            self.writer.writerow([iteration, t, 'calls', name, timer['calls']])
+        for name, value in sorted(snapshot['counters'].items()):
+            self.writer.writerow([iteration, t, 'counter', name, value])
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class JSONLinesExporter(Hook):
+    """
+    Hook that appends the snapshot of every generation to a file as one JSON object per line.
+    """
+
+    def __init__(self, file_name):
+        self.file = open(file_name, 'w')
+
+    def generation_finished(self, snapshot):
+        self.file.write(json.dumps(dict(snapshot, timestamp=time.time())) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
@@ -0,0 +1,138 @@
+import contextlib
+import time
+
+
+class _Phase:
+    """
+    Context manager that measures one execution of a phase of the Profiler.
+    """
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        for hook in self.profiler.hooks:
+            hook.phase_started(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        seconds = time.perf_counter() - self.start
+        timer = self.profiler.timers.get(self.name)
+        if timer is None:
+            timer = self.profiler.timers[self.name] = [0.0, 0]
+        timer[0] += seconds
+        timer[1] += 1
+        for hook in self.profiler.hooks:
+            hook.phase_finished(self.name, seconds)
+        return False
+
+
+class Hook:
+    """
+    Base class of the Profiler hooks (callbacks). Subclasses (e.g. the exporters) override the methods they need.
+    """
+
+    def phase_started(self, name):
+        pass
+
+    def phase_finished(self, name, seconds):
+        pass
+
+    def generation_finished(self, snapshot):
+        pass
+
+    def close(self):
+        pass
+
+
+class Profiler:
+    """
+    Instrumentation of the GA: timers of the phases (selection, crossover, mutation, sort, bench, local search,
+    logging, ...) and counters (shots, evaluations, cache hits and misses, local search probes, duplicate rejections).
+    The GA measures a phase with `with profiler.phase('selection'):` and counts with profiler.count('shots', n).
+    Hooks get a call when a phase starts and finishes and after every generation with the snapshot of all timers and
+    counters; the exporters (PrometheusExporter, CSVExporter, JSONLinesExporter) are hooks.
+    Timers and counters are cumulative over the run.
+    """
+    enabled = True
+
+    def __init__(self, hooks=None):
+        """
+        :param hooks: list of Hook objects, e.g. exporters
+        """
+        self.hooks = list(hooks or [])
+        self.timers = dict()  # phase -> [seconds, calls]
+        self.counters = dict()
+        self.iteration = None
+        self.start = time.perf_counter()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def phase(self, name):
+        """
+        :param name: name of the phase
+        :return: context manager that measures the phase
+        """
+        return _Phase(self, name)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """
+        :return: dictionary with the iteration, the time since the start of the run, the timers (seconds and calls of
+        every phase) and the counters
+        """
+        return {'iteration': self.iteration, 'time': time.perf_counter() - self.start,
+                'phases': {name: {'seconds': seconds, 'calls': calls} for name, (seconds, calls) in
+                           list(self.timers.items())},
+                'counters': dict(self.counters)}
+
+    def run_started(self):
+        self.timers.clear()
+        self.counters.clear()
+        self.iteration = None
+        self.start = time.perf_counter()
+
+    def generation_finished(self, iteration):
+        self.iteration = iteration
+        if self.hooks:
+            snapshot = self.snapshot()
+            for hook in self.hooks:
+                hook.generation_finished(snapshot)
+
+    def close(self):
+        for hook in self.hooks:
+            hook.close()
+
+
+class NullProfiler:
+    """
+    Profiler of the GA when profiling is disabled: all methods do nothing, so the instrumentation costs one method
+    call per phase.
+    """
+    enabled = False
+    _null_phase = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._null_phase
+
+    def count(self, name, value=1):
+        pass
+
+    def run_started(self):
+        pass
+
+    def generation_finished(self, iteration):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
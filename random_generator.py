@@ -0,0 +1,77 @@
+import functools
+import inspect
+import numpy as np
+
+# generator of the functions that are called without a generator, e.g. ParameterSet() or the operators outside the GA
+_default_rng = np.random.default_rng()
+
+
+def get_rng():
+    """
+    :return: default numpy Generator
+    """
+    return _default_rng
+
+
+def seed(seed=None):
+    """
+    Function replaces the default generator with a new generator created from the seed.
+    :param seed: int, SeedSequence or None for a random seed
+    :return: new default generator
+    """
+    global _default_rng
+    _default_rng = np.random.default_rng(seed)
+    return _default_rng
+
+
+def as_generator(rng=None):
+    """
+    :param rng: numpy Generator, seed (int or SeedSequence), or None for the default generator
+    :return: numpy Generator
+    """
+    if rng is None:
+        return _default_rng
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def spawn(rng, number):
+    """
+    Function creates independent generators (streams) from a generator, e.g. for worker processes or islands. The
+    streams depend only on the seed of the generator, not on the numbers it already drew.
+    :param rng: numpy Generator, seed or None for the default generator
+    :param number: number of generators
+    :return: list of numpy Generators
+    """
+    bit_generator = as_generator(rng).bit_generator
+    seed_sequence = getattr(bit_generator, 'seed_seq', None) or bit_generator._seed_seq
+    return [np.random.Generator(type(bit_generator)(s)) for s in seed_sequence.spawn(number)]
+
+
+def takes_rng(function):
+    """
+    :param function: function or callable object
+    :return: True if the function has an 'rng' (or a **kwargs) parameter
+    """
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == 'rng' or p.kind == p.VAR_KEYWORD for p in parameters)
+
+
+def with_rng(function):
+    """
+    Function makes an operator (selection, crossover, ...) callable with the keyword argument 'rng': operators
+    without the parameter get a wrapper that ignores the generator (and draws from their own source of randomness).
+    :param function: operator or None
+    :return: operator that takes the keyword argument 'rng'
+    """
+    if function is None or takes_rng(function):
+        return function
+
+    @functools.wraps(function)
+    def without_rng(*args, rng=None, **kwargs):
+        return function(*args, **kwargs)
+    return without_rng
@@ -0,0 +1,2 @@
+from .permutation import FeistelPermutation
+from .search import RandomSearch
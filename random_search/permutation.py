@@ -0,0 +1,56 @@
+import numpy as np
+from random_generator import as_generator
+
+_MASK64 = np.uint64(2 ** 64 - 1)
+
+
+class FeistelPermutation:
+    """
+    Random permutation of the integers 0 ... size - 1 that is computed, not stored: position i is mapped to the i-th
+    element of the permutation with a Feistel network on the smallest domain of 2^(2h) >= size integers, and values
+    outside of [0, size) are encrypted again until they fall inside (cycle walking, at most 4 rounds on average).
+    Every element is visited exactly once, so a grid can be sampled without replacement, in batches, without a set of
+    the drawn points and with the same cost for the first and for the last point.
+    """
+
+    def __init__(self, size, rng=None, rounds=4):
+        """
+        :param size: number of elements (e.g. the number of points of the grid)
+        :param rng: numpy Generator of the round keys, default: the default generator of the random_generator module
+        :param rounds: number of Feistel rounds
+        """
+        if size < 1:
+            raise ValueError("Permutation needs at least one element.")
+        self.size = int(size)
+        self.half_bits = max((int(self.size - 1).bit_length() + 1) // 2, 1)
+        self.half_mask = np.uint64(2 ** self.half_bits - 1)
+        self.keys = as_generator(rng).integers(0, 2 ** 63, size=rounds, dtype=np.uint64)
+
+    def _round(self, right, key):
+        # SplitMix64 finalizer of the right half and the key, reduced to half_bits
+        z = (right + key) & _MASK64
+        z = ((z ^ (z >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)) & _MASK64
+        z = ((z ^ (z >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)) & _MASK64
+        return (z ^ (z >> np.uint64(31))) & self.half_mask
+
+    def _encrypt(self, values):
+        shift = np.uint64(self.half_bits)
+        left, right = values >> shift, values & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << shift) | right
+
+    def __call__(self, positions):
+        """
+        :param positions: positions in the permutation, integers in [0, size)
+        :return: elements at the positions (int64 array)
+        """
+        values = self._encrypt(np.asarray(positions, dtype=np.uint64))
+        outside = np.flatnonzero(values >= self.size)
+        while len(outside):
+            values[outside] = self._encrypt(values[outside])
+            outside = outside[values[outside] >= self.size]
+        return values.astype(np.int64)
+
+    def __len__(self):
+        return self.size
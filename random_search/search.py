@@ -0,0 +1,172 @@
+import math
+import numpy as np
+import ga_log
+from fitness import percentage_fitness
+from helper import TabuList, SharedCache
+from parameters import ParameterSet
+from population import Population
+from profiling import NULL_PROFILER
+from random_generator import as_generator
+from .permutation import FeistelPermutation
+
+
+class RandomSearch:
+    """
+    Random search (and exhaustive sweep) of the parameter grid, the baseline of main_random.py.
+    The points are drawn without replacement: position i of the search is the i-th element of a FeistelPermutation of
+    the flat grid indexes (or of the identity for a sequential sweep), so no set of drawn points is kept and a search
+    of the whole grid costs the same for every point.
+    The points are evaluated in batches: points in the cache get their cached fitness, the others are ordered with the
+    sort function (e.g. PathPlanner), sent to the bench in one call of the batch bench function (or shot one by one
+    with the bench function), the fitness of the batch is calculated at once (fitness functions with a 'vectorized'
+    version, e.g. percentage_fitness) and the batch and its shots are appended to the log as one generation.
+    """
+
+    def __init__(self, apply_on_bench_function=None, apply_on_bench_batch_function=None, nb_measurements=5,
+                 fitness_func=percentage_fitness, sort_function=None, batch_size=1000, cache=None, order='random',
+                 profiler=None, rng=None):
+        """
+        :param apply_on_bench_function: function that applies the parameter set on the bench, shoots once and returns
+        the fault class
+        :param apply_on_bench_batch_function: function that takes a list of (parameter set, number of shots) pairs and
+        returns (or yields) the list of fault classes of every pair
+        :param nb_measurements: number of shots with every parameter set
+        :param fitness_func: fitness function of the fault classes of one parameter set
+        :param sort_function: sort function of every batch (e.g. greedy_euclidean or PathPlanner), None for the order
+        of the search
+        :param batch_size: number of points of a batch
+        :param cache: evaluation cache (TabuList, SharedCache or PersistentCache), evaluated points are added to it
+        :param order: 'random' for the random search, 'sequential' for the sweep in the order of the flat grid indexes
+        :param profiler: profiling.Profiler, default: None (no profiling)
+        :param rng: seed or numpy Generator of the permutation
+        """
+        if apply_on_bench_function is None and apply_on_bench_batch_function is None:
+            raise ValueError("Random search needs a bench function or a batch bench function.")
+        if order not in ('random', 'sequential'):
+            raise ValueError("Order of the random search should be 'random' or 'sequential'.")
+        self.apply_on_bench = apply_on_bench_function
+        self.apply_on_bench_batch = apply_on_bench_batch_function
+        self.nb_measurements = nb_measurements
+        self.fitness = fitness_func
+        self.sort = sort_function
+        self.batch_size = batch_size
+        self.cache = cache
+        self.order = order
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.rng = as_generator(rng)
+        self.log = None
+
+    def __str__(self):
+        return f"{{\"algorithm\" : \"random_search\", \"order\" : \"{self.order}\", " \
+               f"\"nb_measurements\" : {self.nb_measurements}, \"batch_size\" : {self.batch_size}, " \
+               f"\"fitness\" : \"{self.fitness.__name__}\", " \
+               f"\"sort\" : \"{getattr(self.sort, '__name__', None)}\"}}"
+
+    def points(self, nb_points=None):
+        """
+        :param nb_points: number of points, None for the whole grid
+        :return: generator of the gene matrices of the batches
+        """
+        space = ParameterSet.get_space()
+        size = math.prod(space.levels.tolist())
+        nb_points = size if nb_points is None else min(nb_points, size)
+        permutation = FeistelPermutation(size, self.rng) if self.order == 'random' else None
+        for start in range(0, nb_points, self.batch_size):
+            positions = np.arange(start, min(start + self.batch_size, nb_points), dtype=np.int64)
+            flat = permutation(positions) if permutation is not None else positions
+            yield np.stack(np.unravel_index(flat, space.levels), axis=1)
+
+    def _keys(self, batch):
+        """
+        :return: cache keys of the points of the batch, TabuList and SharedCache are keyed by the grid index
+        """
+        if isinstance(self.cache, (TabuList, SharedCache)):
+            return ParameterSet.get_space().flat_index(batch.genes).tolist()
+        return batch.to_parameter_sets()
+
+    def _cached(self, batch):
+        """
+        :return: mask of the points of the batch that are in the cache, their fitness values and fault classes are set
+        """
+        mask = np.zeros(len(batch), dtype=bool)
+        if self.cache is None:
+            return mask
+        for i, key in enumerate(self._keys(batch)):
+            fitness, fault_class = self.cache.get(key, (None, None))
+            if fitness is not None:
+                mask[i] = True
+                batch.fitness[i], batch.fault_class[i] = fitness, fault_class
+        self.profiler.count('cache_hits', int(np.sum(mask)))
+        return mask
+
+    def _sort(self, batch):
+        if self.sort is None or len(batch) < 2:
+            return batch
+        if hasattr(self.sort, 'order'):
+            return batch.take(self.sort.order(batch.values()))
+        return batch.take([ps.index for ps in self.sort(batch.to_parameter_sets())])
+
+    def _measure(self, parameter_sets):
+        """
+        :return: list with the list of fault classes of every parameter set
+        """
+        if self.apply_on_bench_batch is not None:
+            return [list(f) for f in self.apply_on_bench_batch([(ps, self.nb_measurements) for ps in parameter_sets])]
+        return [[self.apply_on_bench(ps) for _ in range(self.nb_measurements)] for ps in parameter_sets]
+
+    def evaluate(self, batch: Population):
+        """
+        Function evaluates the points of a batch that are not in the cache.
+        :param batch: Population of the batch
+        :return: Population of the batch (the measured points in the order of the measurement, followed by the cached
+        points), Population of the measured points and the list of their fault classes
+        """
+        cached = self._cached(batch)
+        measured = batch.take(np.flatnonzero(~cached))
+        with self.profiler.phase('sort'):
+            measured = self._sort(measured)
+        with self.profiler.phase('bench'):
+            fault_classes = self._measure(measured.to_parameter_sets())
+        with self.profiler.phase('evaluation'):
+            vectorized = getattr(self.fitness, 'vectorized', None)
+            if vectorized is not None and len(set(map(len, fault_classes))) <= 1:
+                measured.fitness[:], measured.fault_class[:] = vectorized(fault_classes)
+            else:
+                for i, f in enumerate(fault_classes):
+                    measured.fitness[i], measured.fault_class[i] = self.fitness(f)
+            if self.cache is not None:
+                for i, key in enumerate(self._keys(measured)):
+                    self.cache.add(key, (float(measured.fitness[i]), measured.fault_class[i]), fault_classes[i])
+        self.profiler.count('evaluations', len(measured))
+        self.profiler.count('shots', sum(map(len, fault_classes)))
+        return Population.concatenate([measured, batch.take(np.flatnonzero(cached))]), measured, fault_classes
+
+    def run(self, nb_points=None, log_file_name=None, log_class=ga_log.StreamingLog):
+        """
+        Function evaluates nb_points different points of the grid, batch after batch.
+        :param nb_points: number of points, None for the whole grid
+        :param log_file_name: file (or directory of the StreamingLog) of the log, None for no log
+        :param log_class: class of the log, every batch is logged as one generation
+        :return: Population with all points of the search, batch after batch (see evaluate)
+        """
+        if log_file_name is not None:
+            self.log = log_class(log_file_name, str(self), ParameterSet.get_param_limits(as_dict=True))
+        self.profiler.run_started()
+        batches = []
+        try:
+            points = self.points(nb_points)
+            for iteration, genes in enumerate(points):
+                with self.profiler.phase('sampling'):
+                    batch = Population(genes, created='r')
+                batch, measured, fault_classes = self.evaluate(batch)
+                if self.log is not None:
+                    with self.profiler.phase('logging'):
+                        self.log.log_generation(iteration, batch)
+                        self.log.log_shots_batch(iteration, measured, fault_classes)
+                batches.append(batch)
+                self.profiler.generation_finished(iteration)
+        finally:
+            if self.log is not None:
+                self.log.close()
+                self.log = None
+        return Population.concatenate(batches) if batches else Population(np.zeros((0, 0)))
@@ -1 +1,3 @@
-from .selections import ktournament, roulette_wheel
\ No newline at end of file
+from .selections import ktournament, roulette_wheel, stochastic_universal_sampling, rank_selection, \
+    boltzmann_selection, ktournament_vectorized, roulette_wheel_vectorized, stochastic_universal_sampling_vectorized, \
+    rank_selection_vectorized, boltzmann_selection_vectorized, for_parameter_sets, elite_indexes
@@ -1,44 +1,218 @@
 from parameters import ParameterSet
 from typing import List
 import numpy as np
-import operator
+from random_generator import as_generator
 
-# SelectionFunction = Callable[[List[ParameterSet], int], Tuple[List[ParameterSet], List[ParameterSet]]]
+# SelectionFunction = Callable[[List[ParameterSet], int, np.random.Generator], Tuple[List[ParameterSet], List[ParameterSet]]]
+# VectorizedSelectionFunction = Callable[[np.ndarray, int, np.random.Generator], Tuple[np.ndarray, np.ndarray]]
 
 
-def roulette_wheel(population: List[ParameterSet], elite_size=2):
+def for_parameter_sets(selection, name=None):
+    """
+    Function turns a vectorized selection into a selection on a list of ParameterSet solutions: the fitness values are
+    collected once, the parents are selected by index and taken from the list.
+    :param selection: vectorized selection, (fitness array, number of pairs, rng) -> two index arrays
+    :param name: name of the new selection, default: name of the vectorized selection without '_vectorized'
+    :return: selection (population, elite size, rng) -> two lists of parents
+    """
+    def select(population: List[ParameterSet], elite_size=2, rng=None):
+        fits = np.array([s.fitness for s in population], dtype=np.float64)
+        parents1, parents2 = selection(fits, len(population) - elite_size, rng=rng)
+        return [population[i] for i in parents1.tolist()], [population[i] for i in parents2.tolist()]
+    select.__name__ = name or selection.__name__.replace('_vectorized', '')
+    return select
+
+
+def elite_indexes(fitness: np.ndarray, elite_size: int):
+    """
+    Function returns the indexes of the elite_size best individuals, best first, in linear time (partition instead of a
+    sort of the whole population). Individuals with equal fitness are taken in the order of the population, as with a
+    stable sort.
+    :param fitness: array with the fitness values of the population
+    :param elite_size: number of elite individuals
+    :return: index array of the elite
+    """
+    fits = np.asarray(fitness, dtype=np.float64)
+    if elite_size <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if elite_size >= len(fits):
+        return np.argsort(-fits, kind='stable')
+    # fitness of the last elite individual, all better ones and the first equal ones are taken
+    threshold = np.partition(fits, len(fits) - elite_size)[len(fits) - elite_size]
+    better = np.flatnonzero(fits > threshold)
+    equal = np.flatnonzero(fits == threshold)[:elite_size - len(better)]
+    indexes = np.concatenate([better, equal])
+    return indexes[np.argsort(-fits[indexes], kind='stable')]
+
+
+def _sample(weights, size, rng):
+    """
+    Stochastic universal sampling: 2 * size equally spaced pointers with one random offset on the cumulative weights,
+    the selected individuals are shuffled and split into two parent arrays.
+    """
+    cumulative = np.cumsum(weights, dtype=np.float64)
+    pointers = (rng.random() + np.arange(2 * size)) * (cumulative[-1] / (2 * size))
+    parents = np.searchsorted(cumulative, pointers, side='right')
+    # rounding of the last pointer must not leave the population
+    np.minimum(parents, len(cumulative) - 1, out=parents)
+    parents = parents[rng.permutation(2 * size)]
+    return parents[:size], parents[size:]
+
+
+def _shifted(fitness):
+    """
+    :return: fitness values shifted to be non negative (roulette does not work for negative values), all ones if the
+    sum is zero
+    """
+    fits = np.array(fitness, dtype=np.float64)
+    if np.min(fits) < 0:
+        fits -= np.min(fits)
+    if np.sum(fits) <= 0:
+        fits[:] = 1
+    return fits
+
+
+def roulette_wheel_vectorized(fitness: np.ndarray, size: int, rng=None):
+    """
+    Roulette wheel selection on an array of fitness values: every parent is drawn independently with a probability
+    proportional to its fitness.
+    :param fitness: array with the fitness values of the population
+    :param size: number of parent pairs to select
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: two arrays with indexes of the individuals chosen as parents
+    """
+    fits = _shifted(fitness)
+    cumulative = np.cumsum(fits)
+    # inverse transform sampling, the same distribution as rng.choice(p=...) without its checks of the probabilities
+    parents = np.searchsorted(cumulative, as_generator(rng).random((2, size)) * cumulative[-1], side='right')
+    np.minimum(parents, len(fits) - 1, out=parents)
+    return parents[0], parents[1]
+
+
+def stochastic_universal_sampling_vectorized(fitness: np.ndarray, size: int, rng=None):
+    """
+    Stochastic universal sampling on an array of fitness values: the same expected number of copies as the roulette
+    wheel, but all parents are selected with one spin of a wheel with 2 * size equally spaced pointers, so the number
+    of copies of an individual differs by at most one from its expected value.
+    :param fitness: array with the fitness values of the population
+    :param size: number of parent pairs to select
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: two arrays with indexes of the individuals chosen as parents
+    """
+    return _sample(_shifted(fitness), size, as_generator(rng))
+
+
+def rank_selection_vectorized(pressure=1.5):
+    """
+    :param pressure: selective pressure between 1 (no pressure) and 2, expected number of copies of the best individual
+    :return: linear rank selection on an array of fitness values
+    """
+    if not 1 <= pressure <= 2:
+        raise ValueError("Selective pressure of the rank selection should be between 1 and 2.")
+
+    def rank_selection_vectorized(fitness: np.ndarray, size: int, rng=None):
+        """
+        Linear rank selection: the probability of an individual depends only on its rank, from (2 - pressure) / n for
+        the worst to pressure / n for the best individual. Parents are selected with stochastic universal sampling.
+        :param fitness: array with the fitness values of the population
+        :param size: number of parent pairs to select
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: two arrays with indexes of the individuals chosen as parents
+        """
+        pop_size = len(fitness)
+        ranks = np.empty(pop_size, dtype=np.float64)
+        ranks[np.argsort(fitness)] = np.arange(pop_size)
+        weights = (2 - pressure) + (2 * pressure - 2) * ranks / max(pop_size - 1, 1)
+        return _sample(weights, size, as_generator(rng))
+    return rank_selection_vectorized
+
+
+def boltzmann_selection_vectorized(temperature=1.0):
+    """
+    :param temperature: temperature of the Boltzmann distribution, in units of fitness
+    :return: Boltzmann selection on an array of fitness values
+    """
+    if temperature <= 0:
+        raise ValueError("Temperature of the Boltzmann selection should be larger than 0.")
+
+    def boltzmann_selection_vectorized(fitness: np.ndarray, size: int, rng=None):
+        """
+        Boltzmann selection: the probability of an individual is proportional to exp(fitness / temperature), a low
+        temperature selects mostly the best individuals, a high temperature gives all individuals similar chances.
+        Parents are selected with stochastic universal sampling.
+        :param fitness: array with the fitness values of the population
+        :param size: number of parent pairs to select
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: two arrays with indexes of the individuals chosen as parents
+        """
+        fits = np.asarray(fitness, dtype=np.float64)
+        # shifted by the maximum, so the exponent does not overflow
+        weights = np.exp((fits - np.max(fits)) / temperature)
+        return _sample(weights, size, as_generator(rng))
+    return boltzmann_selection_vectorized
+
+
+def ktournament_vectorized(k=4):
+    def tournament(fitness: np.ndarray, size: int, rng=None):
+        """
+        k-tournament selection on an array of fitness values: the best and the second best of k random candidates are
+        the parents. The population is sorted once, so a uniformly drawn candidate is a uniformly drawn rank and the
+        winners of all tournaments are found with k element-wise maximum operations on the ranks, in O(n log n).
+        :param fitness: array with the fitness values of the population
+        :param size: number of parent pairs to select
+        :param rng: numpy Generator, default: the default generator of the random_generator module
+        :return: two arrays with indexes of the individuals chosen as parents
+        """
+        pop_size = len(fitness)
+        if k < 2 or k >= pop_size:
+            raise ValueError("Tournament size should be smaller than the population size, but larger than 2, because "
+                             "2 candidates are taken from each tournament.")
+        order = np.argsort(fitness)
+        ranks = as_generator(rng).integers(0, pop_size, size=(k, size))
+        best, second = np.maximum(ranks[0], ranks[1]), np.minimum(ranks[0], ranks[1])
+        for candidate in ranks[2:]:
+            np.maximum(second, np.minimum(best, candidate), out=second)
+            np.maximum(best, candidate, out=best)
+        return order[best], order[second]
+    return tournament
+
+
+def roulette_wheel(population: List[ParameterSet], elite_size=2, rng=None):
     """
     Function performs roulette wheel selection of parents from the population and returns chosen parents.
     Returns a list of parents, where the sizes are equal to the size of population without the elite size.
     Population has to be evaluated before calling the selection.
     :param elite_size:
     :param population: list of solutions, population
+    :param rng: numpy Generator, default: the default generator of the random_generator module
     :return: two lists representing solutions chosen as parents for the following crossover operation
     """
-    fits = np.array([float(s.fitness) for s in population])
-    # roulette does not work for negative values, so we shift all values with the minimum fitness
-    if np.min(fits) < 0:
-        fits -= np.min(fits)
-    fits /= np.sum(fits)
+    return _roulette_wheel(population, elite_size, rng=rng)
 
-    pop_size = len(fits)
-    parents1 = np.random.choice(population, size=pop_size - elite_size, p=fits)
-    parents2 = np.random.choice(population, size=pop_size - elite_size, p=fits)
-    return parents1, parents2
+
+def stochastic_universal_sampling(population: List[ParameterSet], elite_size=2, rng=None):
+    """
+    Function performs stochastic universal sampling of parents from the population (see
+    stochastic_universal_sampling_vectorized).
+    :param population: list of solutions, population
+    :param elite_size: number of elite solutions
+    :param rng: numpy Generator, default: the default generator of the random_generator module
+    :return: two lists representing solutions chosen as parents for the following crossover operation
+    """
+    return _stochastic_universal_sampling(population, elite_size, rng=rng)
 
 
 def ktournament(k=4):
-    def tournament(population: List[ParameterSet], elite_size=2):
-        pop_size = len(population)
-        if k < 2 or k >= pop_size:
-            raise ValueError("Tournament size should be smaller than the population size, but larger than 2, because "
-                             "2 candidates are taken from each tournament.")
-        parents1 = []
-        parents2 = []
-        for i in range(0, pop_size-elite_size):
-            candidates = np.random.choice(population, size=k)
-            candidates = sorted(candidates, key=operator.attrgetter('fitness'))
-            parents1.append(candidates[-1])
-            parents2.append(candidates[-2])
-        return parents1, parents2
-    return tournament
+    return for_parameter_sets(ktournament_vectorized(k), name='tournament')
+
+
+def rank_selection(pressure=1.5):
+    return for_parameter_sets(rank_selection_vectorized(pressure))
+
+
+def boltzmann_selection(temperature=1.0):
+    return for_parameter_sets(boltzmann_selection_vectorized(temperature))
+
+
+_roulette_wheel = for_parameter_sets(roulette_wheel_vectorized)
+_stochastic_universal_sampling = for_parameter_sets(stochastic_universal_sampling_vectorized)
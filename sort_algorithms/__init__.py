@@ -1,3 +1,2 @@
 from .sort_algorithms import basic_sort, xy_sort, xy_snake_sort, greedy_euclidean, greedy_manhattan, greedy
-
-
+from .path_planning import StageCostModel, PathPlanner, nearest_neighbour_order, two_opt, or_opt
@@ -0,0 +1,271 @@
+from parameters import ParameterSet
+from typing import List
+from scipy.spatial import cKDTree
+import numpy as np
+import math
+import time
+
+
+class StageCostModel:
+    """
+    Cost (time in seconds) of going from one parameter set to the next one on the bench.
+    The x and y axes move at the same time, each with a trapezoidal velocity profile (acceleration up to the maximal
+    velocity, constant velocity, deceleration), so the travel time is the time of the slower axis. Changing any other
+    parameter (delay, power width, intensity, ...) adds a constant reconfiguration time, given per parameter in
+    reconfiguration_costs or default_cost for the parameters that are not in it.
+    Velocity and acceleration are in units of the x and y parameters per second (per second squared).
+    """
+
+    def __init__(self, velocity=100.0, acceleration=1000.0, settle_time=0.0,
+                 delay_cost=0.01, power_width_cost=0.01, intensity_cost=0.01, reconfiguration_costs=None,
+                 default_cost=0.01):
+        self.velocity = velocity
+        self.acceleration = acceleration
+        self.settle_time = settle_time
+        self.reconfiguration_costs = {'delay': delay_cost, 'power_width': power_width_cost,
+                                      'intensity': intensity_cost}
+        self.reconfiguration_costs.update(reconfiguration_costs or {})
+        self.default_cost = default_cost
+
+    def parameter_costs(self):
+        """
+        :return: list of (column, reconfiguration cost) pairs of all parameters except x and y
+        """
+        names = ParameterSet.get_param_names()
+        return [(column, self.reconfiguration_costs.get(name, self.default_cost)) for column, name in enumerate(names)
+                if name not in ('x', 'y')]
+
+    def move_time(self, distance):
+        """
+        :param distance: array of distances along one axis
+        :return: array of travel times
+        """
+        d = np.abs(distance)
+        v, a = self.velocity, self.acceleration
+        t = np.where(d < v * v / a, 2 * np.sqrt(d / a), d / v + v / a)
+        return t + self.settle_time * (d > 0)
+
+    def cost(self, genes_from, genes_to):
+        """
+        :param genes_from: gene matrix of the starting points (or one gene vector)
+        :param genes_to: gene matrix of the end points, same shape
+        :return: array of costs of going from each starting point to each end point
+        """
+        names = ParameterSet.get_param_names()
+        genes_from, genes_to = np.asarray(genes_from, dtype=np.float64), np.asarray(genes_to, dtype=np.float64)
+        x, y = names.index('x'), names.index('y')
+        total = np.maximum(self.move_time(genes_to[..., x] - genes_from[..., x]),
+                           self.move_time(genes_to[..., y] - genes_from[..., y]))
+        for column, cost in self.parameter_costs():
+            total = total + cost * (genes_to[..., column] != genes_from[..., column])
+        return total
+
+    def path_cost(self, genes, order=None):
+        """
+        :param genes: gene matrix
+        :param order: order of the rows, None for the order of the matrix
+        :return: cost of visiting all rows in the given order
+        """
+        genes = np.asarray(genes) if order is None else np.asarray(genes)[order]
+        return float(np.sum(self.cost(genes[:-1], genes[1:])))
+
+    def pair_cost_function(self, genes):
+        """
+        :param genes: gene matrix
+        :return: fast scalar function cost(i, j) between rows i and j, used in the inner loops of the path planner
+        """
+        names = ParameterSet.get_param_names()
+        x = genes[:, names.index('x')].tolist()
+        y = genes[:, names.index('y')].tolist()
+        others = [(genes[:, column].tolist(), cost) for column, cost in self.parameter_costs() if cost]
+        v, a, settle = self.velocity, self.acceleration, self.settle_time
+        threshold = v * v / a
+        sqrt = math.sqrt
+
+        def move(d):
+            if d == 0:
+                return 0.0
+            return (2 * sqrt(d / a) if d < threshold else d / v + v / a) + settle
+
+        def cost(i, j):
+            total = max(move(abs(x[i] - x[j])), move(abs(y[i] - y[j])))
+            for column, c in others:
+                if column[i] != column[j]:
+                    total += c
+            return total
+
+        return cost
+
+
+def nearest_neighbour_order(points, start=0, p=2):
+    """
+    Greedy nearest neighbour path through the points, using a KD-tree to find the nearest unvisited point.
+    :param points: array of point coordinates, one row per point
+    :param start: index of the first point
+    :param p: Minkowski norm of the distance (1 Manhattan, 2 Euclidean, np.inf Chebyshev)
+    :return: array with the order of the points
+    """
+    n = len(points)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    tree = cKDTree(points)
+    # neighbour lists of all points in one query, the tree is queried again only when all neighbours are visited
+    k = min(16, n)
+    _, candidates = tree.query(points, k=k, p=p)
+    candidates = np.asarray(candidates).reshape(n, k).tolist()
+    visited = [False] * n
+    order = [start]
+    visited[start] = True
+    current = start
+    for _ in range(n - 1):
+        nearest = next((j for j in candidates[current] if not visited[j]), None)
+        query_k = k
+        while nearest is None:
+            query_k = min(query_k * 4, n)
+            _, far = tree.query(points[current], k=query_k, p=p)
+            nearest = next((int(j) for j in np.atleast_1d(far) if not visited[j]), None)
+        current = nearest
+        visited[current] = True
+        order.append(current)
+    return np.array(order, dtype=np.int64)
+
+
+def two_opt(tour, cost, neighbours, deadline):
+    """
+    2-opt improvement of an open path (the first point is fixed, the last one is free) with neighbour lists: only
+    moves that connect a point with one of its neighbours are tried.
+    :param tour: list with the order of the points, changed in place
+    :param cost: function cost(i, j)
+    :param neighbours: list of neighbour lists
+    :param deadline: time.perf_counter() value after which the improvement stops
+    :return: True if the path was improved
+    """
+    n = len(tour)
+    pos = [0] * n
+    for i, c in enumerate(tour):
+        pos[c] = i
+    improved_any = False
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for a in range(n):
+            i = pos[a]
+            if i == n - 1:
+                continue
+            na = tour[i + 1]
+            for b in neighbours[a]:
+                j = pos[b]
+                if j <= i + 1:
+                    continue
+                delta = cost(a, b) - cost(a, na)
+                if j + 1 < n:
+                    nb = tour[j + 1]
+                    delta += cost(na, nb) - cost(b, nb)
+                if delta < -1e-12:
+                    tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+                    for k in range(i + 1, j + 1):
+                        pos[tour[k]] = k
+                    improved = improved_any = True
+                    break
+            if time.perf_counter() > deadline:
+                break
+    return improved_any
+
+
+def or_opt(tour, cost, neighbours, deadline, max_segment=3):
+    """
+    Or-opt improvement of an open path: segments of 1 to max_segment points are moved (possibly reversed) next to one
+    of the neighbours of their end points. The first point is fixed.
+    :param tour: list with the order of the points, changed in place
+    :param cost: function cost(i, j)
+    :param neighbours: list of neighbour lists
+    :param deadline: time.perf_counter() value after which the improvement stops
+    :param max_segment: maximal length of the moved segments
+    :return: True if the path was improved
+    """
+    n = len(tour)
+    improved_any = False
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        pos = {c: i for i, c in enumerate(tour)}
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i + length <= n:
+                if time.perf_counter() > deadline:
+                    return improved_any
+                segment = tour[i:i + length]
+                first, last = segment[0], segment[-1]
+                prev = tour[i - 1]
+                nxt = tour[i + length] if i + length < n else None
+                removed = cost(prev, first) + (cost(last, nxt) - cost(prev, nxt) if nxt is not None else 0.0)
+                best = None
+                for c in set(neighbours[first]) | set(neighbours[last]):
+                    k = pos[c]
+                    if i - 1 <= k < i + length:
+                        continue
+                    nc = tour[k + 1] if k + 1 < n else None
+                    base = cost(c, nc) if nc is not None else 0.0
+                    forward = cost(c, first) + (cost(last, nc) if nc is not None else 0.0) - base
+                    backward = cost(c, last) + (cost(first, nc) if nc is not None else 0.0) - base
+                    for added, reverse in ((forward, False), (backward, True)):
+                        if added - removed < -1e-12 and (best is None or added < best[0]):
+                            best = (added, c, reverse)
+                if best is None:
+                    i += 1
+                    continue
+                _, c, reverse = best
+                del tour[i:i + length]
+                k = tour.index(c)
+                tour[k + 1:k + 1] = segment[::-1] if reverse else segment
+                pos = {c: i for i, c in enumerate(tour)}
+                improved = improved_any = True
+    return improved_any
+
+
+class PathPlanner:
+    """
+    Sort function that orders the population so that the bench spends as little time as possible going from one
+    parameter set to the next one, according to the StageCostModel.
+    The path is built with the nearest neighbour heuristic (KD-tree on x and y) and then improved with 2-opt and
+    Or-opt moves between neighbouring points, until no move improves the path or the time limit is reached.
+    The path starts at the point with the smallest x (and y), same as the greedy sort.
+    Instances are used as the sort function of the GA, e.g. sort_function=PathPlanner(time_limit=0.5). For gene
+    matrices, order() returns the order of the rows directly.
+    """
+
+    def __init__(self, cost_model: StageCostModel = None, time_limit=0.5, neighbours=8):
+        self.cost_model = cost_model if cost_model is not None else StageCostModel()
+        self.time_limit = time_limit
+        self.neighbours = neighbours
+        self.__name__ = 'path_planning_sort'
+
+    def order(self, genes):
+        """
+        :param genes: gene matrix, one row per parameter set
+        :return: array with the order of the rows
+        """
+        deadline = time.perf_counter() + self.time_limit
+        genes = np.asarray(genes, dtype=np.float64)
+        n = len(genes)
+        if n < 3:
+            return np.lexsort(genes[:, 1::-1].T) if n else np.empty(0, dtype=np.int64)
+        names = ParameterSet.get_param_names()
+        xy = genes[:, [names.index('x'), names.index('y')]]
+        start = int(np.lexsort((xy[:, 1], xy[:, 0]))[0])
+        # the travel time is given by the slower axis, so the neighbours are found with the Chebyshev distance
+        tour = nearest_neighbour_order(xy, start, p=np.inf).tolist()
+        _, neighbours = cKDTree(xy).query(xy, k=min(self.neighbours + 1, n), p=np.inf)
+        neighbours = [[int(j) for j in row if j != i] for i, row in enumerate(neighbours)]
+        cost = self.cost_model.pair_cost_function(genes)
+        while time.perf_counter() < deadline:
+            improved = two_opt(tour, cost, neighbours, deadline)
+            improved = or_opt(tour, cost, neighbours, deadline) or improved
+            if not improved:
+                break
+        return np.array(tour, dtype=np.int64)
+
+    def __call__(self, population: List[ParameterSet]) -> List[ParameterSet]:
+        names = ParameterSet.get_param_names()
+        genes = np.array([[getattr(ps, name) for name in names] for ps in population], dtype=np.float64)
+        return [population[i] for i in self.order(genes)]
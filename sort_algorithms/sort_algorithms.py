@@ -3,6 +3,7 @@ from typing import List
 import operator
 import itertools
 import sklearn.metrics.pairwise as skpw
+from .path_planning import nearest_neighbour_order
 
 
 # type hint definition for GA function parameters
@@ -10,7 +11,8 @@ import sklearn.metrics.pairwise as skpw
 
 
 def basic_sort(population: List[ParameterSet]) -> List[ParameterSet]:
-    return sorted(population, key=operator.attrgetter('x', 'y', 'intensity'))
+    names = ParameterSet.get_param_names()
+    return sorted(population, key=operator.attrgetter(*[name for name in ('x', 'y', 'intensity') if name in names]))
 
 
 def xy_sort(population: List[ParameterSet]) -> List[ParameterSet]:
@@ -32,9 +34,17 @@ def euclidean_distances(current_ps, unvisited_ps):
     return skpw.euclidean_distances([[current_ps.x, current_ps.y]], [[ps.x, ps.y] for ps in unvisited_ps])[0]
 
 
+# Minkowski norm of the distance functions that have a KD-tree implementation
+KD_TREE_NORMS = {manhattan_distances: 1, euclidean_distances: 2}
+
+
 # finding shortest path with greedy algorithm using a given distance function
 def greedy(population: List[ParameterSet], distance_func=manhattan_distances) -> List[ParameterSet]:
     points = xy_sort(population)
+    if distance_func in KD_TREE_NORMS and points:
+        # same nearest neighbour path, found with a KD-tree instead of computing all distances at every step
+        order = nearest_neighbour_order(np.array([[ps.x, ps.y] for ps in points]), 0, p=KD_TREE_NORMS[distance_func])
+        return [points[i] for i in order]
     source = points[0]
     unvisited_points = points[1:]
     route = [source]
@@ -0,0 +1 @@
+from .surrogates import KNNSurrogate
@@ -0,0 +1,101 @@
+import collections
+import numpy as np
+from scipy.spatial import cKDTree
+from parameters import ParameterSet
+
+
+def _as_genes(solutions):
+    if isinstance(solutions, np.ndarray):
+        return solutions.reshape(-1, ParameterSet.get_parameter_number())
+    names = ParameterSet.get_param_names()
+    return np.array([[getattr(s, name) for name in names] for s in solutions],
+                    dtype=np.float64).reshape(-1, len(names))
+
+
+class KNNSurrogate:
+    """
+    k-nearest neighbours surrogate model of the fitness and the fault class.
+    The model is trained on the evaluated solutions and updated incrementally, every time a solution is evaluated on
+    the bench. Parameter values are normalized with the parameter limits, so all parameters have the same weight.
+    The prediction for a solution is the mean fitness and the most common fault class of its k nearest evaluated
+    solutions. The uncertainty grows with the spread of the neighbours' fitness values and with their distance.
+    """
+
+    def __init__(self, k=5, min_samples=20, exploration=0.5):
+        """
+        :param k: number of neighbours
+        :param min_samples: number of evaluated solutions needed before the surrogate is used
+        :param exploration: fraction of the solutions sent to the bench that are chosen by the uncertainty (the rest
+        are chosen by the predicted fitness)
+        """
+        self.k = k
+        self.min_samples = min_samples
+        self.exploration = exploration
+        self.genes = np.empty((0, ParameterSet.get_parameter_number()))
+        self.fitness = np.empty(0)
+        self.fault_class = np.empty(0, dtype=object)
+        self.size = 0
+        self.tree = None
+
+    def _normalize(self, genes):
+        mins, maxs, _ = ParameterSet.get_param_limits(as_array=True).T
+        return (genes - mins) / np.maximum(maxs - mins, 1)
+
+    def update(self, solutions, fitness, fault_classes):
+        """
+        Function adds evaluated solutions to the model.
+        :param solutions: list of ParameterSet solutions or gene matrix
+        :param fitness: fitness values of the solutions
+        :param fault_classes: fault classes of the solutions
+        """
+        genes = self._normalize(_as_genes(solutions))
+        n = len(genes)
+        if self.size + n > len(self.genes):
+            capacity = max(2 * len(self.genes), self.size + n, 64)
+            self.genes = np.resize(self.genes, (capacity, genes.shape[1]))
+            self.fitness = np.resize(self.fitness, capacity)
+            self.fault_class = np.resize(self.fault_class, capacity)
+        self.genes[self.size:self.size + n] = genes
+        self.fitness[self.size:self.size + n] = np.atleast_1d(fitness)
+        self.fault_class[self.size:self.size + n] = np.atleast_1d(np.array(fault_classes, dtype=object))
+        self.size += n
+        self.tree = None  # rebuilt on the next prediction
+
+    def ready(self):
+        return self.size >= self.min_samples
+
+    def predict(self, solutions):
+        """
+        :param solutions: list of ParameterSet solutions or gene matrix
+        :return: predicted fitness, uncertainty and predicted fault class of every solution
+        """
+        if self.tree is None:
+            self.tree = cKDTree(self.genes[:self.size])
+        k = min(self.k, self.size)
+        distances, neighbours = self.tree.query(self._normalize(_as_genes(solutions)), k=k)
+        distances, neighbours = distances.reshape(-1, k), neighbours.reshape(-1, k)
+        fitness = self.fitness[neighbours]
+        fitness_range = np.ptp(self.fitness[:self.size])
+        uncertainty = fitness.std(axis=1) + fitness_range * distances.mean(axis=1)
+        fault_class = np.array([collections.Counter(row).most_common(1)[0][0]
+                                for row in self.fault_class[neighbours]], dtype=object)
+        return fitness.mean(axis=1), uncertainty, fault_class
+
+    def select(self, predicted_fitness, uncertainty, number):
+        """
+        Function chooses the solutions that should be evaluated on the bench: the most promising ones (highest predicted
+        fitness) and the most uncertain ones.
+        :param predicted_fitness: predicted fitness values
+        :param uncertainty: uncertainties of the predictions
+        :param number: number of solutions to choose
+        :return: array of indexes of the chosen solutions
+        """
+        number = min(number, len(predicted_fitness))
+        exploit = number - int(round(self.exploration * number))
+        chosen = np.argsort(-predicted_fitness, kind='stable')[:exploit]
+        rest = np.setdiff1d(np.arange(len(predicted_fitness)), chosen)
+        explore = rest[np.argsort(-uncertainty[rest], kind='stable')[:number - exploit]]
+        return np.concatenate([chosen, explore])
+
+    def __len__(self):
+        return self.size
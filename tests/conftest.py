@@ -0,0 +1,40 @@
+import pathlib
+import sys
+import pytest
+
+REPO = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(REPO))
+
+from parameters import ParameterSet, ParameterSpace  # noqa: E402
+
+
+@pytest.fixture
+def repo():
+    """
+    :return: directory of the repository, with the ini files of the parameter spaces and the fitness values
+    """
+    return REPO
+
+
+@pytest.fixture
+def space(repo):
+    """
+    Parameter space of parameter_space.ini (int parameters and the float parameter z), set for the test. The previous
+    space is restored after the test.
+    """
+    previous = ParameterSet.get_space()
+    space = ParameterSpace.from_ini_file(str(repo / 'parameter_space.ini'))
+    ParameterSet.set_space(space)
+    yield space
+    ParameterSet.set_space(previous)
+
+
+@pytest.fixture
+def parameter_info(repo):
+    """
+    :return: path of parameter_info.ini (int parameters), for tests that load it. The previous space is restored
+    after the test.
+    """
+    previous = ParameterSet.get_space()
+    yield str(repo / 'parameter_info.ini')
+    ParameterSet.set_space(previous)
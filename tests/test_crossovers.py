@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from crossovers import uniform_crossover_vectorized, average_crossover_vectorized, arithmetic_crossover_vectorized, \
+    blend_crossover_vectorized, sbx_crossover_vectorized, arithmetic_crossover, blend_crossover, sbx_crossover
+from parameters import ParameterSet
+
+CROSSOVERS = [uniform_crossover_vectorized, average_crossover_vectorized, arithmetic_crossover_vectorized(),
+              blend_crossover_vectorized(), sbx_crossover_vectorized()]
+
+
+def _parents(space, size=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return space.random_indexes(size, rng), space.random_indexes(size, rng)
+
+
+@pytest.mark.parametrize('crossover', CROSSOVERS)
+def test_children_stay_on_the_grid(space, crossover):
+    parents1, parents2 = _parents(space)
+    children = crossover(parents1, parents2, rng=1)
+    assert children.shape == parents1.shape and np.issubdtype(children.dtype, np.integer)
+    assert np.all(children >= 0) and np.all(children < space.levels)
+
+
+@pytest.mark.parametrize('crossover', CROSSOVERS)
+def test_equal_parents_have_the_same_child(space, crossover):
+    parents, _ = _parents(space)
+    np.testing.assert_array_equal(crossover(parents, parents.copy(), rng=1), parents)
+
+
+def test_arithmetic_crossover_weight(space):
+    parents1, parents2 = _parents(space)
+    np.testing.assert_array_equal(arithmetic_crossover_vectorized(1.0)(parents1, parents2), parents1)
+    children = arithmetic_crossover_vectorized(0.25)(parents1, parents2)
+    assert np.all(np.abs(children - (0.25 * parents1 + 0.75 * parents2)) <= 0.5)
+
+
+@pytest.mark.parametrize('alpha', [0.0, 0.5])
+def test_blend_crossover_interval(space, alpha):
+    parents1, parents2 = _parents(space)
+    children = blend_crossover_vectorized(alpha)(parents1, parents2, rng=1)
+    low, high = np.minimum(parents1, parents2), np.maximum(parents1, parents2)
+    extension = alpha * (high - low)
+    assert np.all(children >= np.maximum(low - extension - 0.5, 0))
+    assert np.all(children <= np.minimum(high + extension + 0.5, space.levels - 1))
+    if alpha > 0:
+        assert np.any(children < low) and np.any(children > high)
+
+
+def test_sbx_children_are_spread_around_the_parents(space):
+    parents1 = np.full((20000, len(space.levels)), 2)
+    parents2 = np.minimum(parents1 + 2, space.levels - 1)
+    near = sbx_crossover_vectorized(eta=30)(parents1, parents2, rng=1)
+    far = sbx_crossover_vectorized(eta=1)(parents1, parents2, rng=1)
+    middle = (parents1 + parents2) / 2
+    # the children are symmetric around the middle of the parents, a small eta moves them further away
+    assert abs(np.mean(near - middle)) < 0.05
+    assert np.mean(np.abs(far - middle)) > np.mean(np.abs(near - middle))
+    assert np.all(np.isin(near - parents1, [-1, 0, 1, 2, 3]))
+
+
+@pytest.mark.parametrize('crossover', [arithmetic_crossover(), blend_crossover(), sbx_crossover()])
+def test_parameter_set_children_are_on_the_grid(space, crossover):
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        child = crossover(ParameterSet.random(rng), ParameterSet.random(rng), rng=rng)
+        for name, (low, high, converter) in space.bounds.items():
+            value = getattr(child, name)
+            step = space.steps[space.names.index(name)]
+            assert type(value) is converter and low <= value <= high
+            assert abs((value - low) / step - round((value - low) / step)) < 1e-9
@@ -0,0 +1,50 @@
+import collections
+import numpy as np
+import pytest
+import fitness
+from fitness import AdaptiveMeasurement, fitness_bounds, maldini_fitness, maldini_fitness_per_shot, \
+    percentage_fitness
+from ga import GeneticAlgorithm
+
+
+@pytest.fixture(autouse=True)
+def fitness_values(repo):
+    fitness.set_fitness_values(str(repo / 'fitness.info'))
+
+
+def test_adaptive_measurement_refuses_count_based_fitness():
+    def count_fitness(fault_classes):
+        return float(len(fault_classes)), None
+
+    policy = AdaptiveMeasurement(min_shots=3, max_shots=10)
+    assert policy.more_shots([0, 1, 0], percentage_fitness) > 0
+    with pytest.raises(ValueError, match='mean over the shots'):
+        policy.more_shots([0, 1, 0], count_fitness)
+
+
+def test_maldini_per_shot_does_not_grow_with_the_shots():
+    shots = [2, 2, 1, 0, 0]
+    assert maldini_fitness_per_shot(shots) == maldini_fitness(shots)
+    assert maldini_fitness_per_shot(shots * 4) == pytest.approx(maldini_fitness(shots))
+    low, high = fitness_bounds(shots * 4, maldini_fitness_per_shot, rng=0)
+    wide_low, wide_high = fitness_bounds(shots, maldini_fitness_per_shot, rng=0)
+    assert wide_low <= low < high <= wide_high
+
+
+def test_adaptive_measurement_runs_with_maldini(tmp_path, parameter_info):
+    rng = np.random.default_rng(0)
+    shots = []
+
+    def bench(parameter_set):
+        shots.append(parameter_set)
+        return int(rng.integers(0, 3)) if parameter_set.x % 2 else 1
+
+    policy = AdaptiveMeasurement(min_shots=3, max_shots=12, tolerance=0.5)
+    ga = GeneticAlgorithm(bench, lambda iteration: None, pop_size=10, max_iterations=2, nb_measurements=policy,
+                          parameter_info_file=parameter_info, fitness_func=maldini_fitness, local_search=None,
+                          rng=0)
+    assert ga.fitness is maldini_fitness_per_shot
+    population = ga.run(str(tmp_path / 'logfile.pkl'))
+    assert all(ps.fitness <= 4 + 1.2 * 5 for ps in population)
+    counts = collections.Counter(ps.get_grid_index() for ps in shots).values()
+    assert min(counts) == 3 and 3 < max(counts) <= 12
@@ -0,0 +1,27 @@
+import numpy as np
+from ga import GeneticAlgorithm
+
+
+def test_numpy_integer_is_a_number_of_measurements(tmp_path, parameter_info):
+    shots = []
+
+    def bench(parameter_set):
+        shots.append(parameter_set)
+        return 0
+
+    ga = GeneticAlgorithm(bench, lambda iteration: None, pop_size=4, max_iterations=1, nb_measurements=np.int64(2),
+                          parameter_info_file=parameter_info, local_search=None, rng=0)
+    assert ga.first_shots() == 2 and ga.more_shots([0, 1]) == 0
+    assert ga.info_as_dict()['nb_measurements'] == 2 and '"nb_measurements" : 2,' in str(ga)
+    ga.run(str(tmp_path / 'logfile.pkl'))
+    assert len(shots) % 2 == 0 and len(shots) > 0
+
+
+def test_cache_stats_are_kept_after_the_run(tmp_path, parameter_info, capsys):
+    ga = GeneticAlgorithm(lambda parameter_set: 0, lambda iteration: None, pop_size=6, max_iterations=2,
+                          parameter_info_file=parameter_info, rng=0)
+    assert ga.cache_stats is None
+    ga.run(str(tmp_path / 'logfile.pkl'))
+    assert ga.cache_stats['misses'] > 0 and ga.cache_stats['size'] > 0
+    assert len(ga.TESTED) == 0
+    assert 'Evaluation cache' not in capsys.readouterr().out
@@ -0,0 +1,11 @@
+from ga import GeneticAlgorithm
+from local_search import hooke_jeeves
+
+
+def test_default_hooke_jeeves_is_not_shared_between_gas(parameter_info):
+    first = GeneticAlgorithm(None, None, parameter_info_file=parameter_info)
+    second = GeneticAlgorithm(None, None, parameter_info_file=parameter_info, local_search=hooke_jeeves)
+    first.local_search.visited.add('solution')
+    assert first.local_search.__name__ == second.local_search.__name__ == 'hooke_jeeves'
+    assert first.local_search.visited is not second.local_search.visited
+    assert not second.local_search.visited
@@ -0,0 +1,8 @@
+import numpy as np
+from initializations.initializations import indexes_to_population
+
+
+def test_indexes_to_population_keeps_parameter_types(space):
+    ps = indexes_to_population(np.array([[1, 2, 1, 0, 0, 0, 0, 0]]))[0]
+    for name, kind in zip(space.names, space.converters):
+        assert type(getattr(ps, name)) is kind
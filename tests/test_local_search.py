@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from helper import TabuList
+from local_search import BudgetedEvaluator, compass_search, pattern_search, coordinate_descent
+from local_search.local_search import _batch_evaluator, _batched_pattern_search
+from parameters import ParameterSet
+
+
+def _peak(space):
+    """
+    :return: optimum, one grid step away from it on the float axis z, and the batch evaluation function of a fitness
+    that decreases with the distance to the optimum
+    """
+    optimum = np.array([50, 50, 0.5, 51, 51, 50, 5, 3], dtype=np.float64)
+    start = optimum.copy()
+    start[space.names.index('z')] = 0.0
+
+    def evaluation_function(parameter_sets):
+        values = np.array([[getattr(ps, name) for name in space.names] for ps in parameter_sets])
+        distances = np.sum(np.abs(values - optimum) / space.steps, axis=1)
+        return [(float(-d), 'pass') for d in distances]
+
+    return optimum, start, evaluation_function
+
+
+@pytest.mark.parametrize('method', [compass_search, pattern_search, coordinate_descent])
+def test_method_reaches_single_step_on_float_axis(space, method):
+    optimum, start, evaluation_function = _peak(space)
+    evaluate = BudgetedEvaluator(evaluation_function, TabuList(), budget=1000, rng=0)
+    fitness, _ = evaluation_function([ParameterSet(*space.to_python(start))])[0]
+    x, fitness, _ = method(start, fitness, 'pass', evaluate)
+    np.testing.assert_allclose(x, optimum)
+    assert fitness == 0
+
+
+def test_batched_hooke_jeeves_reaches_single_step_on_float_axis(space):
+    optimum, start, evaluation_function = _peak(space)
+    fitness, _ = evaluation_function([ParameterSet(*space.to_python(start))])[0]
+    genes, found, _ = _batched_pattern_search(start[None], np.array([fitness]), ['pass'],
+                                              _batch_evaluator(evaluation_function))
+    np.testing.assert_allclose(genes[0], optimum)
+    assert found[0] == 0
+
+
+def test_budget_counts_the_shots_fired(space):
+    optimum, start, evaluation_function = _peak(space)
+    fired = [0]
+
+    def shooting_evaluation(parameter_sets):
+        fired[0] += 5 * len(parameter_sets)
+        return evaluation_function(parameter_sets)
+    shooting_evaluation.shots = lambda: fired[0]
+    shooting_evaluation.first_shots = lambda: 5
+
+    evaluate = BudgetedEvaluator(shooting_evaluation, TabuList(), budget=20)
+    fitness, _ = evaluate(start + np.diag(space.steps))
+    assert evaluate.shots == fired[0] == 20 and evaluate.evaluations == 4
+    assert np.sum(np.isfinite(fitness)) == 4 and evaluate.exhausted
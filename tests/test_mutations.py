@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from mutations import uniform_mutation_vectorized, gaussian_mutation_vectorized, polynomial_mutation_vectorized, \
+    gaussian_mutation, polynomial_mutation
+from parameters import ParameterSet
+
+MUTATIONS = [uniform_mutation_vectorized, gaussian_mutation_vectorized(), polynomial_mutation_vectorized()]
+
+
+def _middle(space, size=5000):
+    return np.tile(space.levels // 2, (size, 1))
+
+
+@pytest.mark.parametrize('mutation', MUTATIONS)
+def test_mutated_genes_stay_on_the_grid(space, mutation):
+    genes = mutation(space.random_indexes(5000, np.random.default_rng(0)), 0.5, rng=1)
+    assert np.all(genes >= 0) and np.all(genes < space.levels)
+
+
+@pytest.mark.parametrize('mutation', MUTATIONS[1:])
+def test_mutation_probability_per_gene(space, mutation):
+    rates = np.linspace(0, 1, len(space.levels))
+    genes = _middle(space)
+    mutated = mutation(genes.copy(), rates, rng=1) != genes
+    # the Gaussian and polynomial mutations move a mutated gene at least one step
+    np.testing.assert_allclose(np.mean(mutated, axis=0), rates, atol=0.02)
+    assert not np.any(mutated[:, 0]) and np.all(mutated[:, -1])
+
+
+def test_polynomial_mutation_eta(space):
+    genes = _middle(space)
+    small = polynomial_mutation_vectorized(eta=100)(genes.copy(), 1.0, rng=1) - genes
+    large = polynomial_mutation_vectorized(eta=1)(genes.copy(), 1.0, rng=1) - genes
+    assert abs(np.mean(small)) < 0.1 and np.all(np.abs(small) >= 1)
+    assert np.mean(np.abs(large)) > np.mean(np.abs(small))
+
+
+def test_gaussian_mutation_sigma(space):
+    genes = _middle(space)
+    steps = gaussian_mutation_vectorized(sigma=0.05)(genes.copy(), 1.0, rng=1) - genes
+    column = int(np.argmax(space.levels))
+    assert np.std(steps[:, column]) == pytest.approx(0.05 * (space.levels[column] - 1), rel=0.1)
+
+
+@pytest.mark.parametrize('mutation', [gaussian_mutation(), polynomial_mutation()])
+def test_parameter_set_mutation_is_on_the_grid(space, mutation):
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        solution = mutation(ParameterSet.random(rng), 0.5, rng=rng)
+        for name, (low, high, converter) in space.bounds.items():
+            value = getattr(solution, name)
+            step = space.steps[space.names.index(name)]
+            assert type(value) is converter and low <= value <= high
+            assert abs((value - low) / step - round((value - low) / step)) < 1e-9
@@ -0,0 +1,18 @@
+import pytest
+from parameters import ParameterSet, set_parameter_limits_from_ini_file
+
+
+@pytest.mark.parametrize('value, expected', [(10.6, 11), (10.4, 10), (-3, 0), (1e6, 100)])
+def test_clip_rounds_int_parameters(parameter_info, value, expected):
+    set_parameter_limits_from_ini_file(parameter_info)
+    for name in ParameterSet.get_param_names():
+        clipped = ParameterSet.clip(name, value)
+        assert type(clipped) is int and clipped == expected
+
+
+def test_update_keeps_float_parameters(space):
+    ps = ParameterSet(x=10, y=10, z=0.5, delay=1, power_width=1, intensity=0, spot_size=1, pulse_count=1)
+    ps.update('z', 0.7)
+    ps.update('x', 10.6)
+    assert type(ps.z) is float and ps.z == 0.7
+    assert type(ps.x) is int and ps.x == 11 and ps.fitness is None
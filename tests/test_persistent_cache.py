@@ -0,0 +1,38 @@
+import os
+from helper import PersistentCache
+from parameters import ParameterSet, set_parameter_limits_from_ini_file
+
+
+def test_cache_created_before_the_space_keys_all_parameters(tmp_path, space, parameter_info):
+    file_name = os.path.join(tmp_path, 'evaluations.sqlite')
+    set_parameter_limits_from_ini_file(parameter_info)
+    cache = PersistentCache(file_name, chip='chip')
+    ParameterSet.set_space(space)
+    a = ParameterSet(x=10, y=10, z=0.5, delay=1, power_width=1, intensity=0, spot_size=1, pulse_count=1)
+    b = ParameterSet(x=10, y=10, z=-0.5, delay=1, power_width=1, intensity=0, spot_size=2, pulse_count=1)
+    cache.add(a, (10.0, 'fail'), [1, 1])
+    assert cache.get(b, (None, None)) == (None, None)
+    assert cache.get(a, (None, None)) == (10.0, 'fail')
+    assert cache.get_fault_classes(a) == [1, 1]
+    cache.close()
+
+
+def test_database_is_shared_by_different_spaces(tmp_path, space, parameter_info):
+    file_name = os.path.join(tmp_path, 'evaluations.sqlite')
+    set_parameter_limits_from_ini_file(parameter_info)
+    cache = PersistentCache(file_name, chip='chip')
+    cache.add(ParameterSet(1, 2, 3, 4, 5), (5.0, 'mute'))
+    cache.close()
+
+    ParameterSet.set_space(space)
+    cache = PersistentCache(file_name, chip='chip')
+    assert len(cache) == 0
+    ps = ParameterSet(x=10, y=10, z=1.5, delay=1, power_width=1, intensity=0, spot_size=1, pulse_count=1)
+    cache.add(ps, (2.0, 'changing'))
+    assert ps in cache and len(cache) == 1
+    cache.close()
+
+    set_parameter_limits_from_ini_file(parameter_info)
+    cache = PersistentCache(file_name, chip='chip')
+    assert cache.get(ParameterSet(1, 2, 3, 4, 5), (None, None)) == (5.0, 'mute')
+    cache.close()
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from parameters import ParameterSet, set_parameter_limits_from_ini_file
+from selections import elite_indexes, roulette_wheel_vectorized, stochastic_universal_sampling_vectorized, \
+    rank_selection_vectorized, boltzmann_selection_vectorized, ktournament_vectorized, ktournament, rank_selection
+
+FITNESS = np.array([1.0, 4.0, 0.0, 2.0, 3.0, 10.0, 5.0, 5.0])
+
+
+def _copies(parents1, parents2):
+    return np.bincount(np.concatenate([parents1, parents2]), minlength=len(FITNESS))
+
+
+@pytest.mark.parametrize('elite_size', [0, 1, 2, 3, 8, 10])
+def test_elite_indexes_is_a_stable_sort(elite_size):
+    rng = np.random.default_rng(0)
+    for fitness in [FITNESS, rng.integers(0, 5, 100).astype(float), rng.random(100)]:
+        expected = np.argsort(-fitness, kind='stable')[:elite_size]
+        np.testing.assert_array_equal(elite_indexes(fitness, elite_size), expected)
+
+
+def test_roulette_wheel_draws_in_proportion_to_fitness():
+    parents1, parents2 = roulette_wheel_vectorized(FITNESS, 50000, rng=0)
+    np.testing.assert_allclose(_copies(parents1, parents2) / 100000, FITNESS / FITNESS.sum(), atol=0.005)
+
+
+def test_roulette_wheel_shifts_negative_fitness():
+    parents1, parents2 = roulette_wheel_vectorized(FITNESS - 20, 1000, rng=0)
+    copies = _copies(parents1, parents2)
+    assert copies[np.argmin(FITNESS)] == 0 and copies[np.argmax(FITNESS)] > copies[0]
+
+
+@pytest.mark.parametrize('selection, weights', [
+    (stochastic_universal_sampling_vectorized, FITNESS),
+    (rank_selection_vectorized(1.5), 0.5 + np.array([1, 4, 0, 2, 3, 7, 5, 6]) / 7),
+    (boltzmann_selection_vectorized(2.0), np.exp(FITNESS / 2.0)),
+])
+@pytest.mark.parametrize('seed', range(5))
+def test_universal_sampling_copies_differ_by_at_most_one_from_expected(selection, weights, seed):
+    parents1, parents2 = selection(FITNESS, 13, rng=seed)
+    assert len(parents1) == len(parents2) == 13
+    expected = 26 * weights / np.sum(weights)
+    assert np.all(np.abs(_copies(parents1, parents2) - expected) < 1)
+
+
+def test_boltzmann_selection_temperature():
+    cold = _copies(*boltzmann_selection_vectorized(0.01)(FITNESS, 50, rng=0))
+    hot = _copies(*boltzmann_selection_vectorized(1e6)(FITNESS, 50, rng=0))
+    assert cold[np.argmax(FITNESS)] == 100
+    assert np.all(np.abs(hot - 100 / len(FITNESS)) < 1)
+
+
+def test_ktournament_winners_follow_the_rank_distribution():
+    k, size = 3, 200000
+    fitness = np.arange(10, dtype=np.float64)[::-1]
+    parents1, parents2 = ktournament_vectorized(k)(fitness, size, rng=0)
+    assert np.all(fitness[parents1] >= fitness[parents2])
+    ranks = np.arange(10)
+    # probability that the best of k uniform draws has rank r (0 is the worst)
+    expected = ((ranks + 1) ** k - ranks ** k) / 10 ** k
+    observed = np.bincount(9 - parents1, minlength=10) / size
+    np.testing.assert_allclose(observed, expected, atol=0.005)
+
+
+def test_ktournament_size():
+    with pytest.raises(ValueError):
+        ktournament_vectorized(8)(FITNESS, 4, rng=0)
+    with pytest.raises(ValueError):
+        ktournament_vectorized(1)(FITNESS, 4, rng=0)
+
+
+@pytest.mark.parametrize('selection', [ktournament(), rank_selection()])
+def test_selection_of_parameter_sets_returns_population_members(parameter_info, selection):
+    set_parameter_limits_from_ini_file(parameter_info)
+    population = [ParameterSet(i, i, i, i, i) for i in range(len(FITNESS))]
+    for ps, fitness in zip(population, FITNESS):
+        ps.update_fitness(fitness, 'pass')
+    parents1, parents2 = selection(population, elite_size=2, rng=0)
+    assert len(parents1) == len(parents2) == len(population) - 2
+    assert all(any(p is ps for ps in population) for p in parents1 + parents2)
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from initializations import lhs_indexes, maximin_lhs_indexes
+
+
+def _strata(indexes, levels, size):
+    lows = np.arange(size)[:, None] * levels // size
+    return np.stack([np.searchsorted(lows[:, c], indexes[:, c], side='right') - 1 for c in range(len(levels))],
+                    axis=1)
+
+
+@pytest.mark.parametrize('sampler', [lhs_indexes, maximin_lhs_indexes])
+@pytest.mark.parametrize('size', [7, 40])
+def test_latin_hypercube_takes_every_stratum_once(space, sampler, size):
+    indexes = sampler(size, np.random.default_rng(1))
+    assert indexes.shape == (size, len(space.levels))
+    assert np.all(indexes >= 0) and np.all(indexes < space.levels)
+    for column, levels in enumerate(space.levels):
+        if levels >= size:
+            assert sorted(_strata(indexes, space.levels, size)[:, column]) == list(range(size))
+    np.testing.assert_array_equal(indexes, sampler(size, np.random.default_rng(1)))